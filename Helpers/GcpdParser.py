@@ -0,0 +1,313 @@
+import os
+import re
+import sys
+import time
+from html import unescape
+
+# Какой вид страницы распознан
+VARIANT_TEXT = "text"                  # строки «CS:GO Profile Rank: N» / «Experience points ...»
+VARIANT_JSON = "json"                  # "profile_rank" / "xp" в данных страницы
+VARIANT_PLAYER_LEVEL = "player_level"  # "player_level" / "experience_points" (бывает у части аккаунтов)
+VARIANT_TABLES_ONLY = "tables_only"    # уровня нет, но таблицы режимов/карт есть
+VARIANT_LOGIN = "login"                # Steam отдал страницу входа
+VARIANT_UNKNOWN = "unknown"
+
+_RANK_LABEL = "CS:GO Profile Rank:"
+_XP_LABEL = "Experience points earned towards next rank:"
+_JSON_FIELDS = (
+    (VARIANT_JSON, re.compile(r'"profile_rank"[:\s]*(\d+)'), re.compile(r'"(?:current_)?xp"[:\s]*(\d+)')),
+    (VARIANT_PLAYER_LEVEL, re.compile(r'"player_level"[:\s]*(\d+)'), re.compile(r'"experience_points"[:\s]*(\d+)')),
+)
+# заголовок колонки (lower) -> поле
+_COLUMNS = {"wins": "wins", "ties": "ties", "losses": "losses", "skill group": "skill", "skill": "skill", "rank": "skill"}
+
+
+class ModeStats:
+    """Строка таблицы gcpd: режим (Premier / Wingman / ...) или режим + карта."""
+    __slots__ = ("mode", "map_name", "wins", "ties", "losses", "skill")
+
+    def __init__(self, mode, wins, ties, losses, skill=-1, map_name=None):
+        self.mode = mode
+        self.map_name = map_name
+        self.wins = wins
+        self.ties = ties
+        self.losses = losses
+        # -1 — ранга нет (пустая ячейка)
+        self.skill = skill
+
+    def __repr__(self):
+        where = f"{self.mode}/{self.map_name}" if self.map_name else self.mode
+        return f"ModeStats({where}, W:{self.wins} T:{self.ties} L:{self.losses} R:{self.skill})"
+
+
+class GcpdPage:
+    """Результат разбора одной страницы gcpd."""
+    __slots__ = ("variant", "level", "xp", "modes", "maps")
+
+    def __init__(self):
+        self.variant = VARIANT_UNKNOWN
+        self.level = 0
+        self.xp = 0
+        # "Premier" -> ModeStats
+        self.modes = {}
+        self.maps = []
+
+    def __repr__(self):
+        return (f"GcpdPage({self.variant}, lvl {self.level}, xp {self.xp}, "
+                f"modes={sorted(self.modes)}, maps={len(self.maps)})")
+
+
+def _number(text):
+    digits = text.strip().split(None, 1)[0].replace(",", "") if text.strip() else ""
+    return int(digits) if digits.isdigit() else None
+
+
+_TAG = re.compile(r"<[^>]*>")
+_ROW = re.compile(r"<tr[^>]*>(.*?)</tr>", re.DOTALL | re.IGNORECASE)
+_CELL = re.compile(r"<t[dh][^>]*>(.*?)</t[dh]>", re.DOTALL | re.IGNORECASE)
+# именно <table class="generic_kv_table">, не обёртка generic_kv_table_container
+_KV_TABLE = re.compile(r"<table[^>]*\bgeneric_kv_table\b[^>]*>", re.IGNORECASE)
+
+
+def _text(fragment):
+    return unescape(_TAG.sub(" ", fragment)).strip()
+
+
+def _kv_tables(html):
+    """Таблицы generic_kv_table: списки строк, строка — список текстов ячеек (первая — заголовок)."""
+    tables = []
+    position = 0
+    while True:
+        match = _KV_TABLE.search(html, position)
+        if not match:
+            return tables
+        end = html.find("</table>", match.end())
+        if end < 0:
+            return tables
+        rows = [[_text(cell) for cell in _CELL.findall(row)] for row in _ROW.findall(html, match.start(), end)]
+        tables.append([row for row in rows if row])
+        position = end + len("</table>")
+
+
+def _labelled_number(html, label):
+    """Число сразу после подписи (между ними могут быть теги: <span>, <b>)."""
+    index = html.find(label)
+    if index < 0:
+        return None
+    tail = _text(html[index + len(label):index + len(label) + 200])
+    return _number(tail) if tail else None
+
+
+def _apply_table(page, rows):
+    header = [cell.lower() for cell in rows[0]]
+    if not header or "matchmaking mode" not in header[0]:
+        return
+    map_column = header.index("map") if "map" in header else None
+    columns = {_COLUMNS[name]: index for index, name in enumerate(header) if name in _COLUMNS}
+    if "wins" not in columns:
+        return
+
+    for row in rows[1:]:
+        if len(row) < len(header) - 1:
+            continue
+        values = {}
+        for field, index in columns.items():
+            values[field] = _number(row[index]) if index < len(row) else None
+        if values.get("wins") is None:
+            continue
+        skill = values.get("skill")
+        stats = ModeStats(row[0], values["wins"], values.get("ties") or 0, values.get("losses") or 0,
+                          -1 if skill is None else skill,
+                          map_name=row[map_column] if map_column is not None else None)
+        if map_column is not None:
+            page.maps.append(stats)
+        else:
+            page.modes.setdefault(stats.mode, stats)
+
+
+def parse_gcpd(html):
+    """
+    Разбирает страницу gcpd: таблицы generic_kv_table по заголовкам колонок, уровень/xp по подписям,
+    иначе по полям в данных страницы. page.variant — какой вид страницы распознан.
+    """
+    page = GcpdPage()
+    if not html:
+        return page
+
+    for rows in _kv_tables(html):
+        if rows:
+            _apply_table(page, rows)
+
+    page.level = _labelled_number(html, _RANK_LABEL) or 0
+    if page.level > 0:
+        page.xp = _labelled_number(html, _XP_LABEL) or 0
+        page.variant = VARIANT_TEXT
+        return page
+
+    for variant, level_pattern, xp_pattern in _JSON_FIELDS:
+        level_match = level_pattern.search(html)
+        if level_match:
+            xp_match = xp_pattern.search(html)
+            page.level = int(level_match.group(1))
+            page.xp = int(xp_match.group(1)) if xp_match else 0
+            page.variant = variant
+            return page
+
+    if page.modes or page.maps:
+        page.variant = VARIANT_TABLES_ONLY
+    elif 'type="password"' in html or "/login/" in html[:4000]:
+        page.variant = VARIANT_LOGIN
+    return page
+
+
+# -----------------------------
+# Corpus check / benchmark
+# -----------------------------
+# Сохранённые страницы gcpd (steamid/ник/IP заменены): имя файла -> ожидаемое (вид, уровень, xp, режимов, карт)
+CORPUS_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "gcpd_corpus")
+CORPUS_EXPECTED = {
+    "gcpd_accountmain.html": (VARIANT_TEXT, 14, 2109, 0, 0),
+    "gcpd_matchmaking.html": (VARIANT_TABLES_ONLY, 0, 0, 3, 4),
+    "gcpd_login_redirect.html": (VARIANT_LOGIN, 0, 0, 0, 0),
+}
+
+
+def _legacy_parse(html):
+    """Прежний разбор регулярками по всей странице — для сверки и сравнения времени."""
+    level, xp = 0, 0
+    for rank_pattern, xp_pattern in (
+        (r'CS:GO Profile Rank:\s*([\d,]+)', r'Experience points earned towards next rank:\s*([\d,]+)'),
+        (r'"profile_rank"[:\s]*(\d+)', r'"(?:current_)?xp"[:\s]*(\d+)'),
+        (r'"player_level"[:\s]*(\d+)', r'"experience_points"[:\s]*(\d+)'),
+    ):
+        rank_match = re.search(rank_pattern, html, re.IGNORECASE)
+        if rank_match:
+            xp_match = re.search(xp_pattern, html, re.IGNORECASE)
+            level = int(rank_match.group(1).replace(",", ""))
+            xp = int(xp_match.group(1).replace(",", "")) if xp_match else 0
+            break
+    modes = {}
+    for mode in ("Premier", "Wingman"):
+        match = re.search(rf'<td>{mode}</td><td>(\d+)</td><td>(\d+)</td><td>(\d+)</td><td>([^<]*)</td>', html)
+        if match:
+            modes[mode] = tuple(int(match.group(i)) for i in (1, 2, 3))
+    maps = []
+    table = re.search(r'<table class="generic_kv_table"><tr>\s*<th>Matchmaking Mode</th>\s*<th>Map</th>.*?</table>',
+                      html, re.DOTALL)
+    if table:
+        maps = re.findall(r'<tr>\s*<td>([^<]+)</td><td>([^<]+)</td><td>(\d+)</td><td>(\d+)</td><td>(\d+)</td><td>([^<]*)</td>',
+                          table.group(0))
+    return level, xp, modes, maps
+
+
+def sample_pages():
+    """Встроенный корпус: по странице на каждый известный вид (вёрстка как у gcpd и у SteamStandInServer)."""
+    filler = "<div class='profile_small_header_bg'><a href='/profiles/1'>x</a></div>" * 300
+    tables = (
+        "<table class=\"generic_kv_table\"><tr><th>Matchmaking Mode</th><th>Wins</th><th>Ties</th><th>Losses</th>"
+        "<th>Skill Group</th><th>Last Match</th><th>Region</th></tr>"
+        "<tr><td>Premier</td><td>41</td><td>2</td><td>30</td><td>14,210</td><td>2025-01-01 10:00:00 GMT</td><td>EU</td></tr>"
+        "<tr><td>Wingman</td><td>7</td><td>0</td><td>3</td><td></td><td>2025-01-02 10:00:00 GMT</td><td>EU</td></tr>"
+        "</table>"
+        "<table class=\"generic_kv_table\"><tr><th>Matchmaking Mode</th><th>Map</th><th>Wins</th><th>Ties</th>"
+        "<th>Losses</th><th>Skill Group</th><th>Last Match</th><th>Region</th></tr>"
+        "<tr><td>Competitive</td><td>de_mirage</td><td>5</td><td>1</td><td>4</td><td>12</td><td>2025-01-03</td><td>EU</td></tr>"
+        "<tr><td>Competitive</td><td>de_nuke</td><td>2</td><td>0</td><td>6</td><td></td><td>2025-01-04</td><td>EU</td></tr>"
+        "</table>"
+    )
+    return {
+        "text_level.html": (
+            f"<html><body>{filler}<div class=\"generic_kv_line\">CS:GO Profile Rank: 27</div>"
+            "<div class=\"generic_kv_line\">Experience points earned towards next rank: 3,412</div></body></html>",
+            (VARIANT_TEXT, 27, 3412, 0, 0),
+        ),
+        "text_matchmaking.html": (
+            f"<html><body>{filler}<div>CS:GO Profile Rank: 9</div>"
+            f"<div>Experience points earned towards next rank: 120</div>{tables}</body></html>",
+            (VARIANT_TEXT, 9, 120, 2, 2),
+        ),
+        "json_level.html": (
+            f"<html><body>{filler}<script>var g_rgProfileData = {{\"profile_rank\": 33, \"current_xp\": 871}};</script>"
+            "</body></html>",
+            (VARIANT_JSON, 33, 871, 0, 0),
+        ),
+        "player_level.html": (
+            f"<html><body>{filler}<script>window.cfg = {{\"player_level\":12,\"experience_points\":4500}}</script>"
+            "</body></html>",
+            (VARIANT_PLAYER_LEVEL, 12, 4500, 0, 0),
+        ),
+        "tables_only.html": (
+            f"<html><body>{filler}{tables}</body></html>",
+            (VARIANT_TABLES_ONLY, 0, 0, 2, 2),
+        ),
+        "login.html": (
+            "<html><body><form action=\"https://steamcommunity.com/login/dologin/\">"
+            "<input type=\"text\" name=\"username\"><input type=\"password\" name=\"password\"></form></body></html>",
+            (VARIANT_LOGIN, 0, 0, 0, 0),
+        ),
+    }
+
+
+def _folder_pages(folder, expected=None):
+    """Все *.html из папки; ожидаемые значения — из expected по имени файла (нет — только сверка с регулярками)."""
+    expected = expected or {}
+    pages = {}
+    for name in sorted(os.listdir(folder)):
+        if name.lower().endswith(".html"):
+            with open(os.path.join(folder, name), "r", encoding="utf-8", errors="replace") as f:
+                pages[name] = (f.read(), expected.get(name))
+    return pages
+
+
+def check_corpus(folder=None, repeat=200):
+    """
+    Без folder — встроенный корпус и сохранённые страницы из gcpd_corpus, у всех ожидаемые значения.
+    С folder — все *.html из папки (например GcpdDebugFolder из настроек): вид страницы и расхождения с прежними регулярками.
+    """
+    problems = []
+    if folder:
+        corpus = _folder_pages(folder)
+    else:
+        corpus = sample_pages()
+        saved = _folder_pages(CORPUS_FOLDER, CORPUS_EXPECTED) if os.path.isdir(CORPUS_FOLDER) else {}
+        problems.extend(f"{name}: нет файла в {CORPUS_FOLDER}" for name in CORPUS_EXPECTED if name not in saved)
+        corpus.update(saved)
+
+    variants = {}
+    parse_seconds = legacy_seconds = 0.0
+    total_bytes = 0
+    for name, (html, expected) in corpus.items():
+        page = parse_gcpd(html)
+        variants[name] = page.variant
+        total_bytes += len(html)
+        got = (page.variant, page.level, page.xp, len(page.modes), len(page.maps))
+        if expected is not None and got != expected:
+            problems.append(f"{name}: ожидалось {expected}, получено {got}")
+        legacy_level, legacy_xp, _, _ = _legacy_parse(html)
+        if (legacy_level, legacy_xp) != (page.level, page.xp):
+            problems.append(f"{name}: регулярки дают lvl {legacy_level} xp {legacy_xp}, парсер — {page.level} {page.xp}")
+
+        started = time.perf_counter()
+        for _ in range(repeat):
+            parse_gcpd(html)
+        parse_seconds += time.perf_counter() - started
+        started = time.perf_counter()
+        for _ in range(repeat):
+            _legacy_parse(html)
+        legacy_seconds += time.perf_counter() - started
+
+    pages = max(1, len(corpus) * repeat)
+    return {
+        "pages": len(corpus),
+        "avg_kb": round(total_bytes / max(1, len(corpus)) / 1024, 1),
+        "variants": variants,
+        "parse_us": round(parse_seconds / pages * 1e6, 1),
+        "legacy_regex_us": round(legacy_seconds / pages * 1e6, 1),
+        "problems": problems,
+    }
+
+
+if __name__ == "__main__":
+    result = check_corpus(sys.argv[1] if len(sys.argv) > 1 else None)
+    print(result)
+    sys.exit(1 if result["problems"] else 0)
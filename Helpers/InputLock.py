@@ -0,0 +1,7 @@
+import threading
+
+# Мышь, клавиатура и активное окно общие на всю ОС. Всё, что «активирует окно + шлёт ввод»
+# (UI-ходы групп лобби, auto accept, подъём окон, маршруты и ctrl+k GSI), делается под этим локом,
+# чтобы клики одной группы не попадали посреди зажатых W/A/S/D или ctrl+k другого матча.
+# RLock: хелперы внутри уже взятого лока (клик внутри хода группы) берут его повторно.
+INPUT_LOCK = threading.RLock()
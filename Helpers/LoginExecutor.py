@@ -8,13 +8,24 @@ import hmac
 import struct
 import hashlib
 import os
+from urllib.parse import unquote, urlparse
 from requests.cookies import RequestsCookieJar
 
 class SteamLoginSession:
-    def __init__(self, username: str = None, password: str = None, shared_secret: str = None):
+    # Base URLs; overridden per instance to talk to a local stand-in server (offline tests/benchmarks)
+    COMMUNITY_URL = "https://steamcommunity.com"
+    API_URL = "https://api.steampowered.com"
+    LOGIN_URL = "https://login.steampowered.com"
+    POLL_INTERVAL = 1.0
+
+    def __init__(self, username: str = None, password: str = None, shared_secret: str = None, urls: dict = None):
         self.username = username
         self.password = password
         self.shared_secret = shared_secret
+        urls = urls or {}
+        self.community_url = urls.get("community", self.COMMUNITY_URL)
+        self.api_url = urls.get("api", self.API_URL)
+        self.login_url = urls.get("login", self.LOGIN_URL)
         self.session = requests.Session()
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) '
@@ -81,6 +92,8 @@ class SteamLoginSession:
 
         data[self.username] = {
             "steamid": self.steamid,
+            "refresh_token": self.refresh_token,
+            "saved_at": int(time.time()),
             "cookies": cookies_list
         }
 
@@ -90,10 +103,12 @@ class SteamLoginSession:
             json.dump(data, f, indent=2, ensure_ascii=False)
         os.replace(tmp, file_path)
 
-    def load_session(self, file_path: str) -> bool:
+    def load_session(self, file_path: str, validate: bool = True) -> bool:
         """
         Load session for self.username.
         Returns True if the restored session appears logged in.
+        With validate=False no request is made: True means cookies were restored,
+        check access_token_expires_at() to see whether they are still usable.
         Backwards-compatible: supports old format where `cookies` was a dict {name: value}.
         """
         if not self.username:
@@ -143,9 +158,10 @@ class SteamLoginSession:
             # unknown cookie format
             return False
 
-        # restore steamid if saved
+        # restore steamid / refresh token if saved
         saved_steamid = entry.get("steamid")
         self.steamid = saved_steamid or None
+        self.refresh_token = entry.get("refresh_token") or None
 
         # ensure we have sessionid value (update self.session_id if present in cookies)
         for cookie in self.session.cookies:
@@ -153,6 +169,9 @@ class SteamLoginSession:
                 self.session_id = cookie.value
                 break
 
+        if not validate:
+            return True
+
         # if steamid is missing, try to discover it from the session
         if not self.steamid:
             self.steamid = self._discover_steamid()
@@ -167,7 +186,7 @@ class SteamLoginSession:
         Returns steamid as string or None.
         """
         try:
-            r = self.session.get("https://steamcommunity.com/my/home", allow_redirects=True, timeout=10)
+            r = self.session.get(f"{self.community_url}/my/home", allow_redirects=True, timeout=10)
             final_url = r.url or ""
             m = re.search(r"/profiles/(\d+)", final_url)
             if m:
@@ -176,17 +195,51 @@ class SteamLoginSession:
             pass
         # fallback: maybe we can parse the page content for steamid embedded in HTML (rare)
         try:
-            r = self.session.get("https://steamcommunity.com/", timeout=10)
+            r = self.session.get(f"{self.community_url}/", timeout=10)
             m2 = re.search(r"g_steamID = \"(\d+)\"", r.text)
             if m2:
                 return m2.group(1)
         except Exception:
             pass
         return None
+    # ======================= TOKENS =======================
+
+    @staticmethod
+    def _jwt_expiry(token) -> int:
+        """exp from a Steam JWT (no signature check), 0 if it can't be read."""
+        try:
+            payload = token.split(".")[1]
+            payload += "=" * (-len(payload) % 4)
+            return int(json.loads(base64.urlsafe_b64decode(payload)).get("exp", 0))
+        except Exception:
+            return 0
+
+    def access_token_expires_at(self) -> int:
+        """Expiry of the steamLoginSecure cookie on the community host (0 — no cookie)."""
+        host = urlparse(self.community_url).hostname or ""
+        for cookie in self.session.cookies:
+            if cookie.name == "steamLoginSecure" and host in (cookie.domain or ""):
+                value = unquote(cookie.value or "")
+                return self._jwt_expiry(value.split("||", 1)[-1])
+        return 0
+
+    def refresh_token_expires_at(self) -> int:
+        return self._jwt_expiry(self.refresh_token) if self.refresh_token else 0
+
+    def refresh(self):
+        """
+        New web cookies from the saved refresh token: sessionid + finalizelogin,
+        without RSA, Steam Guard and polling.
+        """
+        if not self.refresh_token:
+            raise RuntimeError("Нет refresh_token для обновления сессии")
+        self._init_sessionid()
+        self._finalize_login()
+
     # ======================= PRIVATE =======================
 
     def _init_sessionid(self):
-        r = self.session.get("https://steamcommunity.com/")
+        r = self.session.get(f"{self.community_url}/")
         cookies = self.session.cookies.get_dict()
         self.session_id = cookies.get('sessionid')
         if not self.session_id:
@@ -194,7 +247,7 @@ class SteamLoginSession:
 
     def _get_rsa_key(self):
         r = self.session.get(
-            f"https://api.steampowered.com/IAuthenticationService/GetPasswordRSAPublicKey/v1/?account_name={self.username}"
+            f"{self.api_url}/IAuthenticationService/GetPasswordRSAPublicKey/v1/?account_name={self.username}"
         )
         js = r.json()["response"]
         mod = int(js["publickey_mod"], 16)
@@ -219,7 +272,7 @@ class SteamLoginSession:
         }
 
         r = self.session.post(
-            "https://api.steampowered.com/IAuthenticationService/BeginAuthSessionViaCredentials/v1",
+            f"{self.api_url}/IAuthenticationService/BeginAuthSessionViaCredentials/v1",
             data=data
         )
         if r.status_code != 200:
@@ -258,7 +311,7 @@ class SteamLoginSession:
             'code': code
         }
         r = self.session.post(
-            "https://api.steampowered.com/IAuthenticationService/UpdateAuthSessionWithSteamGuardCode/v1/",
+            f"{self.api_url}/IAuthenticationService/UpdateAuthSessionWithSteamGuardCode/v1/",
             data=data
         )
         if r.status_code != 200:
@@ -267,27 +320,27 @@ class SteamLoginSession:
     def _poll_for_tokens(self):
         for _ in range(30):
             r = self.session.post(
-                "https://api.steampowered.com/IAuthenticationService/PollAuthSessionStatus/v1/",
+                f"{self.api_url}/IAuthenticationService/PollAuthSessionStatus/v1/",
                 data={'client_id': self.client_id, 'request_id': self.request_id}
             )
             if r.status_code != 200:
-                time.sleep(1)
+                time.sleep(self.POLL_INTERVAL)
                 continue
 
             resp = r.json().get("response", {})
             if "refresh_token" in resp:
                 self.refresh_token = resp["refresh_token"]
                 return
-            time.sleep(1)
+            time.sleep(self.POLL_INTERVAL)
         raise TimeoutError("Не удалось получить refresh_token за отведённое время.")
 
     def _finalize_login(self):
         data = {
             'nonce': self.refresh_token,
             'sessionid': self.session_id,
-            'redir': 'https://steamcommunity.com/login/home/?goto='
+            'redir': f'{self.community_url}/login/home/?goto='
         }
-        r = self.session.post("https://login.steampowered.com/jwt/finalizelogin", data=data)
+        r = self.session.post(f"{self.login_url}/jwt/finalizelogin", data=data)
         if r.status_code == 403:
             raise RuntimeError("403 при финализации входа. Проверьте правильность токенов.")
         if r.status_code != 200:
@@ -310,7 +363,7 @@ class SteamLoginSession:
         """
         try:
             if self.steamid:
-                r = self.session.get(f"https://steamcommunity.com/profiles/{self.steamid}/home", timeout=10)
+                r = self.session.get(f"{self.community_url}/profiles/{self.steamid}/home", timeout=10)
                 return r.status_code == 200
             # try to discover steamid and then validate
             discovered = self._discover_steamid()
@@ -1,9 +1,5 @@
 import time
 
-import pyautogui
-
-
-import pyautogui
 import win32gui
 import win32con
 import ctypes
@@ -35,6 +31,9 @@ class MouseHelper:
             return
         screen_x = client_rect[0] + x
         screen_y = client_rect[1] + y
+        # pyautogui тянет PIL/pyscreeze — грузим при первом движении мыши, не при старте
+        import pyautogui
+
         pyautogui.moveTo(screen_x, screen_y)
 
     @staticmethod
@@ -42,6 +41,8 @@ class MouseHelper:
         """
         Кликает мышью в координаты (x, y) относительно клиентской области окна.
         """
+        import pyautogui
+
         MouseHelper.MoveMouse(hwnd, x, y)
         pyautogui.click(button=button)
 
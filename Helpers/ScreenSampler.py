@@ -0,0 +1,287 @@
+import os
+import sys
+import time
+
+import numpy as np
+
+
+class ScreenFrame:
+    """Один снимок экрана: пиксели объединённого прямоугольника всех окон + frame_id."""
+
+    __slots__ = ("frame_id", "left", "top", "pixels", "ts")
+
+    def __init__(self, frame_id, left, top, pixels, ts):
+        self.frame_id = frame_id
+        self.left = left
+        self.top = top
+        self.pixels = pixels
+        self.ts = ts
+
+    @property
+    def right(self):
+        return self.left + self.pixels.shape[1]
+
+    @property
+    def bottom(self):
+        return self.top + self.pixels.shape[0]
+
+    def covers(self, bbox):
+        return (
+            bbox[0] >= self.left and bbox[1] >= self.top
+            and bbox[2] <= self.right and bbox[3] <= self.bottom
+        )
+
+
+class PilScreenGrabber:
+    """Реальный захват через PIL.ImageGrab."""
+
+    def __init__(self):
+        from PIL import ImageGrab
+
+        self._image_grab = ImageGrab
+
+    def grab(self, bbox):
+        # all_screens: без него захватывается только основной монитор, а окна на остальных
+        # (в том числе с отрицательными координатами) приходят чёрными и читаются как «red»
+        return np.asarray(self._image_grab.grab(bbox=bbox, all_screens=True).convert("RGB"))
+
+
+class ReplayScreenGrabber:
+    """
+    Проигрывает сохранённые скриншоты — для бенчмарков без Windows.
+    Как и настоящий grab, возвращает копию пикселей; grab_overhead_ms имитирует
+    фиксированную стоимость одного BitBlt/GDI-вызова.
+    """
+
+    def __init__(self, screenshots, grab_overhead_ms=0.0):
+        self.screenshots = [np.asarray(s)[..., :3] for s in screenshots]
+        self.grab_overhead = grab_overhead_ms / 1000
+        self.grab_calls = 0
+        self._index = 0
+
+    @classmethod
+    def from_directory(cls, path, grab_overhead_ms=0.0):
+        from PIL import Image
+
+        images = []
+        for name in sorted(os.listdir(path)):
+            if name.lower().endswith((".png", ".bmp", ".jpg", ".jpeg")):
+                with Image.open(os.path.join(path, name)) as img:
+                    images.append(np.asarray(img.convert("RGB")))
+        return cls(images, grab_overhead_ms)
+
+    def next_screen(self):
+        self._index = (self._index + 1) % len(self.screenshots)
+
+    def grab(self, bbox):
+        self.grab_calls += 1
+        if self.grab_overhead:
+            time.sleep(self.grab_overhead)
+        screen = self.screenshots[self._index]
+        left, top, right, bottom = bbox
+        return screen[max(0, top):max(0, bottom), max(0, left):max(0, right)].copy()
+
+
+class ScreenSampler:
+    """
+    Состояние кнопок (red/green) для всех точек всех окон за один захват.
+    Кадр переиспользуется, пока ему меньше max_age и он покрывает запрошенные окна,
+    поэтому повторные запросы в пределах одного тика не делают новый grab.
+    """
+
+    PATCH_DY = np.array([0, 0, 1, 1])
+    PATCH_DX = np.array([0, 1, 0, 1])
+
+    def __init__(self, grabber=None, max_age=0.05):
+        self._grabber = grabber
+        self.max_age = max_age
+        self._frame = None
+        self._next_frame_id = 1
+
+        self.grabs = 0
+        self.reuses = 0
+        self.last_grab_seconds = 0.0
+        self.last_classify_seconds = 0.0
+
+    def _get_grabber(self):
+        if self._grabber is None:
+            self._grabber = PilScreenGrabber()
+        return self._grabber
+
+    def invalidate(self):
+        """Сбросить кадр (например, после клика, который меняет кнопку)."""
+        self._frame = None
+
+    @staticmethod
+    def union_bbox(rects):
+        rects = [r for r in rects if r and r[2] > r[0] and r[3] > r[1]]
+        if not rects:
+            return None
+        return (
+            min(r[0] for r in rects),
+            min(r[1] for r in rects),
+            max(r[2] for r in rects),
+            max(r[3] for r in rects),
+        )
+
+    def frame_for(self, rects):
+        bbox = self.union_bbox(rects)
+        if bbox is None:
+            return None
+
+        frame = self._frame
+        if frame is not None and time.time() - frame.ts < self.max_age and frame.covers(bbox):
+            self.reuses += 1
+            return frame
+
+        started = time.perf_counter()
+        pixels = np.ascontiguousarray(self._get_grabber().grab(bbox))
+        self.last_grab_seconds = time.perf_counter() - started
+        self.grabs += 1
+
+        frame = ScreenFrame(self._next_frame_id, bbox[0], bbox[1], pixels, time.time())
+        self._next_frame_id += 1
+        self._frame = frame
+        return frame
+
+    # -----------------------------
+    # Classification
+    # -----------------------------
+    def average_colors(self, frame, points):
+        """
+        Средний цвет 2x2 от каждой абсолютной точки (x, y). Возвращает (colors Nx3 int, valid N bool).
+        """
+        pts = np.asarray(points, dtype=np.int64).reshape(-1, 2)
+        xs = pts[:, 0] - frame.left
+        ys = pts[:, 1] - frame.top
+        height, width = frame.pixels.shape[:2]
+        valid = (xs >= 0) & (ys >= 0) & (xs + 1 < width) & (ys + 1 < height)
+
+        xs = np.where(valid, xs, 0)
+        ys = np.where(valid, ys, 0)
+        patches = frame.pixels[ys[:, None] + self.PATCH_DY, xs[:, None] + self.PATCH_DX, :3]
+        colors = patches.astype(np.int32).sum(axis=1) // 4
+        return colors, valid
+
+    @staticmethod
+    def classify_colors(colors):
+        """red / green как в старом button_state: всё, что не явно зелёное, — red."""
+        r, g, b = colors[:, 0], colors[:, 1], colors[:, 2]
+        green = (g > r + 20) & (g > b + 20)
+        return np.where(green, "green", "red")
+
+    def sample_states(self, probes):
+        """
+        probes: {key: (rect, x, y)} — точка относительно левого верхнего угла окна.
+        Возвращает ({key: "red"|"green"|None}, frame_id).
+        """
+        if not probes:
+            return {}, None
+
+        keys = list(probes)
+        rects = [probes[k][0] for k in keys]
+        try:
+            frame = self.frame_for(rects)
+        except Exception:
+            self._frame = None
+            raise
+        if frame is None:
+            return {k: None for k in keys}, None
+
+        started = time.perf_counter()
+        points = [(rect[0] + x, rect[1] + y) for rect, x, y in (probes[k] for k in keys)]
+        colors, valid = self.average_colors(frame, points)
+        labels = self.classify_colors(colors)
+        self.last_classify_seconds = time.perf_counter() - started
+
+        return {
+            key: (str(labels[i]) if valid[i] else None)
+            for i, key in enumerate(keys)
+        }, frame.frame_id
+
+    def stats(self):
+        return {
+            "grabs": self.grabs,
+            "reuses": self.reuses,
+            "frame_id": self._frame.frame_id if self._frame else 0,
+            "last_grab_ms": self.last_grab_seconds * 1000,
+            "last_classify_ms": self.last_classify_seconds * 1000,
+        }
+
+
+def _synthetic_screens(count=8, windows=4, seed=0):
+    rnd = np.random.default_rng(seed)
+    width = 5 * 383
+    height = ((windows + 4) // 5) * 288
+    screens = []
+    for _ in range(count):
+        screen = rnd.integers(0, 60, size=(height, width, 3), dtype=np.uint8)
+        for i in range(windows):
+            left = (i % 5) * 383
+            top = (i // 5) * 288
+            color = (200, 40, 40) if rnd.random() < 0.5 else (40, 200, 40)
+            screen[top + 265:top + 278, left + 280:left + 300] = color
+        screens.append(screen)
+    return screens
+
+
+def benchmark(screenshots_dir=None, windows=4, ticks=200, probe=(289, 271), grab_overhead_ms=0.0):
+    """
+    Старый путь (grab 2x2 на каждую точку + цикл по пикселям) против одного grab на тик + NumPy.
+    Окна раскладываются сеткой 383x288 по 5 в ряд.
+    Запуск: python -m Helpers.ScreenSampler [папка со скриншотами]
+    """
+    if screenshots_dir:
+        grabber = ReplayScreenGrabber.from_directory(screenshots_dir, grab_overhead_ms)
+    else:
+        grabber = ReplayScreenGrabber(_synthetic_screens(windows=windows), grab_overhead_ms)
+    rects = [((i % 5) * 383, (i // 5) * 288, (i % 5) * 383 + 383, (i // 5) * 288 + 288) for i in range(windows)]
+
+    # Старый путь: по grab на окно (для каждой точки), среднее через попиксельный цикл
+    legacy_states = []
+    grabber._index = 0
+    started = time.perf_counter()
+    for _ in range(ticks):
+        grabber.next_screen()
+        for rect in rects:
+            left, top = rect[0] + probe[0], rect[1] + probe[1]
+            img = grabber.grab((left, top, left + 2, top + 2))
+            r_sum = g_sum = b_sum = count = 0
+            for px in range(img.shape[1]):
+                for py in range(img.shape[0]):
+                    r, g, b = (int(v) for v in img[py, px, :3])
+                    r_sum += r
+                    g_sum += g
+                    b_sum += b
+                    count += 1
+            r, g, b = r_sum // count, g_sum // count, b_sum // count
+            legacy_states.append("green" if g > r + 20 and g > b + 20 else "red")
+    legacy_seconds = time.perf_counter() - started
+    legacy_grabs = grabber.grab_calls
+
+    grabber.grab_calls = 0
+    grabber._index = 0
+    sampler = ScreenSampler(grabber, max_age=0)
+    batched_states = []
+    started = time.perf_counter()
+    for _ in range(ticks):
+        grabber.next_screen()
+        states, _ = sampler.sample_states({i: (rect, probe[0], probe[1]) for i, rect in enumerate(rects)})
+        batched_states.extend(states[i] for i in range(len(rects)))
+    batched_seconds = time.perf_counter() - started
+
+    return {
+        "windows": windows,
+        "ticks": ticks,
+        "legacy_grabs": legacy_grabs,
+        "legacy_ms_per_tick": legacy_seconds / ticks * 1000,
+        "batched_grabs": grabber.grab_calls,
+        "batched_ms_per_tick": batched_seconds / ticks * 1000,
+        "same_states": legacy_states == batched_states,
+    }
+
+
+if __name__ == "__main__":
+    path = sys.argv[1] if len(sys.argv) > 1 else None
+    for windows, overhead in ((4, 0.0), (20, 0.0), (4, 15.0), (20, 15.0)):
+        print(benchmark(path, windows=windows, ticks=50 if overhead else 200, grab_overhead_ms=overhead))
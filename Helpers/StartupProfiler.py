@@ -0,0 +1,123 @@
+import json
+import os
+import subprocess
+import sys
+
+# Что импортирует main.py до первого окна, в том же порядке
+STARTUP_MODULES = (
+    "Managers.GSIManager",
+    "Managers.ProcessManager",
+    "Managers.VideoConfigManager",
+    "ui.app",
+)
+# Тяжёлые зависимости, которые должны грузиться только при первом действии своей подсистемы
+LAZY_MODULES = (
+    "pyautogui",
+    "pydirectinput",
+    "pywinauto",
+    "pygetwindow",
+    "pyperclip",
+    "keyboard",
+    "wmi",
+    "win32com.client",
+    "numpy",
+    "PIL",
+    "requests",
+    "flask",
+)
+# Холодный старт до готового окна (импорты + конструкторы), мс
+STARTUP_BUDGET_MS = 1500
+
+# Выполняется в отдельном интерпретаторе: там ещё ничего не импортировано
+_CHILD = r"""
+import json, sys, time
+
+modules, lazy = json.loads(sys.argv[1]), json.loads(sys.argv[2])
+result = {"import_ms": {}, "construct_ms": {}, "errors": {}}
+
+def timed(section, name, func):
+    started = time.perf_counter()
+    try:
+        value = func()
+    except Exception as e:
+        result["errors"][name] = f"{type(e).__name__}: {e}"
+        value = None
+    result[section][name] = round((time.perf_counter() - started) * 1000, 1)
+    return value
+
+for name in modules:
+    timed("import_ms", name, lambda: __import__(name))
+
+from Managers.GSIManager import GSIManager
+from Managers.ProcessManager import ProcessManager
+
+timed("construct_ms", "ProcessManager", lambda: ProcessManager().start())
+gsi = timed("construct_ms", "GSIManager", GSIManager)
+
+def build_app():
+    from ui.app import App
+    app = App(gsi_manager=gsi)
+    app.update()
+    return app
+
+app = timed("construct_ms", "App", build_app)
+if app is not None:
+    app.destroy()
+
+result["lazy_loaded"] = [name for name in lazy if name in sys.modules]
+print("STARTUP_RESULT " + json.dumps(result))
+"""
+
+
+def _parse_importtime(stderr):
+    """-X importtime: собственное время импорта (self, мкс) по пакетам верхнего уровня."""
+    by_package = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        parts = [part.strip() for part in line[len("import time:"):].split("|")]
+        if len(parts) != 3 or not parts[0].isdigit():
+            continue
+        package = parts[2].split(".")[0]
+        by_package[package] = by_package.get(package, 0) + int(parts[0])
+    return {package: round(us / 1000, 1) for package, us in by_package.items()}
+
+
+def benchmark(budget_ms=STARTUP_BUDGET_MS, top=15, cwd=None):
+    """
+    Холодный старт в новом процессе: время импорта каждого модуля из main.py, конструкторов
+    (ProcessManager, GSIManager, App до первого отрисованного окна) и по пакетам из -X importtime.
+    Проверки: сумма не больше budget_ms, ни один модуль из LAZY_MODULES не загружен.
+    """
+    root = cwd or os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [root, env.get("PYTHONPATH")]))
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _CHILD, json.dumps(STARTUP_MODULES), json.dumps(LAZY_MODULES)],
+        cwd=root, env=env, capture_output=True, text=True, timeout=300,
+    )
+    line = next((item for item in proc.stdout.splitlines() if item.startswith("STARTUP_RESULT ")), None)
+    if line is None:
+        return {"problems": [f"процесс замера упал (код {proc.returncode})"], "stderr_tail": proc.stderr[-2000:]}
+
+    result = json.loads(line[len("STARTUP_RESULT "):])
+    packages = _parse_importtime(proc.stderr)
+    result["slowest_packages_ms"] = dict(sorted(packages.items(), key=lambda item: -item[1])[:top])
+    total = sum(result["import_ms"].values()) + sum(result["construct_ms"].values())
+    result["total_ms"] = round(total, 1)
+    result["budget_ms"] = budget_ms
+
+    problems = []
+    if total > budget_ms:
+        problems.append(f"старт {total:.0f} мс > бюджета {budget_ms} мс")
+    if result["lazy_loaded"]:
+        problems.append(f"при старте загружены: {', '.join(result['lazy_loaded'])}")
+    problems.extend(f"{name}: {error}" for name, error in result["errors"].items())
+    result["problems"] = problems
+    return result
+
+
+if __name__ == "__main__":
+    result = benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else STARTUP_BUDGET_MS)
+    print(result)
+    sys.exit(1 if result["problems"] else 0)
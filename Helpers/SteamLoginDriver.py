@@ -0,0 +1,168 @@
+import time
+
+from Helpers.MouseController import MouseHelper
+from Managers.ProcessManager import ProcessManager
+from Managers.WindowManager import WindowManager
+
+
+class SteamLoginDriver:
+    """
+    Проходит диалоги логина Steam одного аккаунта.
+    Держит UIA-подключение к каждому процессу Steam, ищет только известные контролы
+    (через фильтр control_type, а не полный descendants()) и пропускает тик,
+    если набор окон не менялся и на прошлом тике делать было нечего.
+    """
+
+    EXCLUDE_TITLES = {"Steam", "Friends List", "Special Offers"}
+    # Даже при неизменном наборе окон раз в N тиков перепроверяем содержимое диалога
+    FULL_CHECK_EVERY = 10
+
+    def __init__(self, account):
+        self.account = account
+        self._apps = {}
+        self._last_signature = None
+        self._last_acted = True
+        self._ticks_since_check = 0
+
+        self.ticks = 0
+        self.skipped = 0
+        self.actions = 0
+        self.last_tick_seconds = 0.0
+        self.max_tick_seconds = 0.0
+        self._total_tick_seconds = 0.0
+
+    # -----------------------------
+    # Tick
+    # -----------------------------
+    def _collect_windows(self, steam_pid):
+        pids = [steam_pid] + [info.pid for info in ProcessManager().get_children(steam_pid, recursive=True)]
+        window_manager = WindowManager()
+        windows = []
+        for pid in pids:
+            for info in window_manager.get_windows_by_pid(pid):
+                if info.title not in self.EXCLUDE_TITLES:
+                    windows.append((pid, info.hwnd, info.title))
+        return windows
+
+    def tick(self, steam_pid):
+        started = time.perf_counter()
+        try:
+            windows = self._collect_windows(steam_pid)
+            signature = frozenset(windows)
+            self._ticks_since_check += 1
+            if (
+                signature == self._last_signature
+                and not self._last_acted
+                and self._ticks_since_check < self.FULL_CHECK_EVERY
+            ):
+                self.skipped += 1
+                return False
+
+            self._last_signature = signature
+            self._ticks_since_check = 0
+            self._drop_dead_connections({pid for pid, _, _ in windows})
+
+            acted = False
+            for pid, hwnd, _ in windows:
+                try:
+                    acted = self._handle_window(pid, hwnd) or acted
+                except Exception as e:
+                    print(f"Не удалось обработать окно {hwnd} (PID {pid}): {e}")
+                    self._apps.pop(pid, None)
+            self._last_acted = acted
+            if acted:
+                # Диалог поменялся — следующий тик должен увидеть новый набор окон
+                WindowManager().invalidate()
+            return acted
+        finally:
+            elapsed = time.perf_counter() - started
+            self.ticks += 1
+            self.last_tick_seconds = elapsed
+            self.max_tick_seconds = max(self.max_tick_seconds, elapsed)
+            self._total_tick_seconds += elapsed
+
+    def _drop_dead_connections(self, alive_pids):
+        for pid in list(self._apps):
+            if pid not in alive_pids:
+                del self._apps[pid]
+
+    def _get_app(self, pid):
+        app = self._apps.get(pid)
+        if app is None:
+            # pywinauto (comtypes/UIA) грузится при первом логине, а не при старте панели
+            from pywinauto import Application
+
+            app = Application(backend="uia").connect(process=pid)
+            self._apps[pid] = app
+        return app
+
+    # -----------------------------
+    # Dialogs
+    # -----------------------------
+    @staticmethod
+    def _find_by_text(elements, text):
+        text = text.lower()
+        return next((e for e in elements if e.window_text().strip().lower() == text), None)
+
+    def _handle_window(self, pid, hwnd):
+        account = self.account
+        win = self._get_app(pid).window(handle=hwnd).wrapper_object()
+        acted = False
+
+        buttons = win.descendants(control_type="Button")
+
+        sign_in_button = self._find_by_text(buttons, "Sign in")
+        if sign_in_button is not None:
+            edits = win.descendants(control_type="Edit")
+            if len(edits) == 2:
+                win.set_focus()
+                edits[0].set_text(account.login)
+                edits[1].set_text(account.password)
+                sign_in_button.click()
+                self.actions += 1
+                time.sleep(2)
+                return True
+
+        for caption in ("Play anyway", "No thanks"):
+            target = self._find_by_text(buttons, caption)
+            if target is not None:
+                target.click()
+                self.actions += 1
+                acted = True
+
+        statics = win.descendants(control_type="Text")
+
+        code_instead = self._find_by_text(statics, "Enter a code instead")
+        if code_instead is not None:
+            code_instead.click_input()
+            self.actions += 1
+            acted = True
+
+        guard_prompt = self._find_by_text(statics, "Enter the code from your Steam Mobile App")
+        if guard_prompt is not None and account.shared_secret is not None:
+            import pyperclip
+
+            win.set_focus()
+            pyperclip.copy(account.get_auth_code())
+            time.sleep(0.1)
+            MouseHelper.PasteText()
+            self.actions += 1
+            acted = True
+
+        return acted
+
+    # -----------------------------
+    # Metrics
+    # -----------------------------
+    def stats(self):
+        processed = self.ticks - self.skipped
+        return {
+            "ticks": self.ticks,
+            "skipped": self.skipped,
+            "actions": self.actions,
+            "connections": len(self._apps),
+            "last_tick_ms": self.last_tick_seconds * 1000,
+            "avg_tick_ms": (self._total_tick_seconds / self.ticks * 1000) if self.ticks else 0.0,
+            "max_tick_ms": self.max_tick_seconds * 1000,
+            "processed": processed,
+        }
@@ -0,0 +1,279 @@
+import base64
+import hashlib
+import hmac
+import json
+import re
+import secrets
+import struct
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlparse
+
+import rsa
+
+
+def _jwt(claims):
+    """Токен в формате Steam JWT (подпись не проверяется — клиент читает только exp)."""
+    def part(data):
+        return base64.urlsafe_b64encode(json.dumps(data).encode("utf-8")).decode("ascii").rstrip("=")
+    return f"{part({'typ': 'JWT', 'alg': 'EdDSA'})}.{part(claims)}.{secrets.token_urlsafe(16)}"
+
+
+def _guard_code(shared_secret, timestamp):
+    hmac_hash = hmac.new(base64.b64decode(shared_secret), struct.pack(">Q", int(timestamp) // 30), hashlib.sha1).digest()
+    start = hmac_hash[19] & 0x0F
+    full_code = struct.unpack(">I", hmac_hash[start:start + 4])[0] & 0x7FFFFFFF
+    chars = "23456789BCDFGHJKMNPQRTVWXY"
+    code = ""
+    for _ in range(5):
+        code += chars[full_code % len(chars)]
+        full_code //= len(chars)
+    return code
+
+
+class StandInAccount:
+    __slots__ = ("login", "password", "shared_secret", "steamid", "level", "xp")
+
+    def __init__(self, login, password, shared_secret, steamid, level=1, xp=0):
+        self.login = login
+        self.password = password
+        self.shared_secret = shared_secret
+        self.steamid = str(steamid)
+        self.level = level
+        self.xp = xp
+
+
+class SteamStandInServer:
+    """
+    Локальный стенд вместо Steam для офлайн-проверок SteamLoginSession / SteamSessionVault / SteamBatchClient.
+    Повторяет то, что нужно клиенту: sessionid, RSA-ключ, BeginAuthSession + Steam Guard, poll, finalizelogin
+    с transfer_info, и gcpd-страницы (уровень, Premier/Wingman, карты) — только с живым steamLoginSecure.
+    latency — задержка каждого ответа (имитация сети), polls_until_token — сколько poll'ов ответить «ещё нет».
+    """
+
+    def __init__(self, accounts, host="127.0.0.1", port=0, latency=0.0, polls_until_token=0,
+                 access_ttl=24 * 3600, refresh_ttl=200 * 24 * 3600):
+        self.accounts = {account.login: account for account in accounts}
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.polls_until_token = polls_until_token
+        self.access_ttl = access_ttl
+        self.refresh_ttl = refresh_ttl
+
+        self._public_key, self._private_key = rsa.newkeys(512)
+        self._lock = threading.Lock()
+        # client_id -> {"login", "request_id", "guard_ok", "polls"}
+        self._auth_sessions = {}
+        # refresh_token -> login
+        self._refresh_tokens = {}
+        self._revoked_steamids = set()
+        self._server = None
+        self._thread = None
+
+        self.hits = {}
+
+    @property
+    def url(self):
+        return f"http://{self.host}:{self.port}"
+
+    @property
+    def urls(self):
+        """Для SteamLoginSession(urls=...) / SteamSessionVault.create_isolated(urls=...)."""
+        return {"community": self.url, "api": self.url, "login": self.url}
+
+    def start(self):
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                stand_in._handle(self, "GET")
+
+            def do_POST(self):
+                stand_in._handle(self, "POST")
+
+        self._server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+        self._server = None
+        self._thread = None
+
+    def revoke(self, login):
+        """Отозвать веб-сессии аккаунта: gcpd отправляет на логин до нового finalizelogin."""
+        with self._lock:
+            self._revoked_steamids.add(self.accounts[login].steamid)
+
+    # -----------------------------
+    # HTTP
+    # -----------------------------
+    def _handle(self, request, method):
+        if self.latency:
+            time.sleep(self.latency)
+        parsed = urlparse(request.path)
+        path = parsed.path.rstrip("/") or "/"
+        query = {key: values[0] for key, values in parse_qs(parsed.query).items()}
+        form = {}
+        if method == "POST":
+            length = int(request.headers.get("Content-Length") or 0)
+            form = {key: values[0] for key, values in parse_qs(request.rfile.read(length).decode("utf-8")).items()}
+        cookies = {}
+        for item in (request.headers.get("Cookie") or "").split(";"):
+            if "=" in item:
+                name, value = item.strip().split("=", 1)
+                cookies[name] = value
+
+        key = re.sub(r"/profiles/\d+", "/profiles/*", path)
+        with self._lock:
+            self.hits[key] = self.hits.get(key, 0) + 1
+
+        try:
+            status, body, headers = self._route(method, path, query, form, cookies)
+        except Exception as e:
+            status, body, headers = 500, json.dumps({"error": str(e)}), {}
+
+        data = body.encode("utf-8") if isinstance(body, str) else body
+        request.send_response(status)
+        for name, value in headers.items():
+            request.send_header(name, value)
+        request.send_header("Content-Length", str(len(data)))
+        request.end_headers()
+        request.wfile.write(data)
+
+    @staticmethod
+    def _json(data, status=200):
+        return status, json.dumps(data), {"Content-Type": "application/json"}
+
+    def _route(self, method, path, query, form, cookies):
+        if path == "/" and method == "GET":
+            headers = {"Content-Type": "text/html"}
+            if "sessionid" not in cookies:
+                headers["Set-Cookie"] = f"sessionid={secrets.token_hex(12)}; Path=/"
+            return 200, "<html>stand-in community</html>", headers
+
+        if path.endswith("GetPasswordRSAPublicKey/v1"):
+            return self._json({"response": {
+                "publickey_mod": format(self._public_key.n, "x"),
+                "publickey_exp": format(self._public_key.e, "x"),
+                "timestamp": str(int(time.time())),
+            }})
+
+        if path.endswith("BeginAuthSessionViaCredentials/v1"):
+            account = self.accounts.get(form.get("account_name"))
+            password = rsa.decrypt(base64.b64decode(form.get("encrypted_password", "")), self._private_key)
+            if account is None or password.decode("utf-8") != account.password:
+                return self._json({"response": {}}, status=401)
+            client_id = secrets.token_hex(8)
+            with self._lock:
+                self._auth_sessions[client_id] = {
+                    "login": account.login, "request_id": secrets.token_hex(8), "guard_ok": False, "polls": 0,
+                }
+                request_id = self._auth_sessions[client_id]["request_id"]
+            return self._json({"response": {"client_id": client_id, "steamid": account.steamid, "request_id": request_id}})
+
+        if path.endswith("UpdateAuthSessionWithSteamGuardCode/v1"):
+            auth = self._auth_sessions.get(form.get("client_id"))
+            if auth is None:
+                return self._json({}, status=400)
+            account = self.accounts[auth["login"]]
+            now = time.time()
+            # как Steam: принимаем код текущего и соседних 30-секундных окон
+            if form.get("code") not in {_guard_code(account.shared_secret, now + shift) for shift in (-30, 0, 30)}:
+                return self._json({}, status=400)
+            auth["guard_ok"] = True
+            return self._json({"response": {}})
+
+        if path.endswith("PollAuthSessionStatus/v1"):
+            auth = self._auth_sessions.get(form.get("client_id"))
+            if auth is None or auth["request_id"] != form.get("request_id") or not auth["guard_ok"]:
+                return self._json({"response": {}})
+            auth["polls"] += 1
+            if auth["polls"] <= self.polls_until_token:
+                return self._json({"response": {}})
+            account = self.accounts[auth["login"]]
+            refresh_token = _jwt({"sub": account.steamid, "aud": ["web", "renew"],
+                                  "exp": int(time.time() + self.refresh_ttl)})
+            with self._lock:
+                self._refresh_tokens[refresh_token] = account.login
+                self._auth_sessions.pop(form.get("client_id"), None)
+            return self._json({"response": {"refresh_token": refresh_token, "account_name": account.login}})
+
+        if path == "/jwt/finalizelogin" and method == "POST":
+            login = self._refresh_tokens.get(form.get("nonce"))
+            if login is None or not form.get("sessionid"):
+                return self._json({"error": 403}, status=403)
+            account = self.accounts[login]
+            access_token = _jwt({"sub": account.steamid, "aud": ["web:community"],
+                                 "exp": int(time.time() + self.access_ttl)})
+            with self._lock:
+                self._revoked_steamids.discard(account.steamid)
+            return self._json({"steamID": account.steamid, "transfer_info": [
+                {"url": f"{self.url}/login/settoken", "params": {"nonce": access_token, "auth": secrets.token_hex(8)}},
+            ]})
+
+        if path == "/login/settoken" and method == "POST":
+            cookie = f"{form.get('steamID')}%7C%7C{form.get('nonce', '')}"
+            return 200, json.dumps({"result": 1}), {
+                "Content-Type": "application/json",
+                "Set-Cookie": f"steamLoginSecure={cookie}; Path=/; HttpOnly",
+            }
+
+        if path.startswith("/login"):
+            return 200, "<html>Sign In</html>", {"Content-Type": "text/html"}
+
+        if path.startswith("/profiles/") and "/gcpd/730" in path:
+            steamid = path.split("/")[2]
+            if not self._cookie_valid(cookies, steamid):
+                return 302, "", {"Location": f"{self.url}/login/home/?goto=profiles%2F{steamid}%2Fgcpd%2F730"}
+            account = next((item for item in self.accounts.values() if item.steamid == steamid), None)
+            if account is None:
+                return 404, "", {}
+            return 200, self._gcpd_html(account, query.get("tab")), {"Content-Type": "text/html"}
+
+        return 404, "", {}
+
+    def _cookie_valid(self, cookies, steamid):
+        value = unquote(cookies.get("steamLoginSecure", ""))
+        if "||" not in value:
+            return False
+        owner, token = value.split("||", 1)
+        if owner != steamid or steamid in self._revoked_steamids:
+            return False
+        try:
+            payload = token.split(".")[1]
+            payload += "=" * (-len(payload) % 4)
+            return json.loads(base64.urlsafe_b64decode(payload)).get("exp", 0) > time.time()
+        except Exception:
+            return False
+
+    @staticmethod
+    def _gcpd_html(account, tab):
+        seed = int(account.steamid) % 97
+        rows = [
+            "<div class=\"generic_kv_line\">CS:GO Profile Rank: {:,}</div>".format(account.level),
+            "<div class=\"generic_kv_line\">Experience points earned towards next rank: {:,}</div>".format(account.xp),
+        ]
+        if tab == "matchmaking":
+            rows.append("<table class=\"generic_kv_table\"><tr><th>Matchmaking Mode</th><th>Wins</th><th>Ties</th>"
+                        "<th>Losses</th><th>Skill Group</th></tr>"
+                        f"<tr><td>Premier</td><td>{seed}</td><td>{seed % 5}</td><td>{seed // 2}</td><td>{1000 + seed * 50}</td></tr>"
+                        f"<tr><td>Wingman</td><td>{seed % 11}</td><td>0</td><td>{seed % 7}</td><td>{seed % 18}</td></tr>"
+                        "</table>")
+            rows.append("<table class=\"generic_kv_table\"><tr><th>Matchmaking Mode</th><th>Map</th><th>Wins</th>"
+                        "<th>Ties</th><th>Losses</th><th>Skill Group</th></tr>"
+                        f"<tr><td>Competitive</td><td>de_mirage</td><td>{seed % 9}</td><td>0</td><td>{seed % 4}</td><td></td></tr>"
+                        "</table>")
+        return "<html><body>" + "\n".join(rows) + "</body></html>"
@@ -0,0 +1,324 @@
+import ctypes
+import sys
+import time
+
+# Размер окна CS2 фиксирован: координаты кликов (FINAL_CLICK, OPEN_SEQ) заданы под 383x280
+CELL_WIDTH = 383
+CELL_HEIGHT = 280
+
+
+class WindowPlacement:
+    """Куда поставить одно окно: ячейка сетки, монитор и итоговый прямоугольник."""
+
+    __slots__ = ("index", "x", "y", "width", "height", "monitor", "row", "col")
+
+    def __init__(self, index, x, y, width, height, monitor, row, col):
+        self.index = index
+        self.x = x
+        self.y = y
+        self.width = width
+        self.height = height
+        self.monitor = monitor
+        self.row = row
+        self.col = col
+
+    @property
+    def rect(self):
+        return self.x, self.y, self.x + self.width, self.y + self.height
+
+    def __repr__(self):
+        return f"WindowPlacement(#{self.index} m{self.monitor} r{self.row}c{self.col} @ {self.x},{self.y})"
+
+
+def grid_capacity(work_area, cell_width=CELL_WIDTH, cell_height=CELL_HEIGHT, spacing=0):
+    """(колонки, строки), которые помещаются в рабочую область (left, top, right, bottom)."""
+    width = work_area[2] - work_area[0]
+    height = work_area[3] - work_area[1]
+    cols = max(1, (width + spacing) // (cell_width + spacing))
+    rows = max(1, (height + spacing) // (cell_height + spacing))
+    return cols, rows
+
+
+def _valid_areas(work_areas, cell_width=CELL_WIDTH, cell_height=CELL_HEIGHT):
+    areas = [tuple(area) for area in work_areas if area and area[2] > area[0] and area[3] > area[1]]
+    return areas or [(0, 0, cell_width * 5, cell_height * 3)]
+
+
+def grid_cell_count(work_areas, cell_width=CELL_WIDTH, cell_height=CELL_HEIGHT, spacing=0):
+    """Сколько окон помещается на всех мониторах без наложения."""
+    total = 0
+    for area in _valid_areas(work_areas, cell_width, cell_height):
+        cols, rows = grid_capacity(area, cell_width, cell_height, spacing)
+        total += cols * rows
+    return total
+
+
+def compute_grid_layout(count, work_areas, cell_width=CELL_WIDTH, cell_height=CELL_HEIGHT, spacing=0):
+    """
+    Чистая функция: раскладывает count окон сеткой по рабочим областям мониторов.
+    Мониторы заполняются по очереди, внутри монитора — построчно слева направо;
+    placement.index — номер ячейки, его же возвращает placement_index по позиции окна.
+    Окна друг на друга не кладутся: если ячеек меньше count, список короче —
+    лишние окна вызывающий не трогает и сообщает об этом.
+    """
+    if count <= 0:
+        return []
+
+    placements = []
+    for monitor, area in enumerate(_valid_areas(work_areas, cell_width, cell_height)):
+        cols, rows = grid_capacity(area, cell_width, cell_height, spacing)
+        for row in range(rows):
+            for col in range(cols):
+                if len(placements) == count:
+                    return placements
+                x = area[0] + col * (cell_width + spacing)
+                y = area[1] + row * (cell_height + spacing)
+                placements.append(WindowPlacement(len(placements), x, y, cell_width, cell_height, monitor, row, col))
+    return placements
+
+
+def monitor_index(x, y, work_areas):
+    """Номер рабочей области, в которую попадает точка; -1 — ни в одну."""
+    for index, area in enumerate(work_areas):
+        if area[0] <= x < area[2] and area[1] <= y < area[3]:
+            return index
+    return -1
+
+
+def placement_index(rect, work_areas, cell_width=CELL_WIDTH, cell_height=CELL_HEIGHT, spacing=0):
+    """Номер ячейки compute_grid_layout, в которой стоит левый верхний угол окна; None — вне сетки."""
+    first = 0
+    for area in _valid_areas(work_areas, cell_width, cell_height):
+        cols, rows = grid_capacity(area, cell_width, cell_height, spacing)
+        if area[0] <= rect[0] < area[2] and area[1] <= rect[1] < area[3]:
+            col = (rect[0] - area[0]) // (cell_width + spacing)
+            row = (rect[1] - area[1]) // (cell_height + spacing)
+            if col < cols and row < rows:
+                return first + row * cols + col
+            return None
+        first += cols * rows
+    return None
+
+
+def layout_sort_key(rect, work_areas):
+    """Ключ сортировки окна по номеру ячейки сетки; окна вне сетки — в конце, по (y, x)."""
+    index = placement_index(rect, work_areas)
+    return (1, 0, rect[1], rect[0]) if index is None else (0, index, rect[1], rect[0])
+
+
+def get_work_areas():
+    """Рабочие области всех мониторов (без панели задач); основной монитор — первым."""
+    try:
+        import win32api
+
+        areas = []
+        for handle, _, _ in win32api.EnumDisplayMonitors(None, None):
+            info = win32api.GetMonitorInfo(handle)
+            area = tuple(info["Work"])
+            if info.get("Flags", 0) & 1:  # MONITORINFOF_PRIMARY
+                areas.insert(0, area)
+            else:
+                areas.append(area)
+        if areas:
+            return areas
+    except Exception:
+        pass
+
+    try:
+        user32 = ctypes.windll.user32
+        return [(0, 0, user32.GetSystemMetrics(0), user32.GetSystemMetrics(1))]
+    except Exception:
+        return [(0, 0, 1920, 1080)]
+
+
+class Win32LayoutApplier:
+    """
+    Применяет раскладку одной транзакцией BeginDeferWindowPos/DeferWindowPos/EndDeferWindowPos:
+    окна двигаются разом, без перерисовки после каждого. Если транзакция сорвалась
+    (окно закрылось посреди сбора), откатываемся на SetWindowPos по одному.
+    """
+
+    SWP_NOSIZE = 0x0001
+    SWP_NOMOVE = 0x0002
+    SWP_NOZORDER = 0x0004
+    SWP_NOACTIVATE = 0x0010
+    SW_RESTORE = 9
+    HWND_TOP = 0
+
+    def __init__(self):
+        from ctypes import wintypes
+
+        user32 = ctypes.windll.user32
+        user32.BeginDeferWindowPos.argtypes = [ctypes.c_int]
+        user32.BeginDeferWindowPos.restype = wintypes.HANDLE
+        user32.DeferWindowPos.argtypes = [
+            wintypes.HANDLE, wintypes.HWND, wintypes.HWND,
+            ctypes.c_int, ctypes.c_int, ctypes.c_int, ctypes.c_int, wintypes.UINT,
+        ]
+        user32.DeferWindowPos.restype = wintypes.HANDLE
+        user32.EndDeferWindowPos.argtypes = [wintypes.HANDLE]
+        user32.EndDeferWindowPos.restype = wintypes.BOOL
+        user32.SetWindowPos.argtypes = [
+            wintypes.HWND, wintypes.HWND, ctypes.c_int, ctypes.c_int, ctypes.c_int, ctypes.c_int, wintypes.UINT,
+        ]
+        user32.SetWindowPos.restype = wintypes.BOOL
+        user32.SetWindowTextW.argtypes = [wintypes.HWND, wintypes.LPCWSTR]
+        user32.GetWindowTextW.argtypes = [wintypes.HWND, wintypes.LPWSTR, ctypes.c_int]
+        self._user32 = user32
+
+        self.batches = 0
+        self.fallbacks = 0
+
+    def _prepare(self, hwnds):
+        user32 = self._user32
+        alive = []
+        for hwnd in hwnds:
+            if not hwnd or not user32.IsWindow(hwnd):
+                continue
+            # Свёрнутое окно DeferWindowPos не разворачивает
+            if user32.IsIconic(hwnd):
+                user32.ShowWindow(hwnd, self.SW_RESTORE)
+            alive.append(hwnd)
+        return alive
+
+    def _defer(self, items, flags, insert_after=None):
+        """items: [(hwnd, x, y, w, h)]. True — всё ушло одной транзакцией."""
+        user32 = self._user32
+        hdwp = user32.BeginDeferWindowPos(len(items))
+        if not hdwp:
+            return False
+        for hwnd, x, y, width, height in items:
+            hdwp = user32.DeferWindowPos(hdwp, hwnd, insert_after, x, y, width, height, flags)
+            if not hdwp:
+                # Дескриптор уже освобождён системой — транзакция потеряна целиком
+                return False
+        self.batches += 1
+        return bool(user32.EndDeferWindowPos(hdwp))
+
+    def _set_title(self, hwnd, title):
+        buffer = ctypes.create_unicode_buffer(len(title) + 2)
+        self._user32.GetWindowTextW(hwnd, buffer, len(buffer))
+        # WM_SETTEXT уходит в чужой процесс — не шлём, если заголовок уже такой
+        if buffer.value != title:
+            self._user32.SetWindowTextW(hwnd, title)
+
+    def apply(self, moves):
+        """moves: [(hwnd, WindowPlacement, title или None)]. Возвращает число поставленных окон."""
+        alive = set(self._prepare([hwnd for hwnd, _, _ in moves]))
+        moves = [move for move in moves if move[0] in alive]
+        if not moves:
+            return 0
+
+        flags = self.SWP_NOZORDER | self.SWP_NOACTIVATE
+        items = [(hwnd, p.x, p.y, p.width, p.height) for hwnd, p, _ in moves]
+        placed = len(items)
+        if not self._defer(items, flags):
+            self.fallbacks += 1
+            placed = sum(1 for item in items if self._user32.SetWindowPos(item[0], None, *item[1:], flags))
+
+        for hwnd, _, title in moves:
+            if title:
+                try:
+                    self._set_title(hwnd, title)
+                except Exception:
+                    pass
+        return placed
+
+    def raise_windows(self, hwnds):
+        """Поднять окна наверх по z-order одной транзакцией; первое в списке окажется сверху."""
+        hwnds = self._prepare(hwnds)
+        if not hwnds:
+            return 0
+        flags = self.SWP_NOMOVE | self.SWP_NOSIZE | self.SWP_NOACTIVATE
+        # Каждое следующее HWND_TOP ложится поверх предыдущего, поэтому идём с конца
+        items = [(hwnd, 0, 0, 0, 0) for hwnd in reversed(hwnds)]
+        if self._defer(items, flags, insert_after=self.HWND_TOP):
+            return len(items)
+        self.fallbacks += 1
+        return sum(1 for hwnd, *_ in items if self._user32.SetWindowPos(hwnd, self.HWND_TOP, 0, 0, 0, 0, flags))
+
+
+class FakeLayoutApplier:
+    """Запоминает позиции вместо Win32 — для бенчмарка и отладки раскладки без Windows."""
+
+    def __init__(self, call_overhead_ms=0.0):
+        self.call_overhead = call_overhead_ms / 1000
+        self.positions = {}
+        self.titles = {}
+        self.batches = 0
+        self.fallbacks = 0
+
+    def _call(self):
+        if self.call_overhead:
+            time.sleep(self.call_overhead)
+
+    def apply(self, moves):
+        # одна транзакция DeferWindowPos
+        self._call()
+        for hwnd, placement, title in moves:
+            self.positions[hwnd] = placement.rect
+            if title:
+                self.titles[hwnd] = title
+        self.batches += 1
+        return len(moves)
+
+    def apply_one_by_one(self, moves):
+        """Прежний путь MoveWindows: ShowWindow + MoveWindow + SetWindowText на каждое окно."""
+        for hwnd, placement, title in moves:
+            self._call()
+            self._call()
+            self.positions[hwnd] = placement.rect
+            if title:
+                self._call()
+                self.titles[hwnd] = title
+        return len(moves)
+
+    def raise_windows(self, hwnds):
+        return len(list(hwnds))
+
+
+def benchmark(counts=(4, 8, 16, 32, 64), work_areas=((0, 0, 1920, 1040), (1920, 0, 3840, 1040)),
+              call_overhead_ms=15.0, repeats=200):
+    """
+    Раскладка + применение на FakeLayoutApplier с call_overhead_ms на каждый вызов Win32:
+    старый путь (ShowWindow + MoveWindow + SetWindowText на каждое окно) против одной транзакции.
+    Запуск: python -m Helpers.WindowLayout
+    """
+    results = []
+    for count in counts:
+        started = time.perf_counter()
+        for _ in range(repeats):
+            placements = compute_grid_layout(count, work_areas)
+        layout_ms = (time.perf_counter() - started) / repeats * 1000
+
+        visible = sum(
+            1 for p in placements
+            if any(a[0] <= p.x and p.x + p.width <= a[2] and a[1] <= p.y and p.y + p.height <= a[3] for a in work_areas)
+        )
+        legacy_offscreen = sum(1 for i in range(count) if (i + 1) * CELL_WIDTH > work_areas[-1][2])
+
+        moves = [(i + 1, p, f"[FSN FREE] acc{i}") for i, p in enumerate(placements)]
+        timings = {}
+        for name in ("apply_one_by_one", "apply"):
+            applier = FakeLayoutApplier(call_overhead_ms)
+            started = time.perf_counter()
+            getattr(applier, name)(moves)
+            timings[name] = (time.perf_counter() - started) * 1000
+
+        results.append({
+            "windows": count,
+            "layout_ms": round(layout_ms, 4),
+            "visible": visible,
+            "unplaced": count - len(placements),
+            "legacy_offscreen": legacy_offscreen,
+            "legacy_apply_ms": round(timings["apply_one_by_one"], 2),
+            "batched_apply_ms": round(timings["apply"], 2),
+        })
+    return results
+
+
+if __name__ == "__main__":
+    for row in benchmark():
+        print(row)
+    if sys.platform == "win32":
+        print({"work_areas": get_work_areas()})
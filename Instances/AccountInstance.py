@@ -13,24 +13,24 @@ import hashlib, hmac
 import winreg
 from ctypes import wintypes
 
-import wmi
-
-
-import pyautogui
-import pyperclip
-import json
 from pathlib import Path
 import psutil
-import pygetwindow as gw
 import win32con
 import win32gui
 import win32process
-from pywinauto import Application, findwindows
 
 from Helpers.MouseController import MouseHelper
+from Helpers.SteamLoginDriver import SteamLoginDriver
 from Helpers.WinregHelper import WinregHelper
+from Managers.LogEventManager import LogEventManager
 from Managers.LogManager import LogManager
+from Managers.LogTailManager import LogTailManager
+from Managers.ProcessManager import ProcessManager
+from Managers.RuntimeRegistry import RuntimeRegistry
 from Managers.SettingsManager import SettingsManager
+from Managers.VideoConfigManager import VideoConfigManager
+from Managers.WindowManager import WindowManager
+from Modules.ProcessWatcherModule import ProcessWatcherModule
 
 
 def bytes_to_int(bytes):
@@ -44,21 +44,7 @@ def GetMainWindowByPID(pid: int) -> int:
     Возвращает hwnd главного окна процесса по PID.
     Если окно не найдено, возвращает 0.
     """
-    hwnds = []
-
-    def enum_windows_callback(hwnd, _):
-        if not win32gui.IsWindowVisible(hwnd) or not win32gui.IsWindowEnabled(hwnd):
-            return True
-        if win32gui.GetParent(hwnd) != 0:
-            return True
-        _, window_pid = win32process.GetWindowThreadProcessId(hwnd)
-        if window_pid == pid:
-            hwnds.append(hwnd)
-            return False  # нашли, можно остановить
-        return True
-
-    win32gui.EnumWindows(enum_windows_callback, None)
-    return hwnds[0] if hwnds else 0
+    return WindowManager().get_main_window(pid)
 
 def update_video_cfg(src_path, dst_path, updates: dict):
     """
@@ -152,6 +138,8 @@ VENDOR_PRIORITY = {
 }
 # Создаём DXGIFactory
 def get_best_gpu():
+    import wmi
+
     c = wmi.WMI()
     gpus = []
 
@@ -322,14 +310,8 @@ def _close_all_cs2_singleton_mutexes(primary_pid: int | None = None) -> bool:
     if primary_pid:
         pids.append(int(primary_pid))
 
-    for proc in psutil.process_iter(['pid', 'name']):
-        try:
-            name = (proc.info.get('name') or '').lower()
-            proc_pid = int(proc.info.get('pid') or 0)
-        except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess, ValueError, TypeError):
-            continue
-
-        if name == 'cs2.exe' and proc_pid > 0 and proc_pid not in pids:
+    for proc_pid in sorted(ProcessManager().get_pids("cs2.exe")):
+        if proc_pid > 0 and proc_pid not in pids:
             pids.append(proc_pid)
 
     closed_any = False
@@ -388,34 +370,6 @@ def launch_isolated_steam(account_name: str, steam_path: str, extra_args: list[s
 
     return subprocess.Popen(args, env=env, creationflags=0x08000000)
 
-def find_latest_file(filename: str) -> str | None:
-    settings = SettingsManager()
-    latest_file_path = None
-    latest_mtime = 0
-
-    cs2_path = settings.get(
-        "CS2Path",
-        "C:/Program Files (x86)/Steam/steamapps/common/Counter-Strike Global Offensive",
-    )
-    search_roots = [
-        Path(cs2_path),
-        Path(cs2_path) / "game" / "csgo",
-        Path.cwd(),
-    ]
-
-    for root_path in search_roots:
-        if not root_path.exists():
-            continue
-        for root, dirs, files in os.walk(root_path):
-            if filename in files:
-                file_path = os.path.join(root, filename)
-                mtime = os.path.getmtime(file_path)
-                if mtime > latest_mtime:
-                    latest_mtime = mtime
-                    latest_file_path = file_path
-
-    return latest_file_path
-
 def to_base62(num: int) -> str:
     alphabet = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz"
     base = len(alphabet)
@@ -426,11 +380,20 @@ def to_base62(num: int) -> str:
     return ''.join(reversed(result)) or '0'
 
 class Account:
-    def __init__(self, login, password, shared_secret=None, steam_id = 0, identity_secret=None):
+    # Кэш isCSValid: общий на все аккаунты TTL и счётчики, сброс по событию "exited" от ProcessManager
+    CS_VALID_TTL = 1.0
+    _cs_valid_hits = 0
+    _cs_valid_misses = 0
+    _cs_valid_by_pid = {}
+    _cs_valid_subscribed = False
+
+    def __init__(self, login, password, shared_secret=None, steam_id = 0, identity_secret=None, mafile=None):
         self.login = login
         self.password = password
-        self.shared_secret = shared_secret
-        self.identity_secret = identity_secret
+        self._shared_secret = shared_secret
+        self._identity_secret = identity_secret
+        # MafileRecord: секреты читаются из mafile при первом обращении (в индексе их нет)
+        self._mafile = mafile
         self.steam_id = steam_id
         self.steamProcess = None
         self.CS2Process = None
@@ -441,92 +404,102 @@ class Account:
 
         self._color = "#DCE4EE"
         self._color_callback = None  # callback на смену цвета
-        self._stop_monitoring = False  # флаг для остановки мониторинга
-        runtime_path = Path("runtime.json")
-        if runtime_path.exists():
+        self._cs_valid_cache = None  # ((steam_pid, cs2_pid), valid, ts)
+        self._login_driver = None
+
+        logEvents = LogEventManager()
+        logEvents.subscribe("scratch_rt", self._on_scratch_rt_event, login=self.login)
+        logEvents.subscribe("match_id", self._on_match_id_event, login=self.login)
+        # Аккаунт уже запущен (панель перезапускали) — подхватываем процессы из RuntimeRegistry
+        entry = RuntimeRegistry().get(self.login)
+        if entry is not None and entry.steam_pid and entry.cs2_pid:
             try:
-                with open(runtime_path, "r", encoding="utf-8") as f:
-                    entries = json.load(f)
-                entry = next((e for e in entries if e.get("login") == self.login), None)
-                if entry:
-                    steam_pid = entry.get("SteamPid")
-                    cs2_pid = entry.get("CS2Pid")
-                    if psutil.pid_exists(steam_pid) and psutil.pid_exists(cs2_pid):
-                        steam_proc = psutil.Process(steam_pid)
-                        cs2_proc = psutil.Process(cs2_pid)
-                        if cs2_proc.name().lower() == "cs2.exe" and cs2_proc.ppid() == steam_proc.pid:
-                            self.steamProcess = steam_proc
-                            self.CS2Process = cs2_proc
-                            self.setColor("green")
-                            self.MonitorCS2(interval=5)  # запускаем мониторинг CS2
-                            self.start_log_watcher(f"{login}.log")
-                            csWindow = self.FindCSWindow()
-                            fix_window(csWindow)
-                            SetWindowText(csWindow, f"[FSN FREE] {self.login}")
+                if psutil.pid_exists(entry.steam_pid) and psutil.pid_exists(entry.cs2_pid):
+                    steam_proc = psutil.Process(entry.steam_pid)
+                    cs2_proc = psutil.Process(entry.cs2_pid)
+                    if cs2_proc.name().lower() == "cs2.exe" and cs2_proc.ppid() == steam_proc.pid:
+                        self.steamProcess = steam_proc
+                        self.CS2Process = cs2_proc
+                        self.setColor("green")
+                        self.MonitorCS2()  # запускаем мониторинг CS2
+                        self.start_log_watcher(f"{login}.log")
+                        csWindow = self.FindCSWindow()
+                        fix_window(csWindow)
+                        SetWindowText(csWindow, f"[FSN FREE] {self.login}")
+                        WindowManager().invalidate()
             except Exception as e:
-                print(f"Ошибка при чтении runtime.json: {e}")
+                print(f"Ошибка восстановления процессов {self.login}: {e}")
 
     def start_log_watcher(self, filename: str):
-        # Запускаем поток, который будет искать файл и потом его читать
-        t = threading.Thread(target=self._watch_log_file, args=(filename,), daemon=True)
-        t.start()
-
-    def _watch_log_file(self, filename: str):
-        timeout = 5 * 60  # 5 минут
-        start_time = time.time()
-
-        while time.time() - start_time < timeout:
-            path = find_latest_file(filename)
-            if path:
-                try:
-                    # Пробуем открыть файл, если доступ есть — переходим к чтению
-                    with open(path, 'r', encoding='utf-8', errors='ignore'):
-                        self.tail_log_file(path)
-                        return  # выходим из функции, поток теперь читает файл
-                except PermissionError:
-                    # Файл найден, но недоступен — продолжаем поиск
-                    pass
-            time.sleep(1)
-
-        return
-    def tail_log_file(self, file_path: str):
-        with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-            f.seek(0, os.SEEK_END)
-            while True:
-                line = f.readline()
-                if line:
-                    self.process_log_line(line)
-                else:
-                    time.sleep(0.1)
-
+        # Один общий тейлер на все аккаунты: сам дождётся файла в game/csgo и будет раздавать строки
+        LogTailManager().watch(self.login, filename, self.process_log_line)
 
     def process_log_line(self, line: str):
-        if "Scratch RT Allocations:" in line:
-            fix_window(self.FindCSWindow())
-            return
-        match = re.search(r"match_id=(\d+)", line)
-        if match:
-            match_id_str = match.group(1)
-            match_id_int = int(match_id_str)
-            match_id_compact = to_base62(match_id_int)
-            self.last_match_id = match_id_compact
+        LogEventManager().dispatch(self.login, line)
 
+    def _on_scratch_rt_event(self, event):
+        fix_window(self.FindCSWindow())
+
+    def _on_match_id_event(self, event):
+        self.last_match_id = to_base62(int(event.value))
 
     def isCSValid(self):
         if self.CS2Process is None or self.steamProcess is None:
             return False
 
         try:
-            if psutil.pid_exists(self.steamProcess.pid) and psutil.pid_exists(self.CS2Process.pid):
-                steam_proc = psutil.Process(self.steamProcess.pid)
-                cs2_proc = psutil.Process(self.CS2Process.pid)
-                if cs2_proc.name().lower() == "cs2.exe" and cs2_proc.ppid() == steam_proc.pid:
-                    return True
-        except (psutil.NoSuchProcess, psutil.AccessDenied, ProcessLookupError):
+            key = (self.steamProcess.pid, self.CS2Process.pid)
+        except Exception:
             return False
-        return False
-        
-        return False
+
+        cache = self._cs_valid_cache
+        if cache and cache[0] == key and time.time() - cache[2] < Account.CS_VALID_TTL:
+            Account._cs_valid_hits += 1
+            return cache[1]
+
+        Account._cs_valid_misses += 1
+        Account._subscribe_cs_valid_invalidation()
+        process_manager = ProcessManager()
+        steam_info = process_manager.get(key[0])
+        cs2_info = process_manager.get(key[1])
+        valid = bool(
+            steam_info and cs2_info
+            and cs2_info.name == "cs2.exe"
+            and cs2_info.ppid == steam_info.pid
+        )
+
+        self._cs_valid_cache = (key, valid, time.time())
+        if valid:
+            Account._cs_valid_by_pid[key[0]] = self
+            Account._cs_valid_by_pid[key[1]] = self
+        return valid
+
+    def invalidate_cs_valid(self):
+        self._cs_valid_cache = None
+
+    @classmethod
+    def _subscribe_cs_valid_invalidation(cls):
+        if not cls._cs_valid_subscribed:
+            cls._cs_valid_subscribed = True
+            ProcessManager().subscribe(cls._on_process_event)
+
+    @classmethod
+    def _on_process_event(cls, event, info):
+        if event != "exited":
+            return
+        account = cls._cs_valid_by_pid.pop(info.pid, None)
+        if account is not None:
+            account.invalidate_cs_valid()
+
+    @classmethod
+    def cs_valid_stats(cls):
+        total = cls._cs_valid_hits + cls._cs_valid_misses
+        return {
+            "hits": cls._cs_valid_hits,
+            "misses": cls._cs_valid_misses,
+            "hit_rate": (cls._cs_valid_hits / total) if total else 0.0,
+        }
+
     def setColorCallback(self, callback):
         """Регистрируем callback, который будет вызываться при смене цвета"""
         self._color_callback = callback
@@ -553,6 +526,37 @@ class Account:
         win_height = rect[3] - rect[1]
         win32gui.MoveWindow(hwnd, x, y, win_width, win_height, True)
         SetWindowText(hwnd, f"[FSN FREE] {self.login}")
+        WindowManager().invalidate()
+
+    def _load_mafile_secrets(self):
+        mafile, self._mafile = self._mafile, None
+        if mafile is None:
+            return
+        shared_secret, identity_secret = mafile.read_secrets()
+        if not shared_secret:
+            print(f"⚠️ [{self.login}] mafile найден, но shared_secret пустой")
+        self._shared_secret = self._shared_secret or shared_secret
+        self._identity_secret = self._identity_secret or identity_secret
+
+    @property
+    def shared_secret(self):
+        if self._shared_secret is None:
+            self._load_mafile_secrets()
+        return self._shared_secret
+
+    @shared_secret.setter
+    def shared_secret(self, value):
+        self._shared_secret = value
+
+    @property
+    def identity_secret(self):
+        if self._identity_secret is None:
+            self._load_mafile_secrets()
+        return self._identity_secret
+
+    @identity_secret.setter
+    def identity_secret(self, value):
+        self._identity_secret = value
 
     def FindCSWindow(self) -> int:
         if self.CS2Process and self.isCSValid():
@@ -591,54 +595,10 @@ class Account:
             MouseHelper.ClickMouse(hwnd, x, y, button)
 
     def ProcessWindowsBeforeCS(self, steamPid):
-        """Обрабатывает все окна Steam и выводит тексты TextBox"""
-
-        parent = psutil.Process(steamPid)
-        children = parent.children(recursive=True)  # рекурсивно
-
-        all_pids = [steamPid] + [child.pid for child in children]
-
-        for pid in all_pids:
-            try:
-                exclude_titles = {"Steam", "Friends List", "Special Offers"}
-                windows = [hwnd for hwnd in findwindows.find_windows(process=pid) if
-                           win32gui.GetWindowText(hwnd) not in exclude_titles]
-                if not windows:
-                    continue
-                app = Application(backend="uia").connect(process=pid)
-                for win in app.windows():
-                    win.set_focus()
-                    all_descendants = win.descendants()
-                    edits = [c for c in all_descendants if c.friendly_class_name() == "Edit"]
-                    buttons = [c for c in all_descendants if c.friendly_class_name() == "Button"]
-                    statics = [c for c in all_descendants if c.friendly_class_name() == "Static"]
-                    if len(edits) == 2 and any(btn.window_text().strip() == "Sign in" for btn in buttons):
-                        edits[0].set_text(self.login)
-                        edits[1].set_text(self.password)
-                        sign_in_button = next((btn for btn in buttons if btn.window_text().strip() == "Sign in"), None)
-                        sign_in_button.click()
-                        time.sleep(2)
-                    if any(txt.window_text().strip() == "Enter a code instead" for txt in statics):
-                        target = next((s for s in statics if s.window_text().strip() == "Enter a code instead"), None)
-                        target.click_input()
-                    if any(btn.window_text().strip() == "Play anyway" for btn in buttons):
-                        target = next((btn for btn in buttons if btn.window_text().strip() == "Play anyway"), None)
-                        if target:
-                            target.click()
-                    if any(btn.window_text().strip().lower() == "no thanks".lower() for btn in buttons):
-                        target = next(
-                            (btn for btn in buttons if btn.window_text().strip().lower() == "no thanks".lower()), None)
-                        if target:
-                            target.click()
-                    if any(txt.window_text().strip() == "Enter the code from your Steam Mobile App" for txt in statics) \
-                            and self.shared_secret is not None:
-                        win.set_focus()
-                        pyperclip.copy(self.get_auth_code())
-                        time.sleep(0.1)
-                        MouseHelper.PasteText()
-
-            except Exception as e:
-                print(f"Не удалось подключиться к PID {pid}: {e}")
+        """Один тик прохода по диалогам логина Steam (Sign in, Steam Guard, Play anyway)"""
+        if self._login_driver is None:
+            self._login_driver = SteamLoginDriver(self)
+        return self._login_driver.tick(steamPid)
 
     def _sync_cfg_files_before_start(self, cs2_path, steam_path):
         settings_path = Path(get_base_path()) / "settings"
@@ -658,6 +618,9 @@ class Account:
         userdata_cfg_dir = Path(os.path.dirname(steam_path)) / "userdata" / str(self.steam_id - 76561197960265728) / "730" / "local" / "cfg"
         userdata_cfg_dir.mkdir(parents=True, exist_ok=True)
 
+        # GPU при старте панели определяется в фоне: VendorID/DeviceID и cs2_video.txt пишутся там
+        if not VideoConfigManager.wait_startup_sync():
+            self._logManager.add_log(f"⚠️ [{self.login}] Определение GPU не завершилось, берём VendorID/DeviceID из настроек")
         vendorID = self._settingsManager.get("VendorID", 0)
         deviceID = self._settingsManager.get("DeviceID", 0)
 
@@ -686,8 +649,22 @@ class Account:
                 shutil.copy2(src, userdata_cfg_dir / filename)
 
     def StartGame(self):
-        time.sleep(5)
-        print("Запуск Steam...")
+        """Последовательный запуск всех стадий (без конвейера AccountManager)."""
+        if not self.launch_prepare_profile():
+            return
+        if not self.launch_spawn_steam():
+            return
+        if not self.launch_login():
+            return
+        self.launch_attach_cs2()
+        self.launch_release_mutex()
+        self.launch_fixup_window()
+
+    # -----------------------------
+    # Стадии запуска (используются LaunchPipeline)
+    # -----------------------------
+    def launch_prepare_profile(self):
+        """Стадия 1: удаление фона и синхронизация cfg."""
         steam_path = self._settingsManager.get("SteamPath", r"C:\Program Files (x86)\Steam\steam.exe")
         cs2_path = self._settingsManager.get(
             "CS2Path",
@@ -708,11 +685,19 @@ class Account:
                 print(f"Delete folder: {panorama_path}")
                 shutil.rmtree(panorama_path)
 
-       
-
         self._sync_cfg_files_before_start(cs2_path, steam_path)
+        self._launch_steam_path = steam_path
+        return True
 
-        # Запуск Steam
+    def launch_spawn_steam(self, timeout=20.0):
+        """
+        Стадия 2: запуск Steam. Готовность — у Steam появился дочерний процесс или окно,
+        т.е. AutoLoginUser уже прочитан и реестр можно отдавать следующему аккаунту.
+        """
+        print("Запуск Steam...")
+        steam_path = getattr(self, "_launch_steam_path", None) or self._settingsManager.get(
+            "SteamPath", r"C:\Program Files (x86)\Steam\steam.exe"
+        )
         try:
             WinregHelper.set_value(
                 r"Software\Valve\Steam",
@@ -730,71 +715,93 @@ class Account:
 
             final = shlex.split(args)
             self.steamProcess = launch_isolated_steam(self.login, steam_path, final)
+        except Exception as e:
+            print(f"Ошибка запуска Steam: {e}")
+            return False
 
-            # 🔥 ВАЖНО: перезапускаем Steam при ошибках в течение 60 секунд
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            if self.steamProcess.poll() is not None:
+                print(f"❌ [{self.login}] Steam завершился сразу после запуска")
+                return False
+            if ProcessManager().get_children(self.steamProcess.pid) or GetMainWindowByPID(self.steamProcess.pid):
+                return True
+            time.sleep(0.25)
+        print(f"❌ [{self.login}] Steam не ответил за {timeout:.0f}с")
+        return False
 
+    def _find_cs2_child(self):
+        children = ProcessManager().get_children(self.steamProcess.pid, name="cs2.exe")
+        return children[0] if children else None
 
-        except Exception as e:
-            print(f"Ошибка запуска Steam: {e}")
-            return
+    def launch_login(self, timeout=None):
+        """Стадия 3: проход по окнам логина Steam до появления cs2.exe (готовность)."""
+        if timeout is None:
+            timeout = float(self._settingsManager.get("LaunchLoginTimeout", 300) or 300)
+        self._login_driver = SteamLoginDriver(self)
+        deadline = time.time() + timeout
+        try:
+            while time.time() < deadline:
+                if self._find_cs2_child():
+                    return True
+                if self.steamProcess.poll() is not None:
+                    print(f"❌ [{self.login}] Steam закрылся во время логина")
+                    return False
+                self.ProcessWindowsBeforeCS(self.steamProcess.pid)
+                time.sleep(0.5)
+            print(f"❌ [{self.login}] cs2.exe не появился за {timeout:.0f}с")
+            return False
+        finally:
+            stats = self._login_driver.stats()
+            print(
+                f"🔑 [{self.login}] логин: тиков {stats['ticks']} (пропущено {stats['skipped']}), "
+                f"avg {stats['avg_tick_ms']:.0f}ms, max {stats['max_tick_ms']:.0f}ms"
+            )
 
+    def launch_attach_cs2(self):
+        """Стадия 4: фиксируем PID cs2.exe, порождённого Steam."""
+        info = self._find_cs2_child()
+        if info is None:
+            ProcessManager().refresh(force=True)
+            info = self._find_cs2_child()
+        if info is None:
+            return False
+        self.CS2Process = info.process
+        return True
 
-        # Логин + ожидание CS2
-        while True:
-            self.ProcessWindowsBeforeCS(self.steamProcess.pid)
-
-            cs2_found = False
-            for proc in psutil.process_iter(['pid', 'name', 'ppid']):
-                if proc.info['name'] and proc.info['name'].lower() == 'cs2.exe':
-                    try:
-                        parent = psutil.Process(proc.info['ppid'])
-                        if parent.pid == self.steamProcess.pid:
-                            self.CS2Process = proc
-                            cs2_found = True
-                            self._kill_cs2_mutex(proc.pid)
-                            
-                            # 🔥 ПЕРЕИМЕНОВАНИЕ ОКНА СРАЗУ ПОСЛЕ НАХОЖДЕНИЯ PID!
-                            csWindow = self.FindCSWindow()
-                            if csWindow:
-                                fix_window(csWindow)
-                                SetWindowText(csWindow, f"[FSN FREE] {self.login}")
-                                print(f"✅ [{self.login}] Окно переименовано!")
-                            
-                            break
-                    except psutil.NoSuchProcess:
-                        continue
+    def launch_release_mutex(self):
+        """Стадия 5: закрываем singleton-mutex, чтобы следующий cs2.exe мог стартовать."""
+        if not self.CS2Process:
+            return False
+        self._kill_cs2_mutex(self.CS2Process.pid)
+        return True
 
-            if cs2_found:
+    def launch_fixup_window(self, timeout=120.0):
+        """Стадия 6: ждём окно CS2, правим рамку, переименовываем, пишем runtime (RuntimeRegistry)."""
+        deadline = time.time() + timeout
+        csWindow = 0
+        while time.time() < deadline and self.isCSValid():
+            csWindow = self.FindCSWindow()
+            if csWindow:
                 break
-
             time.sleep(0.5)
 
-        self.ProcessWindowsAfterCS(self.steamProcess.pid)
+        # 🔥 ПЕРЕИМЕНОВАНИЕ ОКНА СРАЗУ ПОСЛЕ ПОЯВЛЕНИЯ
+        if csWindow:
+            fix_window(csWindow)
+            SetWindowText(csWindow, f"[FSN FREE] {self.login}")
+            WindowManager().invalidate()
+            print(f"✅ [{self.login}] Окно переименовано!")
 
-        time.sleep(5)
+        self.ProcessWindowsAfterCS(self.steamProcess.pid)
 
-        # runtime.json
-        runtime_path = Path("runtime.json")
+        # runtime.json (RuntimeRegistry сохранит сам, одной записью на пачку запусков)
         try:
-            data = []
-            if runtime_path.exists():
-                with open(runtime_path, "r", encoding="utf-8") as f:
-                    data = json.load(f)
-
-            data = [d for d in data if d.get("login") != self.login]
-            data.append({
-                "login": self.login,
-                "SteamPid": self.steamProcess.pid,
-                "CS2Pid": self.CS2Process.pid if self.CS2Process else None
-            })
-
-            with open(runtime_path, "w", encoding="utf-8") as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
-
+            RuntimeRegistry().set(self.login, self.steamProcess.pid, self.CS2Process.pid if self.CS2Process else None)
             self.start_log_watcher(f"{self.login}.log")
-
         except Exception as e:
-            print(f"Ошибка записи runtime.json: {e}")
+            print(f"Ошибка записи runtime: {e}")
+        return bool(csWindow)
 
 
     def restart_steam_on_error(self, steam_pid, timeout=60):
@@ -808,23 +815,23 @@ class Account:
             time.sleep(2)  # Проверяем каждые 2 секунды
             
             # Проверяем, жив ли Steam процесс
-            try:
-                steam_proc = psutil.Process(steam_pid)
-            except psutil.NoSuchProcess:
+            process_manager = ProcessManager()
+            steam_info = process_manager.get(steam_pid)
+            if steam_info is None:
                 print(f"⚠️ Steam [{self.login}] завершился, перезапускаем...")
                 self._restart_steam()
                 return
             
             # Проверяем наличие окон Steam Service Error или зависший Steam
+            # cmdline берётся из снимка и читается один раз за жизнь процесса.
             found_error = False
-            for proc in psutil.process_iter(['pid', 'name', 'cmdline']):
+            for info in process_manager.get_processes():
                 try:
-                    info = proc.info
-                    if info['name'] and info['name'].lower() in ['steam.exe', 'steamwebhelper.exe']:
-                        cmdline = ' '.join(info['cmdline'] or [])
+                    if info.name in ['steam.exe', 'steamwebhelper.exe']:
+                        cmdline = ' '.join(info.cmdline)
                         if any(error_str in cmdline.lower() for error_str in [
                             'serviceerror', 'updateandrestart', 'error'
-                        ]) or steam_proc.status() in ['zombie', 'dead']:
+                        ]) or steam_info.process.status() in ['zombie', 'dead']:
                             found_error = True
                             break
                 except:
@@ -889,83 +896,35 @@ class Account:
         """✅ Возвращает текущие level/xp"""
         return self.level, self.xp
 
-    def _load_level_from_json(self):
-        """✅ Загружаем Level/XP из level.json"""
-        from pathlib import Path
-        import json
-        
-        level_file = Path("level.json")
-        if level_file.exists():
-            try:
-                with open(level_file, "r", encoding="utf-8") as f:
-                    data = json.load(f)
-                if self.login in data:
-                    info = data[self.login]
-                    self.level = info.get("level", 0)
-                    self.xp = info.get("xp", 0)
-                    print(f"✅ [{self.login}] Загружен из level.json: lvl: {self.level} xp: {self.xp}")
-            except Exception as e:
-                print(f"⚠️ [{self.login}] Ошибка level.json: {e}")
+    def _load_level(self):
+        """✅ Загружаем Level/XP из LevelStore"""
+        from Managers.LevelStore import LevelStore
+
+        sample = LevelStore().latest(self.login)
+        if sample is not None:
+            self.level = sample.level
+            self.xp = sample.xp
+            print(f"✅ [{self.login}] Загружен уровень: lvl: {self.level} xp: {self.xp}")
+
+    def update_level_xp(self, level, xp, source="manual"):
+        """✅ ОБНОВЛЯЕМ Level/XP + дописываем в историю LevelStore (подписчики UI получат изменение)"""
+        from Managers.LevelStore import LevelStore
 
-    def update_level_xp(self, level, xp):
-        """✅ ОБНОВЛЯЕМ Level/XP + СОХРАНЯЕМ в level.json"""
         self.level = level
         self.xp = xp
-        
-        # ✅ Сохраняем в level.json
-        from pathlib import Path
-        import json
-        
-        level_file = Path("level.json")
-        data = {}
-        if level_file.exists():
-            try:
-                with open(level_file, "r", encoding="utf-8") as f:
-                    data = json.load(f)
-            except:
-                pass
-        
-        data[self.login] = {"level": level, "xp": xp}
-        
-        try:
-            with open(level_file, "w", encoding="utf-8") as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
-            print(f"✅ [{self.login}] Сохранено в level.json: Lv{level} XP{xp}")
-        except Exception as e:
-            print(f"⚠️ [{self.login}] Ошибка сохранения level.json: {e}")
+        if LevelStore().update(self.login, level, xp, source=source):
+            print(f"✅ [{self.login}] Сохранено: Lv{level} XP{xp}")
 
-    def parse_current_level(self):
-        """🆕 РЕАЛЬНЫЙ ПАРСИНГ уровня (как try_get_level из ui/accounts_tab.py)"""
+    def parse_current_level(self, max_age=0):
+        """🆕 РЕАЛЬНЫЙ ПАРСИНГ уровня (страницы gcpd через GcpdCache; max_age=0 — после матча, всегда свежие)"""
         try:
-            from Helpers.LoginExecutor import SteamLoginSession
-            
-            print(f"🔍 [{self.login}] Парсим реальный уровень...")
-            steam = SteamLoginSession(self.login, self.password, self.shared_secret)
-            
-            # Тот же код что и в try_get_level()
-            html = self._fetch_steam_html(steam, "gcpd/730")
-            if not html:
-                print(f"⚠️ [{self.login}] Нет HTML")
-                return False
-
-            print(f"⏳ [{self.login}] Ждем JS...")
-            time.sleep(1)
+            from Managers.GcpdCache import GcpdCache
 
-            level, xp = self._extract_level_xp_from_html(html)
-            if level <= 0:
-                print(f"⚠️ [{self.login}] Не удалось вытащить уровень из первой попытки. Повторяем логин...")
-                html = self._fetch_steam_html(steam, "gcpd/730")
-                if html:
-                    level, xp = self._extract_level_xp_from_html(html)
-
-            # 🔁 Последняя попытка: другая вкладка gcpd, иногда там есть нужные поля
-            if level <= 0:
-                html = self._fetch_steam_html(steam, "gcpd/730/?tab=matchmaking")
-                if html:
-                    level, xp = self._extract_level_xp_from_html(html)
+            print(f"🔍 [{self.login}] Парсим реальный уровень...")
+            record = GcpdCache().get_level(self, max_age=max_age)
 
-            if level > 0:
-                self.update_level_xp(level, xp)
+            if record.level > 0:
+                self.update_level_xp(record.level, record.xp, source="match")
                 print(f"✅ [{self.login}] Уровень успешно обновлён")
                 return True
             else:
@@ -976,50 +935,6 @@ class Account:
             print(f"❌ [{self.login}] Ошибка парсинга: {e}")
             return False
 
-    def _extract_level_xp_from_html(self, html):
-        """Пытается вытащить lvl/xp из разных форматов страницы Steam."""
-        if not html:
-            return 0, 0
-
-        level, xp = 0, 0
-
-        # Формат из текста страницы
-        rank_match = re.search(r'CS:GO Profile Rank:\s*([\d,]+)', html, re.IGNORECASE)
-        if rank_match:
-            level = int(rank_match.group(1).replace(',', ''))
-            xp_match = re.search(r'Experience points earned towards next rank:\s*([\d,]+)', html, re.IGNORECASE)
-            xp = int(xp_match.group(1).replace(',', '')) if xp_match else 0
-            return level, xp
-
-        # Формат JSON внутри страницы
-        rank_match = re.search(r'"profile_rank"[:\s]*(\d+)', html, re.IGNORECASE)
-        if rank_match:
-            level = int(rank_match.group(1))
-            xp_match = re.search(r'"(?:current_)?xp"[:\s]*(\d+)', html, re.IGNORECASE)
-            xp = int(xp_match.group(1)) if xp_match else 0
-            return level, xp
-
-        # Доп. парсинг под проблемные аккаунты (в т.ч. shadowcrypt94):
-        # Steam иногда возвращает level в альтернативном поле
-        rank_match = re.search(r'"player_level"[:\s]*(\d+)', html, re.IGNORECASE)
-        if rank_match:
-            level = int(rank_match.group(1))
-            xp_match = re.search(r'"experience_points"[:\s]*(\d+)', html, re.IGNORECASE)
-            xp = int(xp_match.group(1)) if xp_match else 0
-
-        return level, xp
-
-    def _fetch_steam_html(self, steam, url_suffix="gcpd/730/?tab=matchmaking"):
-        """Вспомогательный метод для Steam HTML без sessions.json."""
-        try:
-            steam.login()
-            resp = steam.session.get(f'https://steamcommunity.com/profiles/{steam.steamid}/{url_suffix}', timeout=10)
-            if resp.status_code == 200:
-                return resp.text
-        except:
-            pass
-        return None
-
 
     def set_ui_callback(self, callback):
         """✅ Регистрируем callback для AccountsListFrame"""
@@ -1035,6 +950,8 @@ class Account:
         В течение timeout секунд ищет окно 'Steam Service Error'
         и закрывает ТОЛЬКО его, не завершая Steam
         """
+        from pywinauto import findwindows
+
         start_time = time.time()
 
         def worker():
@@ -1054,39 +971,13 @@ class Account:
 
         threading.Thread(target=worker, daemon=True).start()
         
-    def MonitorCS2(self, interval: float = 2.0):
+    def MonitorCS2(self):
         """
         ПАССИВНЫЙ мониторинг CS2. Только отслеживает состояние, НИЧЕГО НЕ ЗАКРЫВАЕТ.
-        Меняет цвет на серый при пропаже процесса.
+        Аккаунт ставится на общий ProcessWatcherModule (один поток на все аккаунты),
+        который меняет цвет на серый при пропаже процесса.
         """
-        self._stop_monitoring = False
-
-        def monitor():
-            while not self._stop_monitoring:
-                # Если CS2Process не задан — ждём
-                if not getattr(self, 'CS2Process', None):
-                    time.sleep(interval)
-                    continue
-
-                # Проверяем жив ли процесс
-                if psutil.pid_exists(self.CS2Process.pid):
-                    # Живой CS2 = зелёный
-                    if self._color != "green":
-                        self.setColor("green")
-                    time.sleep(interval)
-                    continue
-
-                # CS2 пропал — меняем цвет на серый (БЕЗ перезапусков/закрытий)
-                print(f"⚪ [{self.login}] CS2.exe пропал (PID {self.CS2Process.pid})")
-                self.CS2Process = None
-                self.setColor("#DCE4EE")  # серый — CS2 закрыт
-                
-                # Ждём новый CS2 (пассивно)
-                time.sleep(interval * 5)
-
-        thread = threading.Thread(target=monitor, daemon=True)
-        thread.start()
-
+        ProcessWatcherModule().watch(self)
 
     def KillSteamAndCS(self):
         """
@@ -1102,13 +993,15 @@ class Account:
 
         # CS2 НЕ УБИВАЕМ — остаётся работать
         self.setColor("#DCE4EE")
-        self._stop_monitoring = True
+        ProcessWatcherModule().unwatch(self)
 
     def ProcessWindowsAfterCS(self, steamPid):
         """
         Закрывает все дополнительные окна Steam после авторизации.
         Окна CS2 всегда защищены и не трогаются.
         """
+        from pywinauto import findwindows
+
         try:
             parent = psutil.Process(steamPid)
             children = parent.children(recursive=True)
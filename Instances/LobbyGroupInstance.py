@@ -0,0 +1,43 @@
+from Instances.LobbyInstance import LobbyInstance
+
+
+class LobbyGroupInstance:
+    """
+    Одна независимая четвёрка окон со своим лобби и своим циклом поиска:
+    slot1=leader1, slot2=bot1, slot3=leader2, slot4=bot2.
+    """
+
+    IDLE = "idle"
+    COLLECTING = "collecting"
+    SEARCHING = "searching"
+    RECOVERING = "recovering"
+    MATCHED = "matched"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+    def __init__(self, index, accounts):
+        self.index = index
+        self.state = self.IDLE
+        self.cycle = 0
+        self.last_error = None
+        self.set_accounts(accounts)
+
+    def set_accounts(self, accounts):
+        leader1, bot1, leader2, bot2 = accounts
+        self.accounts = [leader1, bot1, leader2, bot2]
+        self.team1 = LobbyInstance(leader1, [bot1])
+        self.team2 = LobbyInstance(leader2, [bot2])
+
+    @property
+    def logins(self):
+        return [acc.login for acc in self.accounts]
+
+    @property
+    def leaders(self):
+        return [self.team1.leader, self.team2.leader]
+
+    def is_valid(self):
+        return all(acc.isCSValid() for acc in self.accounts)
+
+    def __repr__(self):
+        return f"LobbyGroup#{self.index + 1}({', '.join(self.logins)}; {self.state})"
@@ -1,14 +1,12 @@
 import time
 
-import pyautogui
-import pyperclip
 import win32gui
 import win32con
 import win32process
-import keyboard
-import psutil
 
 from Helpers.MouseController import MouseHelper
+from Managers.ProcessManager import ProcessManager
+from Managers.WindowManager import WindowManager
 
 
 class LobbyInstance:
@@ -19,6 +17,8 @@ class LobbyInstance:
     @staticmethod
     def _is_cancelled():
         try:
+            import keyboard
+
             return keyboard.is_pressed("ctrl+q")
         except Exception:
             return False
@@ -59,11 +59,7 @@ class LobbyInstance:
     def _is_cs2_process(pid):
         if not pid:
             return False
-        try:
-            proc = psutil.Process(pid)
-            return (proc.name() or "").lower() == "cs2.exe"
-        except Exception:
-            return False
+        return ProcessManager().is_alive(pid, name="cs2.exe")
 
     def _resolve_member_cs2_hwnd(self, member):
         hwnd = 0
@@ -90,41 +86,10 @@ class LobbyInstance:
         if not self._is_cs2_process(pid):
             return 0
 
-        candidates = []
-
-        def enum_cb(enum_hwnd, _):
-            try:
-                if not win32gui.IsWindow(enum_hwnd):
-                    return True
-                if not win32gui.IsWindowVisible(enum_hwnd):
-                    return True
-                if win32gui.GetParent(enum_hwnd) != 0:
-                    return True
-
-                _, hwnd_pid = win32process.GetWindowThreadProcessId(enum_hwnd)
-                if hwnd_pid != pid:
-                    return True
-
-                rect = win32gui.GetWindowRect(enum_hwnd)
-                area = max(0, rect[2] - rect[0]) * max(0, rect[3] - rect[1])
-                if area <= 0:
-                    return True
-
-                candidates.append((area, rect[0], rect[1], enum_hwnd))
-            except Exception:
-                pass
-            return True
-
-        try:
-            win32gui.EnumWindows(enum_cb, None)
-        except Exception:
-            return 0
-
-        if not candidates:
-            return 0
-
-        candidates.sort(key=lambda item: (-item[0], item[1], item[2]))
-        return candidates[0][3]
+        hwnd = WindowManager().get_largest_window(pid)
+        if hwnd and win32gui.IsWindow(hwnd):
+            return hwnd
+        return 0
 
     def _resolve_member_hwnd(self, member):
         """CS2-aware HWND with safe fallback to raw FindCSWindow when needed."""
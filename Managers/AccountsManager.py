@@ -1,10 +1,10 @@
 import os
-import json
 import threading
 import queue
-import time
 
 from Instances.AccountInstance import Account
+from Managers.LaunchPipeline import LaunchPipeline
+from Managers.MafileIndex import MAFILES_DIR, MafileIndex
 
 
 class AccountManager:
@@ -15,7 +15,7 @@ class AccountManager:
             cls._instance = super().__new__(cls)
         return cls._instance
 
-    def __init__(self, logpass_file="logpass.txt", mafiles_dir="mafiles"):
+    def __init__(self, logpass_file="logpass.txt", mafiles_dir=MAFILES_DIR):
         if hasattr(self, "_initialized"):
             return  # чтобы __init__ не выполнялся повторно
         self._initialized = True
@@ -27,8 +27,10 @@ class AccountManager:
         self.accounts_start_queue = queue.Queue()
         self._batch_start_remaining = 0
         self._batch_lock = threading.Lock()
-        self.post_launch_delay_seconds = 5
-        self.inter_account_delay_seconds = 10
+        self.launch_pipeline = LaunchPipeline(
+            on_success=self._on_account_launched,
+            on_failure=self._on_account_launch_failed,
+        )
         self.accounts_start_queue_thread = threading.Thread(target=self._accounts_start_process_queue, daemon=True)
         self.accounts_start_queue_thread.start()
 
@@ -42,72 +44,19 @@ class AccountManager:
         with open(self.logpass_file, "r") as f:
             lines = [line.strip().split(":") for line in f if ":" in line]
 
-        # Загружаем mafiles
-        mafiles = {}
-        if os.path.exists(self.mafiles_dir):
-            for file in os.listdir(self.mafiles_dir):
-                if file.lower().endswith(".mafile"):
-                    try:
-                        with open(os.path.join(self.mafiles_dir, file), "r", encoding="utf-8") as f:
-                            data = json.load(f)
-                            session = data.get("Session") or {}
-
-                            # В разных экспортерах поля могут называться по-разному.
-                            account_name = (
-                                data.get("account_name")
-                                or data.get("AccountName")
-                                or session.get("AccountName")
-                                or session.get("account_name")
-                                or ""
-                            ).strip().lower()
-
-                            # Извлекаем shared_secret и identity_secret (поддержка альтернативных ключей)
-                            shared_secret = (
-                                data.get("shared_secret")
-                                or data.get("SharedSecret")
-                                or session.get("SharedSecret")
-                            )
-                            identity_secret = (
-                                data.get("identity_secret")
-                                or data.get("IdentitySecret")
-                                or session.get("IdentitySecret")
-                            )
-
-                            # Извлекаем steam_id из mafile
-                            steam_id = (
-                                session.get("SteamID")
-                                or data.get("steamid")
-                                or data.get("SteamID")
-                                or 0
-                            )
-
-                            if account_name:
-                                mafiles[account_name] = {
-                                    "shared_secret": shared_secret,
-                                    "identity_secret": identity_secret,
-                                    "steam_id": steam_id
-                                }
-                    except Exception:
-                        pass
+        # mafiles — из индекса (файлы перечитываются, только если изменились)
+        if self.mafiles_dir == MAFILES_DIR:
+            mafiles = MafileIndex()
+        else:
+            mafiles = MafileIndex.create_isolated(self.mafiles_dir, os.path.join(self.mafiles_dir, "mafile_index.json"))
 
         # Создаем список аккаунтов
         accounts = []
         for login, password in lines:
-            mafile_data = mafiles.get(login.lower())
+            mafile_data = mafiles.by_login(login)
             if mafile_data:
-                try:
-                    if not mafile_data.get("shared_secret"):
-                        print(f"⚠️ [{login}] mafile найден, но shared_secret пустой")
-                    accounts.append(Account(
-                        login,
-                        password,
-                        mafile_data.get("shared_secret"),
-                        int(mafile_data.get("steam_id", 0)),
-                        mafile_data.get("identity_secret")
-                        ))
-                except Exception as e:
-                    print(f"⚠️ [{login}] Ошибка чтения mafile: {e}")
-                    accounts.append(Account(login, password, None, 0, None))
+                # секреты Account прочитает из mafile при первом обращении
+                accounts.append(Account(login, password, steam_id=mafile_data.steam_id, mafile=mafile_data))
             else:
                 print(f"⚠️ [{login}] mafile не найден по account_name")
                 accounts.append(Account(login, password, None, 0, None))  # Без секретов и steam_id
@@ -142,8 +91,8 @@ class AccountManager:
             print(f"{account.login} is already running skip")
             return
 
-        # Проверка: уже в очереди
-        if account in list(self.accounts_start_queue.queue):
+        # Проверка: уже в очереди или в конвейере запуска
+        if account in list(self.accounts_start_queue.queue) or self.launch_pipeline.is_active(account):
             print(f"{account.login} in start queue skip")
             return
         account.setColor("yellow")
@@ -152,28 +101,31 @@ class AccountManager:
         print(f"{account.login} added to start queue")
 
     def _accounts_start_process_queue(self):
-        """Обрабатываем очередь аккаунтов по одному"""
+        """Передаём аккаунты из очереди в конвейер запуска (стадии перекрываются между аккаунтами)"""
         while True:
             account = self.accounts_start_queue.get()
             if account is None:
                 break
 
             try:
-                account.StartGame()  # запуск аккаунта
-
-                # Ждём 5 секунд после открытия каждого аккаунта
-                time.sleep(self.post_launch_delay_seconds)
-
-                # После успешного запуска меняем цвет на зелёный
-                account.setColor("green")
-                account.MonitorCS2(interval=5)  # запускаем мониторинг CS2
-
-                # Если запускаем пачку из нескольких аккаунтов — задержка 10 сек перед следующим
-                remaining_batch = self._consume_batch_item()
-                if remaining_batch > 0:
-                    time.sleep(self.inter_account_delay_seconds)
+                self.launch_pipeline.submit(account)
             except Exception as e:
                 print(f"Ошибка запуска {account.login}: {e}")
                 account.KillSteamAndCS()
             finally:
-                self.accounts_start_queue.task_done()
\ No newline at end of file
+                self.accounts_start_queue.task_done()
+
+    def _on_account_launched(self, account):
+        # После успешного запуска меняем цвет на зелёный
+        account.setColor("green")
+        account.MonitorCS2()  # запускаем мониторинг CS2
+        self._finish_batch_item()
+
+    def _on_account_launch_failed(self, account):
+        account.KillSteamAndCS()
+        self._finish_batch_item()
+
+    def _finish_batch_item(self):
+        # Пачка закончилась — печатаем, куда ушло время запуска
+        if self._consume_batch_item() == 0 and not self.accounts_start_queue.qsize():
+            self.launch_pipeline.report()
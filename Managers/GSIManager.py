@@ -1,25 +1,22 @@
+import sys
 import threading
-import logging
-import os
-import pyautogui
+from collections import OrderedDict
 import time
-import json
-import re
-import psutil
-import win32gui
-import win32process
-import win32con
-import win32api
-import win32com.client
-import pydirectinput
 from enum import Enum
-from flask import Flask, request
 import random
-import keyboard
-from Managers.LobbyManager import LobbyManager
+from Helpers.InputLock import INPUT_LOCK
 
-from Managers.AccountsManager import AccountManager
+from Managers.GSIQueue import GSIEventQueue
+from Managers.GSIRecorder import GSIRecorder
+from Managers.GSIServer import GSIServer
+from Managers.JobScheduler import CancelToken, JobScheduler
+from Managers.LogEventManager import LogEventManager
 from Managers.LogManager import LogManager
+from Managers.MafileIndex import MafileIndex
+from Managers.ProcessManager import ProcessManager
+from Managers.RuntimeRegistry import RuntimeRegistry
+from Managers.SettingsManager import SettingsManager
+from Managers.WindowManager import WindowManager
 
 
 # =========================
@@ -37,6 +34,63 @@ class MatchState(Enum):
     GAMEOVER = 2
 
 
+class MatchPartition:
+    """Состояние FSM одного матча: раунды, игроки по раундам, токены отмены раундов, T-действия."""
+
+    def __init__(self, key, map_name=None):
+        self.key = key
+        self.map_name = map_name
+        self.clients = set()
+        self.logins = set()
+        self.created_at = self.last_seen = time.time()
+        self.finished_at = None
+        self.match_token = None
+        self.reset()
+
+    def reset(self):
+        self.round_state = RoundState.IDLE
+        self.match_state = MatchState.WAITING
+        self.current_round = None
+        self.round_players = {}
+        self.printed_rounds = set()
+        self.t_actions_done_rounds = set()
+        if self.match_token is not None:
+            self.match_token.cancel("новый матч")
+        # токен матча -> токены раундов: конец раунда отменяет его задачи, конец матча — все
+        self.match_token = CancelToken(name=self.key)
+        self.round_tokens = {}
+        # последний закончившийся раунд: его токен и токены раньше — всегда отменённые
+        self.last_ended_round = None
+        self.finished_at = None
+
+    def round_token(self, round_number):
+        token = self.round_tokens.get(round_number)
+        if token is None:
+            token = self.match_token.child(f"{self.key}#{round_number}")
+            if self.last_ended_round is not None and round_number <= self.last_ended_round:
+                # раунд уже закончен — поздний запрос не должен оживить его задачи
+                token.cancel("раунд уже закончен")
+                return token
+            self.round_tokens[round_number] = token
+        return token
+
+    def end_round(self, round_number, reason="конец раунда"):
+        """Отменить задачи раунда round_number и всех предыдущих (пропущенный over не держит ctrl+k)."""
+        if self.last_ended_round is None or round_number > self.last_ended_round:
+            self.last_ended_round = round_number
+        for number in list(self.round_tokens):
+            if number <= round_number:
+                self.round_tokens.pop(number).cancel(reason)
+
+    def release(self, reason="партиция удалена"):
+        """Отменить все задачи матча (T-маршруты, ctrl+k) — матч закончен или партиция удаляется."""
+        self.match_token.cancel(reason)
+
+    def __repr__(self):
+        return (f"MatchPartition({self.key}, {self.match_state.name}, round={self.current_round}, "
+                f"clients={len(self.clients)})")
+
+
 T_ACTIONS_LONG = T_ACTIONS_SECOND = [
     ("A", 0.1), ("W", 1.7), ("A", 2.7), ("W", 5.2), ("S", 0.31),
     ("A", 0.4), ("E", 0.1),("W+A", 2.3),("D", 0.4),("W+A", 0.7), ("W", 2.4), ("S", 0.3),
@@ -53,6 +107,15 @@ RANDOM_PRE_LONG_KEYS = ["z", "x", "c", "v",  "n",  ",", "."]
 class GSIManager:
     _instance = None
 
+    # Партиция матча после gameover живёт ещё столько секунд (поздние payload'ы с табло), без payload'ов — столько
+    PARTITION_GAMEOVER_TTL = 120
+    PARTITION_IDLE_TTL = 1800
+    FINISHED_KEYS_LIMIT = 64
+
+    # Клавиатура и активное окно общие на всю ОС, а не на матч: «активировать окно + нажать клавиши»
+    # выполняется целиком под общим локом ввода (его же берут LobbyManager и AutoAccept)
+    _input_lock = INPUT_LOCK
+
     def __new__(cls):
         if cls._instance is None:
             cls._instance = super().__new__(cls)
@@ -62,50 +125,68 @@ class GSIManager:
     def __init__(self):
         if self._initialized:
             return
+        self._init_state()
+        self._initialized = True
 
-        logging.getLogger("werkzeug").setLevel(logging.ERROR)
-        
-        self.round_over_events = {i: threading.Event() for i in range(1, 17)}
+    @classmethod
+    def create_isolated(cls, **managers):
+        """Отдельный экземпляр мимо синглтона (реплей записей GSI); managers — подмены, см. _init_state."""
+        instance = super().__new__(cls)
+        instance._initialized = False
+        instance._init_state(**managers)
+        instance._initialized = True
+        return instance
+
+    def _init_state(self, account_manager=None, window_manager=None, process_manager=None, mafiles=None,
+                    workers=None):
+        """
+        Менеджеры можно подменить (реплей без Win32): по умолчанию — настоящие синглтоны.
+        AccountManager тянет AccountInstance и Win32 — импортируется, только если его не передали.
+        """
         self._freeze_ctrl_active = False
 
-        self.app = Flask("CS2-GSI")
-        self.app.logger.disabled = True
-        self._thread = None
+        # Сервер только принимает; FSM меняется одним потребителем очереди
+        self.queue = GSIEventQueue(self.handle_payload)
+        self.server = GSIServer(self.queue.put, host="127.0.0.1", port=6969)
 
         self.logManager = LogManager._instance if LogManager._instance else LogManager()
-        self.accountManager = AccountManager()
+        if account_manager is None:
+            from Managers.AccountsManager import AccountManager
+
+            account_manager = AccountManager()
+        self.accountManager = account_manager
+        self.windowManager = window_manager if window_manager is not None else WindowManager()
+        self.processManager = process_manager if process_manager is not None else ProcessManager()
         self.accounts_list_frame = None
         self._freeze_ctrl_event = threading.Event()  # 🆕
         self._gameover_lock = threading.Lock()
         self._last_gameover_trigger_ts = 0.0
         self._post_game_flow_running = False
-        
-        self.t_actions_done_rounds = set()
+        self._post_game_token = None
+
+        # действия раундов и матча — в ограниченном пуле, а не поток на каждое
+        if workers is None:
+            workers = SettingsManager().get("GSIWorkerCount", 8)
+        self.scheduler = JobScheduler(workers, name="GSI-jobs")
 
-        # 🆕 Блокировка для раунда 1
-        
         # =========================
-        # FSM STATE
+        # FSM STATE — по партиции на матч
         # =========================
-        self.round_state = RoundState.IDLE
-        self.match_state = MatchState.WAITING
-
-        self.current_round = None
-        self.round_players = {}
-        self.printed_rounds = set()
+        self.partitions = {}
+        # ключ завершённого матча -> время удаления (поздний gameover не создаёт партицию заново)
+        self._finished_keys = OrderedDict()
+        self._last_eviction_check = 0.0
+        # login (lower) -> match_id из консольного лога
+        self._match_id_by_login = {}
 
         # блокировки
         self.parsing_in_progress = False
 
-        # runtime.json
+        # runtime (RuntimeRegistry)
         self.login_to_pid = self._load_runtime_data()
 
-        # mafiles
-        self.mafiles_dir = "mafiles"
-        self.steamid_login_cache = {}
-
-        self._register_routes()
-        self._initialized = True
+        # mafiles: steamid -> login
+        self.mafiles = mafiles if mafiles is not None else MafileIndex()
 
     # =========================
     # UI
@@ -115,70 +196,30 @@ class GSIManager:
         print("✅ GSIManager подключен к UI")
 
     # =========================
-    # runtime.json
+    # runtime (RuntimeRegistry)
     # =========================
-    def _get_runtime_path(self):
-        for path in [
-            "runtime.json",
-            os.path.join("..", "runtime.json"),
-            os.path.join(os.path.dirname(os.path.dirname(__file__)), "runtime.json")
-        ]:
-            if os.path.exists(path):
-                return path
-        return None
-
     def _load_runtime_data(self):
-        path = self._get_runtime_path()
-        if not path:
-            return {}
-
-        try:
-            with open(path, "r", encoding="utf-8") as f:
-                data = json.load(f)
-
-            mapping = {}
-            for item in data:
-                login = item.get("login")
-                pid = item.get("CS2Pid")
-                try:
-                    pid = int(pid)
-                except (TypeError, ValueError):
-                    pid = None
-
-                if login and pid:
-                    mapping[login.lower()] = (login, pid)
-
-            print(f"✅ runtime.json загружен: {len(mapping)} аккаунтов")
-            return mapping
-        except Exception as e:
-            print(f"❌ runtime.json ошибка: {e}")
-            return {}
+        """login (lower) -> (login, CS2Pid) из RuntimeRegistry (из памяти; файл — только если его меняли)."""
+        mapping = {}
+        for entry in RuntimeRegistry().entries():
+            if entry.cs2_pid:
+                mapping[entry.login.lower()] = (entry.login, entry.cs2_pid)
+        return mapping
 
     # =========================
     # CS2 WINDOWS
     # =========================
     def _extract_login(self, title: str):
-        m = re.match(r"\[FSN FREE\]\s*(.+)", title)
-        return m.group(1).strip() if m else None
+        return WindowManager.extract_login(title)
 
     def _get_cs2_windows(self):
         active_logins = set()
 
-        def cb(hwnd, _):
-            if win32gui.IsWindowVisible(hwnd):
-                title = win32gui.GetWindowText(hwnd)
-                if "[FSN FREE]" in title:
-                    login = self._extract_login(title)
-                    if login:
-                        try:
-                            _, pid = win32process.GetWindowThreadProcessId(hwnd)
-                            active_logins.add((login, pid))
-                            print(f"🪟 НАЙДЕНО окно: {login} (PID:{pid}) | '{title}'")
-                        except Exception as e:
-                            print(f"❌ Ошибка PID для '{title}': {e}")
-            return True
+        for login, pid, hwnd in self.windowManager.get_fsn_windows():
+            if login:
+                active_logins.add((login, pid))
+                print(f"🪟 НАЙДЕНО окно: {login} (PID:{pid}) | HWND:{hwnd}")
 
-        win32gui.EnumWindows(cb, None)
         print(f"✅ CS2 окна найдено: {len(active_logins)}")
         return active_logins
 
@@ -189,7 +230,7 @@ class GSIManager:
                 self.login_to_pid[login.lower()] = (login, pid)
 
     def _reload_runtime_data(self):
-        """Обновляет runtime.json mapping, если файл доступен."""
+        """Дополняет mapping данными RuntimeRegistry."""
         runtime_mapping = self._load_runtime_data()
         if runtime_mapping:
             self.login_to_pid.update(runtime_mapping)
@@ -201,34 +242,25 @@ class GSIManager:
             if pid:
                 hwnds = self._get_hwnds_by_pid(pid, login)
             if not hwnds:
-                def cb(hwnd, _):
-                    if not win32gui.IsWindowVisible(hwnd):
-                        return True
-                    title = win32gui.GetWindowText(hwnd)
-                    if "[FSN FREE]" in title:
-                        if login.lower() in title.lower():
-                            hwnds.append(hwnd)
-                            return False
-                    return True
-                win32gui.EnumWindows(cb, None)
+                hwnd = self.windowManager.find_by_login(login)
+                if hwnd:
+                    hwnds.append(hwnd)
 
             if hwnds:
                 return hwnds[0]
 
             print(f"⏳ HWND не найден ({login}) попытка {attempt}/{retries}")
             time.sleep(delay)
+            self.windowManager.invalidate()
         return None
 
     def _get_active_from_runtime(self):
         active_logins = set()
         for lower_login, (login, pid) in self.login_to_pid.items():
-            try:
-                proc = psutil.Process(pid)
-                if proc.is_running() and "cs2" in proc.name().lower():
-                    active_logins.add(login)
-                    print(f"⚙️ Runtime НАЙДЕН: {login} (PID:{pid})")
-            except:
-                pass
+            info = self.processManager.get(pid)
+            if info and "cs2" in info.name:
+                active_logins.add(login)
+                print(f"⚙️ Runtime НАЙДЕН: {login} (PID:{pid})")
         print(f"✅ Runtime процессы: {len(active_logins)}")
         return active_logins
 
@@ -236,22 +268,9 @@ class GSIManager:
     # MAFILE
     # =========================
     def _login_from_mafile(self, steamid):
-        if steamid in self.steamid_login_cache:
-            return self.steamid_login_cache[steamid]
-
-        path = os.path.join(self.mafiles_dir, f"{steamid}.mafile")
-        if not os.path.exists(path):
-            return None
-
-        try:
-            with open(path, "r", encoding="utf-8") as f:
-                data = json.load(f)
-            login = data.get("account_name")
-            if login:
-                self.steamid_login_cache[steamid] = login
-            return login
-        except:
+        if not steamid:
             return None
+        return self.mafiles.login_for_steamid(steamid)
 
     # =========================
     # ROUND LOGS
@@ -262,8 +281,11 @@ class GSIManager:
             return f"{entry[0]} (PID:{entry[1]})"
         return login
 
-    def _round_start(self, rnd, ct, t):
-        players = self.round_players.get(rnd, {})
+    def _partition_label(self, partition):
+        return f" [{partition.map_name or '?'}]" if len(self.partitions) > 1 else ""
+
+    def _round_start(self, partition, rnd, ct, t):
+        players = partition.round_players.get(rnd, {})
         ct_team = []
         t_team = []
         
@@ -279,7 +301,7 @@ class GSIManager:
             else:
                 t_team.append(login_display)
 
-        print(f"\n🎮 НАЧАЛО РАУНДА {rnd} | CT:{ct} T:{t}")
+        print(f"\n🎮 НАЧАЛО РАУНДА {rnd}{self._partition_label(partition)} | CT:{ct} T:{t}")
         print("🔵 CT:")
         for p in ct_team:
             print(f"  • {p}")
@@ -289,8 +311,8 @@ class GSIManager:
         print("═" * 70)
 
 
-    def _round_end(self, rnd, ct, t, winner):
-        print(f"\n🏁 КОНЕЦ РАУНДА {rnd} | CT:{ct} T:{t} | {winner}")
+    def _round_end(self, partition, rnd, ct, t, winner):
+        print(f"\n🏁 КОНЕЦ РАУНДА {rnd}{self._partition_label(partition)} | CT:{ct} T:{t} | {winner}")
         print("═" * 70)
     def _get_hwnds_by_pid(self, target_pid, login=None):
         """Ищет top-level HWND процесса и приоритизирует «правильное» окно CS2."""
@@ -301,38 +323,24 @@ class GSIManager:
 
         hwnds = []
 
-        def callback(hwnd, _):
-            if not win32gui.IsWindowVisible(hwnd) or not win32gui.IsWindowEnabled(hwnd):
-                return True
-
-            # Берем только top-level окна процесса.
-            if win32gui.GetParent(hwnd) != 0:
-                return True
-
-            try:
-                _, pid = win32process.GetWindowThreadProcessId(hwnd)
-                if pid == target_pid:
-                    title = win32gui.GetWindowText(hwnd)
-                    title_lower = title.lower()
-
-                    score = 0
-                    # Самый приоритетный кейс: окно явно переименовано под логин.
-                    if login and login.lower() in title_lower:
-                        score += 100
-                    if "[fsn free]" in title_lower:
-                        score += 40
-                    # Фолбэк для ручного старта без переименования окна.
-                    if "counter-strike" in title_lower or "cs2" in title_lower:
-                        score += 20
-                    if title:
-                        score += 5
-
-                    hwnds.append((score, hwnd, title))
-            except:
-                pass
-            return True
-
-        win32gui.EnumWindows(callback, None)
+        # Берем только видимые, активные top-level окна процесса.
+        for info in self.windowManager.get_windows_by_pid(target_pid, enabled_only=True):
+            title = info.title
+            title_lower = title.lower()
+
+            score = 0
+            # Самый приоритетный кейс: окно явно переименовано под логин.
+            if login and login.lower() in title_lower:
+                score += 100
+            if "[fsn free]" in title_lower:
+                score += 40
+            # Фолбэк для ручного старта без переименования окна.
+            if "counter-strike" in title_lower or "cs2" in title_lower:
+                score += 20
+            if title:
+                score += 5
+
+            hwnds.append((score, info.hwnd, title))
 
         hwnds.sort(key=lambda item: item[0], reverse=True)
 
@@ -345,6 +353,9 @@ class GSIManager:
 
 
     def _activate_window(self, hwnd):
+        import win32con
+        import win32gui
+
         try:
             win32gui.ShowWindow(hwnd, win32con.SW_RESTORE)
             win32gui.SetForegroundWindow(hwnd)
@@ -353,27 +364,43 @@ class GSIManager:
         except Exception as e:
             print(f"❌ Не удалось активировать окно {hwnd}: {e}")
             return False
+
+    def _ensure_foreground(self, hwnd):
+        """Активировать окно, только если оно ещё не активное (без паузы _activate_window)."""
+        import win32gui
+
+        try:
+            if win32gui.GetForegroundWindow() == hwnd:
+                return True
+        except Exception:
+            pass
+        return self._activate_window(hwnd)
+
     def _reset_keys(self):
-        for k in ["w", "a", "s", "d", "e", "2"]:
-            pydirectinput.keyUp(k)
+        # pydirectinput/pywinauto/wmi/pyautogui грузятся при первом действии, а не при старте панели
+        import pydirectinput
 
-    def _sleep_with_stop(self, duration, stop_event=None, step=0.05):
+        # под локом ввода: не отпускать клавиши, которые сейчас держит задача другого матча
+        with self._input_lock:
+            for k in ["w", "a", "s", "d", "e", "2"]:
+                pydirectinput.keyUp(k)
+
+    def _sleep_with_stop(self, duration, stop_event=None):
+        """True — stop_event (Event или CancelToken) сработал раньше, чем прошло duration."""
         if not stop_event:
             time.sleep(duration)
             return False
-        elapsed = 0.0
-        while elapsed < duration:
-            if stop_event.is_set():
-                return True
-            time.sleep(step)
-            elapsed += step
-        return False
+        return stop_event.wait(duration)
 
     def _perform_actions(self, hwnd, actions, stop_event=None):
-        self._reset_keys()  # 👈 ВАЖНО: сначала отпускаем всё
+        import pydirectinput
 
-        if not self._activate_window(hwnd):
-            return
+        # Лок ввода — на каждое зажатие, а не на весь маршрут (~40с): между шагами проходят клики
+        # accept и лобби других групп, а окно маршрута заново активируется перед следующим шагом
+        with self._input_lock:
+            self._reset_keys()  # 👈 ВАЖНО: сначала отпускаем всё
+            if not self._activate_window(hwnd):
+                return
 
         if self._sleep_with_stop(0.25, stop_event=stop_event):
             return  # 👈 рекомендую, CS2 любит паузу
@@ -381,57 +408,57 @@ class GSIManager:
         for key, duration in actions:
             if stop_event and stop_event.is_set():
                 return
-            if "+" in key:
-                keys = key.split("+")
-                for k in keys:
-                    pydirectinput.keyDown(k.lower())
-                if self._sleep_with_stop(duration, stop_event=stop_event):
-                    for k in keys:
-                        pydirectinput.keyUp(k.lower())
+            keys = [k.lower() for k in key.split("+")]
+            with self._input_lock:
+                if not self._ensure_foreground(hwnd):
                     return
                 for k in keys:
-                    pydirectinput.keyUp(k.lower())
-            else:
-                pydirectinput.keyDown(key.lower())
-                if self._sleep_with_stop(duration, stop_event=stop_event):
-                    pydirectinput.keyUp(key.lower())
-                    return
-                pydirectinput.keyUp(key.lower())
+                    pydirectinput.keyDown(k)
+                try:
+                    stopped = self._sleep_with_stop(duration, stop_event=stop_event)
+                finally:
+                    for k in keys:
+                        pydirectinput.keyUp(k)
+            if stopped:
+                return
 
             if self._sleep_with_stop(0.05, stop_event=stop_event):
                 return
 
     def _press_random_pre_long_key(self, hwnd, stop_event=None):
         """Перед длинным маршрутом: активируем окно и жмём случайную кнопку."""
+        import pydirectinput
+
         if stop_event and stop_event.is_set():
             return
 
-        if not self._activate_window(hwnd):
-            return
+        with self._input_lock:
+            if not self._activate_window(hwnd):
+                return
 
-        if self._sleep_with_stop(0.15, stop_event=stop_event):
-            return
+            if self._sleep_with_stop(0.15, stop_event=stop_event):
+                return
 
-        key = random.choice(RANDOM_PRE_LONG_KEYS)
-        print(f"🎲 PRE-LONG: нажимаем '{key}'")
+            key = random.choice(RANDOM_PRE_LONG_KEYS)
+            print(f"🎲 PRE-LONG: нажимаем '{key}'")
 
-        try:
-            pydirectinput.press(key)
-        except Exception as e:
-            print(f"⚠️ Ошибка нажатия '{key}': {e}")
+            try:
+                pydirectinput.press(key)
+            except Exception as e:
+                print(f"⚠️ Ошибка нажатия '{key}': {e}")
 
         self._sleep_with_stop(0.1, stop_event=stop_event)
 
 
-    def _perform_t_actions_for_round(self, round_number):
+    def _perform_t_actions_for_round(self, partition, round_number):
 
 
-        if round_number in self.t_actions_done_rounds:
+        if round_number in partition.t_actions_done_rounds:
             return
 
-        print(f"🔥 T-АCTIONS | ROUND {round_number}")
+        print(f"🔥 T-АCTIONS | ROUND {round_number}{self._partition_label(partition)}")
 
-        stop_event = self.round_over_events.get(round_number)
+        stop_event = partition.round_token(round_number)
 
         # ===== 1. ЖДЕМ 1 СЕКУНДУ ПОСЛЕ НАЧАЛА РАУНДА =====
         print("⏱️ Ждем 1 секунду после начала раунда...")
@@ -441,7 +468,7 @@ class GSIManager:
         # ========= ЖДЕМ T ИГРОКОВ (минимум 1, макс 2 для 2x2) =========
         t_players = []
         for attempt in range(2):
-            players = self.round_players.get(round_number, {})
+            players = partition.round_players.get(round_number, {})
             t_players = [login for login, team in players.items() if team == "T"]
             
             print(f"🔍 Попытка {attempt+1}: T игроков = {len(t_players)}/{len(players)}")
@@ -535,29 +562,32 @@ class GSIManager:
             self._perform_actions(hwnd_long, T_ACTIONS_LONG, stop_event=stop_event)
 
 
+        # раунд закончился во время маршрута — CT-маршруты и ctrl+k уже не нужны
+        if stop_event.is_set():
+            return
+
         # ========= CT ДЕЙСТВИЯ (только если есть CT) =========
-        players = self.round_players.get(round_number, {})
+        players = partition.round_players.get(round_number, {})
         ct_players = [login for login, team in players.items() if team == "CT"]
         if ct_players:
-            self._perform_ct_actions_for_round(round_number)
+            self._perform_ct_actions_for_round(partition, round_number, stop_event)
 
         # ========= CTRL+K =========
-        if hwnd_long:
-            threading.Thread(
-                target=self._spam_k_until_round_over,
-                args=(hwnd_long, round_number),
-                daemon=True
-            ).start()
-
-        self.t_actions_done_rounds.add(round_number)
+        if hwnd_long and not stop_event.is_set():
+            self.scheduler.submit("spam_k", self._spam_k_until_round_over, hwnd_long, round_number, stop_event,
+                                  token=stop_event)
+
+        if stop_event.is_set():
+            return
+        partition.t_actions_done_rounds.add(round_number)
         print(f"✅ T-ACTIONS завершены для раунда {round_number}")
 
 
 
 
 
-    def _perform_ct_actions_for_round(self, round_number):
-        players = self.round_players.get(round_number, {})
+    def _perform_ct_actions_for_round(self, partition, round_number, stop_event):
+        players = partition.round_players.get(round_number, {})
         ct_players = sorted([login for login, team in players.items() if team == "CT"])
 
         for login in ct_players:
@@ -577,39 +607,31 @@ class GSIManager:
                 ("A+S", 1.8),
                 ("A+W", 1.8),
                 ("S+A", 1.8),
-            ])
+            ], stop_event=stop_event)
+
 
 
+    def _spam_k_until_round_over(self, hwnd, round_number, token):
+        import pydirectinput
 
-    def _spam_k_until_round_over(self, hwnd, round_number):
         print(f"⌨️ ctrl + K до конца раунда {round_number}")
 
         self._reset_keys()
-        if not self._activate_window(hwnd):
-            return
-
-        # зажимаем Ctrl (ctrl, если нужно)
-        pydirectinput.keyDown("ctrl")
-        time.sleep(0.05)
-
-        try:
-            while True:
-                round_event = self.round_over_events.get(round_number)
-                
-                # Условие для обычных раундов
-                if round_event and round_event.is_set():
-                    break
 
-                # Условие для последнего раунда 16: ждем map_phase=gameover
-                if round_number == 16 and self.match_state == MatchState.GAMEOVER:
+        # токен раунда отменяется по round over, а последнего раунда — по gameover (токен матча)
+        while not token.is_set():
+            # ctrl+k целиком на каждое нажатие: между нажатиями ввод свободен для других матчей,
+            # а ctrl не остаётся зажатым, пока они шлют W/A/S/D в свои окна
+            with self._input_lock:
+                if not self._ensure_foreground(hwnd):
                     break
-
-                pydirectinput.press("k")
-                time.sleep(0.05)
-        finally:
-            pydirectinput.keyUp("ctrl")
-            pydirectinput.keyUp("k")
-            print(f"🛑 Раунд {round_number} завершён, ctrl+k отпущен")
+                pydirectinput.keyDown("ctrl")
+                try:
+                    pydirectinput.press("k")
+                finally:
+                    pydirectinput.keyUp("ctrl")
+            token.wait(0.05)
+        print(f"🛑 Раунд {round_number} завершён, ctrl+k остановлен")
 
 
 
@@ -617,7 +639,12 @@ class GSIManager:
     # =========================
     # LEVEL PARSING
     # =========================
-    def _parse_levels_after_match(self):
+    def _parse_levels_after_match(self, logins=None):
+        # Параллельные матчи заканчиваются независимо: их парсинг ждёт очереди, а не пропускается
+        waited = 0.0
+        while logins and self.parsing_in_progress and waited < 300:
+            time.sleep(1.0)
+            waited += 1.0
         if self.parsing_in_progress:
             print("⚠️ 🔒 Парсинг уже идет")
             return
@@ -635,6 +662,10 @@ class GSIManager:
         for login, _ in window_logins:
             all_active.add(login)
         all_active.update(runtime_logins)
+        if logins:
+            # только аккаунты закончившегося матча
+            wanted = {login.lower() for login in logins}
+            all_active = {login for login in all_active if login.lower() in wanted}
         
         print(f"🔍 АКТИВНЫХ ({len(all_active)}): {sorted(all_active)}")
         
@@ -643,113 +674,218 @@ class GSIManager:
             self.parsing_in_progress = False
             return
 
-        parsed = 0
+        accounts_by_login = {acc.login.lower(): acc for acc in self.accountManager.accounts}
+        accounts = []
         for login in sorted(all_active):
-            print(f"\n🔍 '{login}'")
-            for i, acc in enumerate(self.accountManager.accounts):
-                print(f"  [{i}] '{acc.login}'")
-                if acc.login.lower() == login.lower():
-                    print(f"  ✅ НАЙДЕН: {login}")
-                    if hasattr(acc, 'parse_current_level'):
-                        try:
-                            if acc.parse_current_level():
-                                parsed += 1
-                                level = getattr(acc, 'level', 0)
-                                xp = getattr(acc, 'xp', 0)
-                                xp_pretty = f"{xp:,}".replace(",", " ")
-                                print(f"✅ [{login}] lvl: {level} | xp: {xp_pretty}")
-                                self.logManager.add_log(f"✅ [{login}] lvl: {level} | xp: {xp_pretty}")
-                                if self.accounts_list_frame:
-                                    self.accounts_list_frame.update_account_level(login, level, xp)
-                        except Exception as e:
-                            print(f"❌ [{login}] Ошибка: {e}")
-                    break
-            else:
+            acc = accounts_by_login.get(login.lower())
+            if acc is None or not hasattr(acc, 'parse_current_level'):
                 print(f"❌ [{login}] НЕ НАЙДЕН")
+                continue
+            accounts.append(acc)
+
+        # Steam-запросы всех аккаунтов — параллельно (SteamBatchClient), UI обновляется по результатам;
+        # requests/rsa грузятся здесь, после первого матча, а не при старте
+        from Managers.SteamBatchClient import SteamBatchClient
+
+        parsed = 0
+        for result in SteamBatchClient().run(accounts, lambda acc: acc.parse_current_level()):
+            acc = accounts_by_login[result.login.lower()]
+            if not result.ok:
+                print(f"❌ [{result.login}] Ошибка: {result.error}")
+                continue
+            if not result.value:
+                continue
+            parsed += 1
+            level = getattr(acc, 'level', 0)
+            xp = getattr(acc, 'xp', 0)
+            xp_pretty = f"{xp:,}".replace(",", " ")
+            print(f"✅ [{acc.login}] lvl: {level} | xp: {xp_pretty} ({result.seconds:.1f}s)")
+            self.logManager.add_log(f"✅ [{acc.login}] lvl: {level} | xp: {xp_pretty}")
+            if self.accounts_list_frame:
+                self.accounts_list_frame.update_account_level(acc.login, level, xp)
 
         print(f"🎉 ПАРСИНГ: {parsed}/{len(all_active)}")
         self.logManager.add_log(f"🎉 Обновлено {parsed} уровней")
         self.parsing_in_progress = False
 
     # =========================
-    # GSI ROUTE
+    # MATCH PARTITIONS
     # =========================
+    def _on_match_id_event(self, event):
+        if event.login and event.value:
+            self._match_id_by_login[event.login.lower()] = event.value
+
+    def _lobby_group_for(self, login):
+        # модуль не загружен — лобби не создавались; импорт ради проверки тянул бы Win32
+        module = sys.modules.get("Managers.LobbyManager")
+        lobby_manager = module.LobbyManager._instance if module is not None else None
+        if lobby_manager is None:
+            return None
+        for group in getattr(lobby_manager, "groups", ()):
+            if login in group.logins:
+                return group.index
+        return None
 
-    def _register_routes(self):
-        @self.app.route("/", methods=["POST"])
-        def gsi():
-            data = request.json
-            if not data:
-                return "ok"
-
-            player = data.get("player")
-            round_info = data.get("round", {})
-            map_info = data.get("map", {})
-
-            round_phase = round_info.get("phase")
-            map_phase = map_info.get("phase")
-
-            ct = map_info.get("team_ct", {}).get("score", 0)
-            t = map_info.get("team_t", {}).get("score", 0)
-
-            round_start_num = ct + t + 1
-            round_end_num = ct + t
-
-            # сбор игроков
-            if player:
-                login = self._login_from_mafile(str(player.get("steamid")))
-                if login:
-                    self.round_players.setdefault(round_start_num, {})[login] = player.get("team")
-
-            # ===== ROUND FSM =====
-            if round_phase == "live":
-                self._freeze_ctrl_event.set()   # 🛑 стоп Ctrl-логик (если есть)
-                self._freeze_ctrl_active = False
-                self.round_state = RoundState.LIVE
-
-                self.current_round = round_start_num
-                if self.current_round not in self.printed_rounds:
-                    self.printed_rounds.add(self.current_round)
-                    self._round_start(self.current_round, ct, t)
-                    threading.Thread(
-                        target=self._perform_t_actions_for_round,
-                        args=(self.current_round,),
-                        daemon=True
-                    ).start()
-
-            elif round_phase == "over" and self.round_state == RoundState.LIVE:
-                self._round_end(round_end_num, ct, t, round_info.get("win_team", "?"))
-                if round_end_num in self.round_over_events:
-                    self.round_over_events[round_end_num].set()
-                self.round_state = RoundState.OVER
+    def _partition_key(self, payload, login):
+        """
+        Матч = карта + то, что связывает клиента с конкретной игрой:
+        match_id из его консольного лога, иначе его четвёрка в мульти-лобби, иначе только карта.
+        """
+        ident = "default"
+        if login:
+            match_id = self._match_id_by_login.get(login.lower())
+            if match_id:
+                ident = f"match:{match_id}"
             else:
-                self.round_state = RoundState.IDLE
+                group = self._lobby_group_for(login)
+                if group is not None:
+                    ident = f"lobby:{group}"
+        return f"{payload.map_name or '?'}|{ident}"
+
+    def _get_partition(self, payload):
+        if not payload.map_name and not payload.map_phase:
+            return None  # меню: матча нет
+
+        owner = payload.provider_steamid or payload.steamid
+        login = self._login_from_mafile(owner) if owner else None
+        key = self._partition_key(payload, login)
+
+        partition = self.partitions.get(key)
+        if partition is None:
+            if key in self._finished_keys:
+                if payload.map_phase == "gameover":
+                    return None  # табло уже закрытого матча
+                del self._finished_keys[key]
+            partition = MatchPartition(key, payload.map_name)
+            self.partitions[key] = partition
+            print(f"🧩 GSI: новый матч {key} (всего {len(self.partitions)})")
+            # пока ждали пост-матч, начался новый матч — перезапуск лобби его бы сорвал
+            if self._post_game_token is not None and payload.map_phase != "gameover":
+                self._post_game_token.cancel("новый матч")
+
+        partition.last_seen = time.time()
+        if owner:
+            partition.clients.add(owner)
+        if login:
+            partition.logins.add(login)
+        return partition
+
+    def _evict_partitions(self, now=None, force=False):
+        now = time.time() if now is None else now
+        if not force and now - self._last_eviction_check < 10:
+            return
+        self._last_eviction_check = now
 
-            # ===== MATCH FSM =====
-            if map_phase == "gameover" and self.match_state != MatchState.GAMEOVER:
-                self._freeze_ctrl_event.set()
-                self.match_state = MatchState.GAMEOVER
+        for key, partition in list(self.partitions.items()):
+            finished = partition.finished_at is not None and now - partition.finished_at > self.PARTITION_GAMEOVER_TTL
+            idle = now - partition.last_seen > self.PARTITION_IDLE_TTL
+            if not (finished or idle):
+                continue
+            partition.release()
+            del self.partitions[key]
+            self._forget_match_ids(partition)
+            self._finished_keys[key] = now
+            while len(self._finished_keys) > self.FINISHED_KEYS_LIMIT:
+                self._finished_keys.popitem(last=False)
+            print(f"🧹 GSI: матч {key} удалён ({'gameover' if finished else 'нет данных'})")
+
+    def _forget_match_ids(self, partition):
+        """
+        Убрать match_id удалённого матча у его логинов: если строку match_id следующего матча лог пропустит,
+        клиент уйдёт в lobby/default вместе с четвёркой, а не в новую партицию со старым ключом.
+        Новый match_id (следующий матч уже найден) не трогаем.
+        """
+        for login in partition.logins:
+            match_id = self._match_id_by_login.get(login.lower())
+            if match_id and partition.key.endswith(f"|match:{match_id}"):
+                del self._match_id_by_login[login.lower()]
+
+    def _has_other_live_partitions(self, partition):
+        now = time.time()
+        return any(
+            other is not partition
+            and other.match_state != MatchState.GAMEOVER
+            and other.current_round is not None
+            and now - other.last_seen < self.PARTITION_GAMEOVER_TTL
+            for other in self.partitions.values()
+        )
 
-                msg = f"🏆 КОНЕЦ МАТЧА | CT:{ct} T:{t}"
-                print(f"\n{msg}")
-                self.logManager.add_log(msg)
+    # =========================
+    # GSI PAYLOAD
+    # =========================
+
+    def handle_payload(self, payload):
+        """Один POST от клиента CS2 (GSIPayload из GSIServer) → FSM его матча. Только из потока очереди."""
+        self._evict_partitions()
+        partition = self._get_partition(payload)
+        if partition is None:
+            return
 
-                threading.Thread(target=self._parse_levels_after_match, daemon=True).start()
-                self._start_post_game_flow_once()
+        round_phase = payload.round_phase
+        map_phase = payload.map_phase
 
-            elif map_phase in ["warmup", "waiting", "live"] and self.match_state == MatchState.GAMEOVER:
-                # матч снова пошёл -> сброс
-                self.match_state = MatchState.LIVE
-                self.round_players.clear()
-                self.printed_rounds.clear()
-                self.current_round = None
-                self.t_actions_done_rounds.clear()
-                for ev in self.round_over_events.values():
-                    ev.clear()
-                self._freeze_ctrl_event.clear()
+        ct = payload.ct_score
+        t = payload.t_score
 
-            return "ok"
+        round_start_num = ct + t + 1
+        round_end_num = ct + t
 
+        # сбор игроков
+        if payload.steamid:
+            login = self._login_from_mafile(payload.steamid)
+            if login:
+                partition.round_players.setdefault(round_start_num, {})[login] = payload.team
+                partition.logins.add(login)
+
+        # ===== ROUND FSM =====
+        if round_phase == "live":
+            self._freeze_ctrl_event.set()   # 🛑 стоп Ctrl-логик (если есть)
+            self._freeze_ctrl_active = False
+            partition.round_state = RoundState.LIVE
+
+            partition.current_round = round_start_num
+            if partition.current_round not in partition.printed_rounds:
+                partition.printed_rounds.add(partition.current_round)
+                self._round_start(partition, partition.current_round, ct, t)
+                # задачи пропущенных (без over) раундов больше не нужны
+                partition.end_round(partition.current_round - 1, reason="начался следующий раунд")
+                self.scheduler.submit("t_actions", self._perform_t_actions_for_round,
+                                      partition, partition.current_round,
+                                      token=partition.round_token(partition.current_round))
+
+        elif round_phase == "over" and partition.round_state == RoundState.LIVE:
+            self._round_end(partition, round_end_num, ct, t, payload.win_team or "?")
+            partition.end_round(round_end_num)
+            partition.round_state = RoundState.OVER
+        else:
+            partition.round_state = RoundState.IDLE
+
+        # ===== MATCH FSM =====
+        if map_phase == "gameover" and partition.match_state != MatchState.GAMEOVER:
+            self._freeze_ctrl_event.set()
+            partition.match_state = MatchState.GAMEOVER
+            partition.finished_at = time.time()
+            partition.release("gameover")
+            self._match_over(partition, ct, t)
+
+        elif map_phase in ["warmup", "waiting", "live"] and partition.match_state == MatchState.GAMEOVER:
+            # матч снова пошёл -> сброс
+            partition.reset()
+            partition.match_state = MatchState.LIVE
+            self._freeze_ctrl_event.clear()
+
+    def _match_over(self, partition, ct, t):
+        msg = f"🏆 КОНЕЦ МАТЧА{self._partition_label(partition)} | CT:{ct} T:{t}"
+        print(f"\n{msg}")
+        self.logManager.add_log(msg)
+
+        self.scheduler.submit("parse_levels", self._parse_levels_after_match, set(partition.logins) or None)
+
+        # Пост-матч перезапускает лобби всех окон — только когда доиграны все параллельные матчи
+        if self._has_other_live_partitions(partition):
+            self._ui_log("⏳ Пост-матч отложен: другие матчи ещё идут")
+            return
+        self._start_post_game_flow_once()
 
     # =========================
     # POST-GAME FLOW (по ТЗ)
@@ -757,6 +893,9 @@ class GSIManager:
     @staticmethod
     def _is_cancelled_ctrl_q():
         try:
+            # keyboard ставит глобальный хук — грузим при первом пост-матче, а не при старте панели
+            import keyboard
+
             return keyboard.is_pressed("ctrl+q")
         except Exception:
             return False
@@ -781,16 +920,20 @@ class GSIManager:
             except Exception:
                 pass
 
-    def _sleep_with_cancel_ctrl_q(self, seconds: float, step: float = 0.1) -> bool:
-        """True если отменили Ctrl+Q, False если досидели."""
+    def _sleep_with_cancel_ctrl_q(self, seconds: float, step: float = 0.1, token=None) -> bool:
+        """True если отменили Ctrl+Q (или токеном), False если досидели."""
         end_t = time.time() + seconds
         while time.time() < end_t:
-            if self._is_cancelled_ctrl_q():
+            if self._is_cancelled_ctrl_q() or (token is not None and token.is_set()):
                 return True
             time.sleep(max(0.0, min(step, end_t - time.time())))
         return False
     def _safe_activate_hwnd(self, hwnd) -> bool:
         """Стабильнее активирует окно (ShowWindow + AttachThreadInput)."""
+        import win32con
+        import win32gui
+        import win32process
+
         if not hwnd:
             return False
 
@@ -859,6 +1002,9 @@ class GSIManager:
                     pass
 
     def _send_esc(self, hwnd):
+        import win32api
+        import win32con
+
         try:
             win32api.PostMessage(hwnd, win32con.WM_KEYDOWN, win32con.VK_ESCAPE, 0)
             win32api.PostMessage(hwnd, win32con.WM_KEYUP, win32con.VK_ESCAPE, 0)
@@ -866,7 +1012,10 @@ class GSIManager:
             pass
 
     def _click_in_window(self, hwnd, x, y, hover_delay=0.3):
- 
+        import win32api
+        import win32con
+        import win32gui
+
         try:
             rect = win32gui.GetWindowRect(hwnd)  # (left, top, right, bottom)
             abs_x = rect[0] + x
@@ -883,13 +1032,16 @@ class GSIManager:
             pass
 
 
-    def post_game_restart_flow(self):
+    def post_game_restart_flow(self, token=None):
+        import win32gui
+
         try:
             self._ui_log("⏳ Ожидание 90 секунд перед стартом")
 
-            cancelled = self._sleep_with_cancel_ctrl_q(90.0, step=0.2)
+            cancelled = self._sleep_with_cancel_ctrl_q(90.0, step=0.2, token=token)
             if cancelled:
-                self._ui_log("🛑 Отменено Ctrl+Q")
+                reason = token.reason if token is not None and token.is_set() else "Ctrl+Q"
+                self._ui_log(f"🛑 Отменено: {reason}")
                 return
 
             hwnds = self._get_all_cs2_hwnds()  # список (hwnd, pid)
@@ -907,24 +1059,27 @@ class GSIManager:
                 if not win32gui.IsWindow(hwnd):
                     continue
 
-                # активируем окно
-                self._safe_activate_hwnd(hwnd)
+                with self._input_lock:
+                    # активируем окно
+                    self._safe_activate_hwnd(hwnd)
 
-                # ESC
-                self._send_esc(hwnd)
-                time.sleep(0.4)
+                    # ESC
+                    self._send_esc(hwnd)
+                    time.sleep(0.4)
 
-                # hover -> 0.3s -> click
-                self._click_in_window(hwnd, 374, 8, hover_delay=0.4)
-                time.sleep(0.4)
-                self._click_in_window(hwnd, 374, 8, hover_delay=0.4)
-                time.sleep(0.4)
+                    # hover -> 0.3s -> click
+                    self._click_in_window(hwnd, 374, 8, hover_delay=0.4)
+                    time.sleep(0.4)
+                    self._click_in_window(hwnd, 374, 8, hover_delay=0.4)
+                    time.sleep(0.4)
 
-                # ESC again
-                self._send_esc(hwnd)
+                    # ESC again
+                    self._send_esc(hwnd)
 
             self._ui_log("✅ Пост-матч: окна обработаны. Запуск MakeLobbiesAndSearchGame()")
             try:
+                from Managers.LobbyManager import LobbyManager
+
                 LobbyManager().MakeLobbiesAndSearchGame()
             except Exception as e:
                 self._ui_log(f"❌ Ошибка запуска MakeLobbiesAndSearchGame: {e}")
@@ -946,8 +1101,10 @@ class GSIManager:
 
             self._last_gameover_trigger_ts = now
             self._post_game_flow_running = True
+            self._post_game_token = CancelToken(name="post_game")
 
-        threading.Thread(target=self.post_game_restart_flow, daemon=True).start()
+        # токен передаётся самому потоку: отменённый пост-матч должен дойти до finally и снять флаг
+        self.scheduler.submit("post_game", self.post_game_restart_flow, self._post_game_token)
 
 
 
@@ -962,26 +1119,17 @@ class GSIManager:
 
         # 1️⃣ PID из реально запущенных процессов.
         cs2_pids = set()
-        for proc in psutil.process_iter(['pid', 'name']):
-            try:
-                name = (proc.info.get('name') or '').lower()
-                if 'cs2' in name:
-                    pid = int(proc.info['pid'])
-                    cs2_pids.add(pid)
-                    print(f"🎮 CS2.exe PID: {pid}")
-            except Exception:
-                continue
+        for info in self.processManager.get_processes():
+            if 'cs2' in info.name:
+                cs2_pids.add(info.pid)
+                print(f"🎮 CS2.exe PID: {info.pid}")
 
-        # 2️⃣ PID из runtime.json (только если процесс реально жив).
+        # 2️⃣ PID из RuntimeRegistry (только если процесс реально жив).
         runtime_pids = set()
         for _, (_, pid) in self.login_to_pid.items():
-            try:
-                pid = int(pid)
-                proc = psutil.Process(pid)
-                if proc.is_running() and 'cs2' in proc.name().lower():
-                    runtime_pids.add(pid)
-            except Exception:
-                continue
+            info = self.processManager.get(pid)
+            if info and 'cs2' in info.name:
+                runtime_pids.add(info.pid)
 
         if runtime_pids:
             print(f"⚙️ Runtime активные CS2 PID: {sorted(runtime_pids)}")
@@ -1026,33 +1174,64 @@ class GSIManager:
 
     def _single_window_ctrl_spam(self, hwnd, pid):
         """Удерживает Ctrl 1 сек, потом следующее окно"""
+        import pydirectinput
+
         print(f"🎮 Ctrl 1сек → HWND:{hwnd}")
         
-        if self._activate_window(hwnd):
+        with self._input_lock:
+            if not self._activate_window(hwnd):
+                print(f"❌ Не удалось активировать HWND:{hwnd}")
+                return
             # УДЕРЖИВАЕМ Ctrl ровно 1 секунду
             pydirectinput.keyDown("ctrl")
-            time.sleep(1.0)  # 👈 1 СЕКУНДА
-            pydirectinput.keyUp("ctrl")
-            print(f"✅ Ctrl 1сек выполнен HWND:{hwnd}")
-        else:
-            print(f"❌ Не удалось активировать HWND:{hwnd}")
+            try:
+                time.sleep(1.0)  # 👈 1 СЕКУНДА
+            finally:
+                pydirectinput.keyUp("ctrl")
+        print(f"✅ Ctrl 1сек выполнен HWND:{hwnd}")
 
 
     # =========================
     # SERVER
     # =========================
     def start(self):
-        if self._thread:
-            return
-
-        def run():
-            print("🟢 GSI сервер запущен: http://127.0.0.1:6969")
-            self.app.run(
-                host="127.0.0.1",
-                port=6969,
-                debug=False,
-                use_reloader=False,
-            )
-
-        self._thread = threading.Thread(target=run, daemon=True)
-        self._thread.start()
\ No newline at end of file
+        LogEventManager().subscribe("match_id", self._on_match_id_event)
+        self.queue.start()
+        if SettingsManager().get("GSIRecordEnabled", False):
+            self.start_recording()
+        self.server.start()
+
+    def stop(self):
+        LogEventManager().unsubscribe("match_id", self._on_match_id_event)
+        self.server.stop()
+        self.queue.stop()
+        self.stop_recording()
+        for partition in list(self.partitions.values()):
+            partition.release("GSI остановлен")
+        if self._post_game_token is not None:
+            self._post_game_token.cancel("GSI остановлен")
+
+    def start_recording(self, path=None):
+        """Писать все входящие POST в файл (реплей: python -m Managers.GSIReplayer <файл>)."""
+        if self.server.recorder is not None:
+            return self.server.recorder.path
+        recorder = GSIRecorder(path or GSIRecorder.default_path())
+        self.server.recorder = recorder
+        print(f"⏺️ Запись GSI: {recorder.path}")
+        return recorder.path
+
+    def stop_recording(self):
+        recorder = self.server.recorder
+        self.server.recorder = None
+        if recorder is not None:
+            recorder.close()
+            print(f"⏹️ Запись GSI остановлена: {recorder.stats()}")
+
+    def stats(self):
+        return {
+            "server": self.server.stats(),
+            "queue": self.queue.stats(),
+            "partitions": {key: repr(partition) for key, partition in list(self.partitions.items())},
+            "finished": len(self._finished_keys),
+            "jobs": self.scheduler.stats(),
+        }
\ No newline at end of file
@@ -0,0 +1,184 @@
+import threading
+import time
+from collections import deque
+
+from Managers.GSIServer import percentile
+
+
+class _QueueEntry:
+    __slots__ = ("key", "payload", "signature", "enqueued_at", "merged", "transition")
+
+    def __init__(self, key, payload, signature, enqueued_at, transition=False):
+        self.key = key
+        self.payload = payload
+        self.signature = signature
+        self.enqueued_at = enqueued_at
+        self.merged = 0
+        # фаза/счёт клиента отличаются от предыдущего payload: такую запись нельзя выбрасывать
+        self.transition = transition
+
+
+class GSIEventQueue:
+    """
+    Ограниченная очередь GSIPayload с одним потребителем (FSM).
+    Сервер только кладёт payload и сразу отвечает; FSM меняется из одного потока, без гонок.
+    Пока payload клиента ждёт в очереди, новый payload того же клиента (provider steamid) с той же фазой
+    (round/map phase + счёт) заменяет его — применяется только последнее состояние; свой payload клиента
+    (player — он сам) не заменяется payload'ом игрока, за которым он наблюдает.
+    Смена фазы никогда не склеивается и не вытесняется: при переполнении выбрасывается самая старая
+    запись без смены фазы, поэтому переходы FSM (live → over → gameover) не теряются.
+    """
+
+    def __init__(self, handler, maxsize=512, name="GSI-FSM"):
+        self.handler = handler
+        self.maxsize = maxsize
+        self.name = name
+
+        self._cond = threading.Condition()
+        self._pending = deque()
+        # key -> последняя ещё не обработанная запись этого клиента
+        self._latest = {}
+        # key -> фаза последнего принятого payload клиента
+        self._last_signature = {}
+        self._running = False
+        self._thread = None
+
+        self.enqueued = 0
+        self.processed = 0
+        self.coalesced = 0
+        self.dropped = 0
+        self.errors = 0
+        self.max_depth = 0
+        # от приёма сервером (received_at) до конца обработки в FSM, мс
+        self.lags = deque(maxlen=5000)
+
+    @staticmethod
+    def _signature(payload):
+        return payload.round_phase, payload.map_phase, payload.ct_score, payload.t_score
+
+    @staticmethod
+    def _is_own(payload):
+        """player в payload — сам владелец клиента (а не тот, за кем он смотрит после смерти)."""
+        return payload.provider_steamid is None or payload.steamid == payload.provider_steamid
+
+    def _evict_same_phase(self):
+        """Выбросить самую старую запись без смены фазы. False — в очереди только смены фаз."""
+        for index, entry in enumerate(self._pending):
+            if not entry.transition:
+                del self._pending[index]
+                if self._latest.get(entry.key) is entry:
+                    del self._latest[entry.key]
+                self.dropped += 1
+                return True
+        return False
+
+    # -----------------------------
+    # Producer
+    # -----------------------------
+    def put(self, payload):
+        now = time.perf_counter()
+        key = payload.provider_steamid or payload.steamid
+        signature = self._signature(payload)
+        with self._cond:
+            self.enqueued += 1
+            entry = self._latest.get(key)
+            if entry is not None and entry.signature == signature:
+                if self._is_own(payload) or not self._is_own(entry.payload):
+                    entry.payload = payload
+                entry.merged += 1
+                self.coalesced += 1
+                return
+
+            transition = self._last_signature.get(key) != signature
+            self._last_signature[key] = signature
+            if len(self._pending) >= self.maxsize and not self._evict_same_phase() and not transition:
+                # очередь забита сменами фаз — теряем это обновление, а не переход
+                self.dropped += 1
+                return
+
+            entry = _QueueEntry(key, payload, signature, now, transition)
+            self._pending.append(entry)
+            self._latest[key] = entry
+            self.max_depth = max(self.max_depth, len(self._pending))
+            self._cond.notify()
+
+    # -----------------------------
+    # Consumer
+    # -----------------------------
+    def start(self):
+        if self._running:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._consume, name=self.name, daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=2.0):
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+        self._thread = None
+
+    def _take(self):
+        with self._cond:
+            while self._running and not self._pending:
+                self._cond.wait()
+            if not self._pending:
+                return None
+            entry = self._pending.popleft()
+            if self._latest.get(entry.key) is entry:
+                del self._latest[entry.key]
+            return entry
+
+    def _consume(self):
+        while True:
+            entry = self._take()
+            if entry is None:
+                break
+            self._apply(entry)
+
+    def _apply(self, entry):
+        try:
+            self.handler(entry.payload)
+        except Exception as e:
+            self.errors += 1
+            print(f"⚠️ GSI FSM: ошибка обработки {entry.payload}: {e}")
+        self.processed += 1
+        received_at = entry.payload.received_at or entry.enqueued_at
+        self.lags.append((time.perf_counter() - received_at) * 1000)
+
+    def drain(self):
+        """Обработать всё накопленное в текущем потоке (без запущенного потребителя — бенчмарк/реплей)."""
+        count = 0
+        while True:
+            with self._cond:
+                if not self._pending:
+                    return count
+                entry = self._pending.popleft()
+                if self._latest.get(entry.key) is entry:
+                    del self._latest[entry.key]
+            self._apply(entry)
+            count += 1
+
+    # -----------------------------
+    # Metrics
+    # -----------------------------
+    @property
+    def depth(self):
+        return len(self._pending)
+
+    def stats(self):
+        lags = list(self.lags)
+        return {
+            "depth": self.depth,
+            "max_depth": self.max_depth,
+            "enqueued": self.enqueued,
+            "processed": self.processed,
+            "coalesced": self.coalesced,
+            "dropped": self.dropped,
+            "errors": self.errors,
+            "lag_p50_ms": round(percentile(lags, 50), 3),
+            "lag_p99_ms": round(percentile(lags, 99), 3),
+            "lag_last_ms": round(lags[-1], 3) if lags else 0.0,
+        }
@@ -0,0 +1,152 @@
+import os
+import random
+import struct
+import threading
+import time
+import zlib
+
+# Файл: MAGIC, затем записи подряд: заголовок (<dHI: время прихода, длина source, длина тела) + source + zlib(тело)
+MAGIC = b"GSIREC1\n"
+_HEADER = struct.Struct("<dHI")
+
+
+class GSIRecord:
+    __slots__ = ("ts", "source", "body")
+
+    def __init__(self, ts, source, body):
+        self.ts = ts
+        self.source = source
+        self.body = body
+
+    def __repr__(self):
+        return f"GSIRecord({self.ts:.3f}, {self.source!r}, {len(self.body)}b)"
+
+
+class GSIRecorder:
+    """
+    Пишет каждый входящий POST (сырое тело, время прихода, источник) в append-only файл.
+    Тело сжимается по отдельности, поэтому оборванная последняя запись не портит остальные.
+    """
+
+    def __init__(self, path, flush_every=1.0):
+        self.path = path
+        self.flush_every = flush_every
+        self._lock = threading.Lock()
+        self._last_flush = 0.0
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._file = open(path, "ab")
+        if self._file.tell() == 0:
+            self._file.write(MAGIC)
+
+        self.records = 0
+        self.raw_bytes = 0
+        self.stored_bytes = 0
+
+    @classmethod
+    def default_path(cls, folder="gsi_records"):
+        return os.path.join(folder, time.strftime("%Y-%m-%d_%H-%M-%S") + ".gsirec")
+
+    def record(self, body, source="?", ts=None):
+        try:
+            packed = zlib.compress(bytes(body), 6)
+            source_bytes = str(source).encode("utf-8")[:0xFFFF]
+            with self._lock:
+                if self._file is None:
+                    return
+                self._file.write(_HEADER.pack(time.time() if ts is None else ts, len(source_bytes), len(packed)))
+                self._file.write(source_bytes)
+                self._file.write(packed)
+                self.records += 1
+                self.raw_bytes += len(body)
+                self.stored_bytes += _HEADER.size + len(source_bytes) + len(packed)
+
+                now = time.monotonic()
+                if now - self._last_flush >= self.flush_every:
+                    self._file.flush()
+                    self._last_flush = now
+        except Exception as e:
+            print(f"⚠️ GSI запись: {e}")
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def stats(self):
+        return {
+            "path": self.path,
+            "records": self.records,
+            "raw_kb": round(self.raw_bytes / 1024, 1),
+            "stored_kb": round(self.stored_bytes / 1024, 1),
+        }
+
+
+def read_records(path):
+    """Генератор GSIRecord; оборванный хвост (запись не дописана) молча пропускается."""
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path}: не файл записи GSI")
+        while True:
+            header = f.read(_HEADER.size)
+            if len(header) < _HEADER.size:
+                return
+            ts, source_length, body_length = _HEADER.unpack(header)
+            source = f.read(source_length)
+            packed = f.read(body_length)
+            if len(source) < source_length or len(packed) < body_length:
+                return
+            try:
+                body = zlib.decompress(packed)
+            except zlib.error:
+                return
+            yield GSIRecord(ts, source.decode("utf-8", errors="replace"), body)
+
+
+def write_synthetic_match(path, clients=4, rounds=16, live_events=20, seed=0, matches=1):
+    """
+    Синтетический матч: warmup → (freezetime, live × live_events, over) × rounds → gameover.
+    У каждого клиента свой steamid; темп ~10 POST/с на клиента во время раунда.
+    matches > 1 — столько матчей одновременно (на разных картах, со сдвигом по времени), записи перемешаны.
+    """
+    from Managers.GSIServer import _synthetic_payload
+
+    rnd = random.Random(seed)
+    maps = ["de_mirage", "de_inferno", "de_nuke", "de_ancient", "de_anubis", "de_dust2", "de_overpass"]
+    entries = []
+
+    for match in range(matches):
+        steamids = [str(76561190000000000 + match * 1000 + i) for i in range(clients)]
+        teams = {steamid: ("CT" if i % 2 == 0 else "T") for i, steamid in enumerate(steamids)}
+        map_name = maps[match % len(maps)]
+        state = {"ts": 1_700_000_000.0 + match * 7.3, "ct": 0, "t": 0}
+
+        def emit(phase, map_phase="live", win_team=None, step=0.1):
+            for i, steamid in enumerate(steamids):
+                body = _synthetic_payload(steamid, rnd, phase=phase, ct=state["ct"], t=state["t"],
+                                          map_phase=map_phase, win_team=win_team, team=teams[steamid],
+                                          map_name=map_name)
+                entries.append((state["ts"] + i * 0.003, f"127.0.0.1:{50000 + match * 100 + i}", body))
+            state["ts"] += step
+
+        emit("warmup", map_phase="warmup", step=1.0)
+        for round_number in range(1, rounds + 1):
+            for _ in range(3):
+                emit("freezetime", step=5.0)
+            for _ in range(live_events):
+                emit("live")
+            # В CS2 счёт на карте обновляется вместе с round.phase = over
+            winner = rnd.choice(["CT", "T"])
+            state["ct" if winner == "CT" else "t"] += 1
+            if round_number == rounds:
+                emit("over", map_phase="gameover", win_team=winner, step=1.0)
+                break
+            emit("over", win_team=winner, step=2.5)
+            emit("over", win_team=winner, step=2.5)
+
+    recorder = GSIRecorder(path)
+    for ts, source, body in sorted(entries, key=lambda entry: entry[0]):
+        recorder.record(body, source, ts=ts)
+    recorder.close()
+    return recorder.stats()
@@ -0,0 +1,236 @@
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+from Managers.GSIRecorder import read_records, write_synthetic_match
+from Managers.GSIServer import decode_payload
+
+_replay_manager_class = None
+
+
+class _ReplayLog:
+    """Вместо LogManager (у него нет textbox без UI): сообщения копятся в списке."""
+
+    def __init__(self):
+        self.messages = []
+
+    def add_log(self, message):
+        self.messages.append(message)
+
+
+class _ReplayAccounts:
+    """Вместо AccountManager: без maFiles, logpass.txt и потока очереди запуска."""
+    accounts = []
+
+
+class _ReplayWindows:
+    """Вместо WindowManager: окон CS2 в реплее нет."""
+
+    def get_fsn_windows(self):
+        return []
+
+    def get_windows_by_pid(self, pid, enabled_only=False):
+        return []
+
+    def find_by_login(self, login):
+        return None
+
+    def invalidate(self):
+        pass
+
+
+class _ReplayProcesses:
+    """Вместо ProcessManager: процессов CS2 в реплее нет."""
+
+    def get(self, pid):
+        return None
+
+    def get_processes(self):
+        return []
+
+
+class _ReplayMafiles:
+    """Вместо MafileIndex: логином служит steamid, результат не зависит от maFiles на машине."""
+
+    def login_for_steamid(self, steamid):
+        return None
+
+
+def _get_replay_manager_class():
+    """
+    GSIManager с заглушками вместо Win32: переходы FSM записываются в transitions,
+    действия (T-маршруты, парсинг уровней, пост-матч) — только отмечаются.
+    Менеджеры аккаунтов, окон, процессов и maFiles подменены, settings/ и runtime.json не читаются:
+    реплей идёт на любой машине, не только на ферме.
+    """
+    global _replay_manager_class
+    if _replay_manager_class is not None:
+        return _replay_manager_class
+
+    from Managers.GSIManager import GSIManager
+
+    class ReplayGSIManager(GSIManager):
+        def _init_state(self):
+            super()._init_state(account_manager=_ReplayAccounts(), window_manager=_ReplayWindows(),
+                                process_manager=_ReplayProcesses(), mafiles=_ReplayMafiles(), workers=8)
+            self.logManager = _ReplayLog()
+            self.transitions = []
+            self.t_action_rounds = []
+            self.level_parses = 0
+
+        def _login_from_mafile(self, steamid):
+            # без .mafile в реплее логином служит steamid
+            return super()._login_from_mafile(steamid) or steamid
+
+        def _load_runtime_data(self):
+            return {}
+
+        def _round_start(self, partition, rnd, ct, t):
+            players = partition.round_players.get(rnd, {})
+            self.transitions.append(["round_start", partition.key, rnd, ct, t, sorted(players.items())])
+
+        def _round_end(self, partition, rnd, ct, t, winner):
+            self.transitions.append(["round_end", partition.key, rnd, ct, t, winner])
+
+        def _perform_t_actions_for_round(self, partition, round_number):
+            self.t_action_rounds.append((partition.key, round_number))
+            partition.t_actions_done_rounds.add(round_number)
+
+        def _match_over(self, partition, ct, t):
+            self.transitions.append(["gameover", partition.key, ct, t])
+            super()._match_over(partition, ct, t)
+
+        def _parse_levels_after_match(self, logins=None):
+            self.level_parses += 1
+
+        def _start_post_game_flow_once(self):
+            self.transitions.append(["post_game"])
+
+        def _ui_log(self, text):
+            self.logManager.add_log(text)
+
+    _replay_manager_class = ReplayGSIManager
+    return ReplayGSIManager
+
+
+class GSIReplayer:
+    """
+    Проигрывает запись GSI в изолированный GSIManager (без Win32): 1x, 10x или максимально быстро.
+    Результат — переходы FSM (для регрессий) и пропускная способность (для бенчмарка).
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._records = None
+
+    @property
+    def records(self):
+        if self._records is None:
+            self._records = list(read_records(self.path))
+        return self._records
+
+    def replay(self, speed=None, through_queue=True):
+        """speed: 1.0, 10.0... или None — без пауз. through_queue=False — сразу в handle_payload."""
+        records = self.records
+        manager = _get_replay_manager_class().create_isolated()
+        if through_queue:
+            manager.queue.start()
+        sink = manager.queue.put if through_queue else manager.handle_payload
+
+        first_ts = records[0].ts if records else 0.0
+        started = time.perf_counter()
+        decode_seconds = 0.0
+        for record in records:
+            if speed:
+                delay = (record.ts - first_ts) / speed - (time.perf_counter() - started)
+                if delay > 0:
+                    time.sleep(delay)
+            decode_started = time.perf_counter()
+            payload = decode_payload(record.body, received_at=decode_started)
+            decode_seconds += time.perf_counter() - decode_started
+            if payload is not None:
+                sink(payload)
+
+        if through_queue:
+            while manager.queue.depth:
+                time.sleep(0.001)
+            manager.queue.stop()
+        # T-действия и парсинг уровней идут в пуле задач — дождаться их
+        while manager.scheduler.running() or manager.scheduler.stats()["queued"]:
+            time.sleep(0.001)
+        elapsed = time.perf_counter() - started
+        # матчи, которые закончились, партиции не держат
+        manager._evict_partitions(now=time.time() + manager.PARTITION_GAMEOVER_TTL + 1, force=True)
+
+        return {
+            "records": len(records),
+            "speed": speed or "max",
+            "through_queue": through_queue,
+            "seconds": round(elapsed, 3),
+            "records_per_s": round(len(records) / elapsed) if elapsed else 0,
+            "decode_us": round(decode_seconds / max(1, len(records)) * 1e6, 1),
+            "matches": sum(1 for item in manager.transitions if item[0] == "gameover"),
+            "rounds": sum(1 for item in manager.transitions if item[0] == "round_start"),
+            "t_action_rounds": len(set(manager.t_action_rounds)),
+            "partitions_left": len(manager.partitions),
+            "level_parses": manager.level_parses,
+            "queue": manager.queue.stats() if through_queue else None,
+            "jobs": manager.scheduler.stats(),
+            "transitions": manager.transitions,
+        }
+
+
+def _compare(expected, actual):
+    if expected == actual:
+        return None
+    for index, (want, got) in enumerate(zip(expected, actual)):
+        if want != got:
+            return f"переход #{index}: ожидалось {want}, получено {got}"
+    return f"число переходов: ожидалось {len(expected)}, получено {len(actual)}"
+
+
+def main(argv=None):
+    """
+    python -m Managers.GSIReplayer [запись.gsirec] [--speed 10] [--direct] [--save out.json | --expect out.json]
+    Без файла — синтетический матч (бенчмарк FSM).
+    """
+    parser = argparse.ArgumentParser(description="Реплей записи GSI в GSIManager без Win32")
+    parser.add_argument("path", nargs="?")
+    parser.add_argument("--speed", type=float, default=None, help="1, 10... (по умолчанию — без пауз)")
+    parser.add_argument("--direct", action="store_true", help="мимо очереди, сразу в handle_payload")
+    parser.add_argument("--matches", type=int, default=1, help="синтетика: параллельных матчей")
+    parser.add_argument("--save", help="сохранить переходы FSM в json")
+    parser.add_argument("--expect", help="сравнить переходы FSM с сохранёнными")
+    args = parser.parse_args(argv)
+
+    path = args.path
+    if not path:
+        path = os.path.join(tempfile.gettempdir(), "gsi_synthetic_match.gsirec")
+        if os.path.exists(path):
+            os.remove(path)
+        print({"synthetic": write_synthetic_match(path, clients=10, matches=args.matches)})
+
+    result = GSIReplayer(path).replay(speed=args.speed, through_queue=not args.direct)
+    transitions = result.pop("transitions")
+    print(result)
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(transitions, f, ensure_ascii=False, indent=1)
+        print(f"💾 Переходы сохранены: {args.save} ({len(transitions)})")
+    if args.expect:
+        with open(args.expect, "r", encoding="utf-8") as f:
+            expected = json.load(f)
+        problem = _compare(expected, json.loads(json.dumps(transitions)))
+        if problem:
+            print(f"❌ Регрессия: {problem}")
+            return 1
+        print(f"✅ Переходы совпадают ({len(transitions)})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,458 @@
+import asyncio
+import json
+import random
+import sys
+import threading
+import time
+from collections import deque
+
+
+class GSIPayload:
+    """Только те поля GSI, которые использует FSM GSIManager."""
+
+    __slots__ = ("provider_steamid", "steamid", "team", "round_phase", "win_team", "map_name", "map_phase",
+                 "ct_score", "t_score", "received_at")
+
+    def __init__(self, steamid=None, team=None, round_phase=None, win_team=None, map_phase=None,
+                 ct_score=0, t_score=0, received_at=0.0, provider_steamid=None, map_name=None):
+        # provider — владелец клиента CS2; player — тот, за кем он сейчас смотрит (после смерти — другой игрок)
+        self.provider_steamid = provider_steamid
+        self.steamid = steamid
+        self.team = team
+        self.round_phase = round_phase
+        self.win_team = win_team
+        self.map_name = map_name
+        self.map_phase = map_phase
+        self.ct_score = ct_score
+        self.t_score = t_score
+        self.received_at = received_at
+
+    @classmethod
+    def from_sections(cls, player, round_info, map_info, received_at=0.0, provider=None):
+        provider = provider if isinstance(provider, dict) else {}
+        player = player if isinstance(player, dict) else None
+        round_info = round_info if isinstance(round_info, dict) else {}
+        map_info = map_info if isinstance(map_info, dict) else {}
+        return cls(
+            provider_steamid=str(provider["steamid"]) if provider.get("steamid") is not None else None,
+            steamid=str(player.get("steamid")) if player and player.get("steamid") is not None else None,
+            team=player.get("team") if player else None,
+            round_phase=round_info.get("phase"),
+            win_team=round_info.get("win_team"),
+            map_name=map_info.get("name"),
+            map_phase=map_info.get("phase"),
+            ct_score=(map_info.get("team_ct") or {}).get("score", 0),
+            t_score=(map_info.get("team_t") or {}).get("score", 0),
+            received_at=received_at,
+        )
+
+    def __repr__(self):
+        return (f"GSIPayload({self.provider_steamid}/{self.steamid}, {self.team}, round={self.round_phase}, "
+                f"map={self.map_name}:{self.map_phase}, CT:{self.ct_score} T:{self.t_score})")
+
+
+_decoder = json.JSONDecoder()
+
+# CS2 пишет JSON с отступом табами: ключ верхнего уровня — "\n\t\"key\": ", его поля — "\n\t\t\"key\": "
+_PROVIDER_MARKER = '\n\t"provider": '
+# секция -> поля, которые нужны FSM (остальное в секции не декодируется)
+_WANTED_FIELDS = {
+    "provider": ("steamid",),
+    "player": ("steamid", "team"),
+    "round": ("phase", "win_team"),
+    "map": ("name", "phase", "team_ct", "team_t"),
+}
+
+
+def _decode_sections(text):
+    """{секция: {поле: значение}} по маркерам отступа; ValueError — формат не тот."""
+    sections = {}
+    for section, fields in _WANTED_FIELDS.items():
+        marker = f'\n\t"{section}": '
+        start = text.find(marker)
+        if start < 0:
+            continue
+        start += len(marker)
+        if text[start] != "{":
+            raise ValueError(section)
+        # Секция заканчивается там, где начинается следующий ключ верхнего уровня (или "\n}")
+        end = text.find('\n\t"', start)
+        if end < 0:
+            end = len(text)
+        values = {}
+        for field in fields:
+            field_marker = f'\n\t\t"{field}": '
+            index = text.find(field_marker, start, end)
+            if index >= 0:
+                values[field], _ = _decoder.raw_decode(text, index + len(field_marker))
+        sections[section] = values
+    return sections
+
+
+def decode_payload(body, received_at=0.0):
+    """
+    Разбирает тело POST в GSIPayload, декодируя только поля из _WANTED_FIELDS.
+    Остальное (state, weapons, round_wins, previously/added...) не превращается в объекты.
+    Если формат не похож на вывод CS2 — полный json.loads.
+    """
+    if not body:
+        return None
+    text = body.decode("utf-8", errors="replace") if isinstance(body, (bytes, bytearray)) else body
+
+    if _PROVIDER_MARKER in text:
+        try:
+            sections = _decode_sections(text)
+            return GSIPayload.from_sections(sections.get("player"), sections.get("round"), sections.get("map"),
+                                            received_at, sections.get("provider"))
+        except (ValueError, IndexError):
+            pass
+
+    try:
+        data = json.loads(text)
+    except ValueError:
+        return None
+    if not isinstance(data, dict) or not data:
+        return None
+    return GSIPayload.from_sections(data.get("player"), data.get("round"), data.get("map"), received_at,
+                                    data.get("provider"))
+
+
+def percentile(values, q):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(q / 100 * (len(ordered) - 1)))))
+    return ordered[index]
+
+
+class GSIServer:
+    """
+    Приёмник GSI на asyncio: HTTP/1.1 keep-alive без фреймворка. Читает заголовки и тело,
+    декодирует только нужные поля и отдаёт GSIPayload в handler (в потоке сервера).
+    """
+
+    RESPONSE_KEEP_ALIVE = b"HTTP/1.1 200 OK\r\nContent-Type: text/plain\r\nContent-Length: 2\r\n\r\nok"
+    RESPONSE_CLOSE = (b"HTTP/1.1 200 OK\r\nContent-Type: text/plain\r\nContent-Length: 2\r\n"
+                      b"Connection: close\r\n\r\nok")
+    MAX_HEADER_BYTES = 16 * 1024
+    MAX_BODY_BYTES = 4 * 1024 * 1024
+
+    def __init__(self, handler, host="127.0.0.1", port=6969, decoder=decode_payload):
+        self.handler = handler
+        self.host = host
+        self.port = port
+        self.decoder = decoder
+        # GSIRecorder: пишет сырые тела до декодирования (None — запись выключена)
+        self.recorder = None
+
+        self._loop = None
+        self._server = None
+        self._thread = None
+        self._ready = threading.Event()
+
+        self.requests = 0
+        self.errors = 0
+        self.bytes_received = 0
+        self.connections = 0
+        # время от полного чтения тела до возврата из handler, мс
+        self.latencies = deque(maxlen=10000)
+
+    # -----------------------------
+    # Lifecycle
+    # -----------------------------
+    def start(self):
+        if self._thread:
+            return
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        self._ready.wait(timeout=5)
+
+    def _run(self):
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        self._loop = loop
+        try:
+            self._server = loop.run_until_complete(
+                asyncio.start_server(self._handle_client, self.host, self.port)
+            )
+            # port=0 — свободный порт (бенчмарк)
+            self.port = self._server.sockets[0].getsockname()[1]
+            print(f"🟢 GSI сервер запущен: http://{self.host}:{self.port}")
+        except Exception as e:
+            print(f"❌ GSI сервер не запустился: {e}")
+            self._ready.set()
+            return
+        self._ready.set()
+        try:
+            loop.run_forever()
+        finally:
+            self._server.close()
+            loop.run_until_complete(self._server.wait_closed())
+            loop.close()
+
+    def stop(self):
+        if self._loop is not None and self._loop.is_running():
+            self._loop.call_soon_threadsafe(self._loop.stop)
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+        self._thread = None
+        self._ready.clear()
+
+    # -----------------------------
+    # HTTP
+    # -----------------------------
+    async def _handle_client(self, reader, writer):
+        self.connections += 1
+        peer = writer.get_extra_info("peername")
+        source = f"{peer[0]}:{peer[1]}" if peer else "?"
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+                    break
+                if len(head) > self.MAX_HEADER_BYTES:
+                    break
+
+                lines = head.decode("latin-1").split("\r\n")
+                request_line = lines[0].split(" ")
+                version = request_line[2] if len(request_line) > 2 else "HTTP/1.0"
+                length = 0
+                connection = ""
+                for line in lines[1:]:
+                    name, _, value = line.partition(":")
+                    name = name.strip().lower()
+                    if name == "content-length":
+                        length = int(value.strip() or 0)
+                    elif name == "connection":
+                        connection = value.strip().lower()
+                if length > self.MAX_BODY_BYTES:
+                    break
+
+                try:
+                    body = await reader.readexactly(length) if length else b""
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    break
+
+                self._dispatch(body, source)
+
+                keep_alive = connection == "keep-alive" or (version == "HTTP/1.1" and connection != "close")
+                writer.write(self.RESPONSE_KEEP_ALIVE if keep_alive else self.RESPONSE_CLOSE)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except Exception as e:
+            self.errors += 1
+            print(f"⚠️ GSI: ошибка соединения: {e}")
+        finally:
+            try:
+                writer.close()
+            except Exception:
+                pass
+
+    def _dispatch(self, body, source="?"):
+        started = time.perf_counter()
+        self.requests += 1
+        self.bytes_received += len(body)
+        recorder = self.recorder
+        if recorder is not None:
+            recorder.record(body, source)
+        try:
+            payload = self.decoder(body, received_at=started)
+            if payload is not None:
+                self.handler(payload)
+        except Exception as e:
+            self.errors += 1
+            print(f"⚠️ GSI: ошибка обработки: {e}")
+        self.latencies.append((time.perf_counter() - started) * 1000)
+
+    def stats(self):
+        latencies = list(self.latencies)
+        return {
+            "port": self.port,
+            "requests": self.requests,
+            "errors": self.errors,
+            "connections": self.connections,
+            "kb": round(self.bytes_received / 1024, 1),
+            "handle_p50_ms": round(percentile(latencies, 50), 3),
+            "handle_p99_ms": round(percentile(latencies, 99), 3),
+        }
+
+
+# =========================
+# BENCHMARK
+# =========================
+def _synthetic_payload(steamid, rnd, phase="live", ct=3, t=4, map_phase="live", win_team=None, team=None,
+                       map_name="de_mirage"):
+    """Тело POST как у клиента-игрока CS2 с конфигом gamestate_integration_fsn.cfg."""
+    data = {
+        "provider": {"name": "Counter-Strike: Global Offensive", "appid": 730, "version": 14060,
+                     "steamid": steamid, "timestamp": int(time.time())},
+        "map": {"mode": "competitive", "name": map_name, "phase": map_phase, "round": ct + t,
+                "team_ct": {"score": ct, "consecutive_round_losses": 1, "timeouts_remaining": 1,
+                            "matches_won_this_series": 0},
+                "team_t": {"score": t, "consecutive_round_losses": 0, "timeouts_remaining": 1,
+                           "matches_won_this_series": 0},
+                "num_matches_to_win_series": 0,
+                "round_wins": {str(i): rnd.choice(["ct_win_elimination", "t_win_bomb"]) for i in range(1, ct + t + 1)}},
+        "round": {"phase": phase, **({"win_team": win_team} if win_team else {})},
+        "player": {"steamid": steamid, "name": f"bot{steamid[-3:]}", "observer_slot": 1,
+                   "team": team or rnd.choice(["CT", "T"]),
+                   "activity": "playing",
+                   "match_stats": {"kills": rnd.randint(0, 20), "assists": 2, "deaths": 5, "mvps": 1, "score": 30},
+                   "state": {"health": rnd.randint(1, 100), "armor": 100, "helmet": True, "flashed": 0, "smoked": 0,
+                             "burning": 0, "money": rnd.randint(0, 16000), "round_kills": 0, "round_killhs": 0,
+                             "equip_value": 4700},
+                   "weapons": {f"weapon_{i}": {"name": name, "paintkit": "default", "type": kind, "state": "holstered",
+                                               "ammo_clip": 30, "ammo_clip_max": 30, "ammo_reserve": 90}
+                               for i, (name, kind) in enumerate([("weapon_knife", "Knife"), ("weapon_glock", "Pistol"),
+                                                                 ("weapon_ak47", "Rifle")])}},
+        "previously": {"player": {"state": {"health": 100}}},
+        "auth": {"token": "top-secret-token"},
+    }
+    return json.dumps(data, indent="\t").encode("utf-8")
+
+
+def _legacy_extract(data):
+    """Тот же набор полей, что читал старый Flask-роут из request.json."""
+    if not data:
+        return None
+    return GSIPayload.from_sections(data.get("player"), data.get("round", {}), data.get("map", {}),
+                                    provider=data.get("provider"))
+
+
+async def _drive_client(host, port, bodies, interval, deadline, latencies):
+    """Один клиент CS2: держит соединение, шлёт POST с заданным темпом, переподключается при Connection: close."""
+    reader = writer = None
+    index = 0
+    next_send = time.perf_counter() + random.random() * interval
+    while time.perf_counter() < deadline:
+        delay = next_send - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        next_send += interval
+
+        body = bodies[index % len(bodies)]
+        index += 1
+        if writer is None:
+            reader, writer = await asyncio.open_connection(host, port)
+        started = time.perf_counter()
+        writer.write(
+            b"POST / HTTP/1.1\r\nHost: 127.0.0.1\r\nUser-Agent: Valve/Steam HTTP Client 1.0 (730)\r\n"
+            b"Content-Type: application/json\r\nConnection: keep-alive\r\n"
+            + f"Content-Length: {len(body)}\r\n\r\n".encode("latin-1") + body
+        )
+        await writer.drain()
+        head = await reader.readuntil(b"\r\n\r\n")
+        length = 0
+        close = head.startswith(b"HTTP/1.0")
+        for line in head.split(b"\r\n")[1:]:
+            name, _, value = line.partition(b":")
+            if name.strip().lower() == b"content-length":
+                length = int(value)
+            elif name.strip().lower() == b"connection":
+                close = value.strip().lower() == b"close"
+        if length:
+            await reader.readexactly(length)
+        else:
+            await reader.read()
+            close = True
+        latencies.append((time.perf_counter() - started) * 1000)
+        if close:
+            writer.close()
+            reader = writer = None
+    if writer is not None:
+        writer.close()
+
+
+def _run_load(host, port, clients, event_rate, duration, payloads_per_client=8):
+    rnd = random.Random(0)
+    latencies = []
+    interval = 1.0 / event_rate
+
+    async def main():
+        deadline = time.perf_counter() + duration
+        tasks = []
+        for i in range(clients):
+            steamid = str(76561190000000000 + i)
+            bodies = [_synthetic_payload(steamid, rnd) for _ in range(payloads_per_client)]
+            tasks.append(_drive_client(host, port, bodies, interval, deadline, latencies))
+        await asyncio.gather(*tasks)
+
+    asyncio.run(main())
+    return latencies
+
+
+def _start_flask_server(handler):
+    """Старый путь: Flask + werkzeug dev-сервер (threaded) и request.json. None, если Flask не установлен."""
+    try:
+        from flask import Flask, request
+        from werkzeug.serving import make_server
+        import logging
+    except ImportError:
+        return None
+
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+    app = Flask("CS2-GSI-bench")
+    app.logger.disabled = True
+
+    @app.route("/", methods=["POST"])
+    def gsi():
+        handler(_legacy_extract(request.json))
+        return "ok"
+
+    server = make_server("127.0.0.1", 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def benchmark(clients=10, event_rate=10.0, duration=5.0):
+    """
+    N клиентов CS2 с throttle 0 / buffer 0: во время раунда каждый шлёт ~event_rate POST в секунду
+    (heartbeat 20с на таком фоне не виден). Сравнивает p50/p99 полного цикла запрос→ответ
+    у asyncio-приёмника и у Flask-пути (если Flask установлен).
+    Запуск: python -m Managers.GSIServer [clients] [event_rate] [duration]
+    """
+    received = []
+    result = {"clients": clients, "event_rate": event_rate, "duration_s": duration}
+
+    server = GSIServer(received.append, port=0)
+    server.start()
+    latencies = _run_load(server.host, server.port, clients, event_rate, duration)
+    server.stop()
+    result.update({
+        "gsi_requests": len(latencies),
+        "gsi_rtt_p50_ms": round(percentile(latencies, 50), 3),
+        "gsi_rtt_p99_ms": round(percentile(latencies, 99), 3),
+        "gsi_handle_p50_ms": server.stats()["handle_p50_ms"],
+        "gsi_handle_p99_ms": server.stats()["handle_p99_ms"],
+    })
+
+    bodies = [_synthetic_payload(str(76561190000000000 + i), random.Random(i)) for i in range(200)]
+    started = time.perf_counter()
+    for body in bodies:
+        _legacy_extract(json.loads(body))
+    full_us = (time.perf_counter() - started) / len(bodies) * 1e6
+    started = time.perf_counter()
+    for body in bodies:
+        decode_payload(body)
+    slim_us = (time.perf_counter() - started) / len(bodies) * 1e6
+    result.update({"decode_full_us": round(full_us, 1), "decode_slim_us": round(slim_us, 1)})
+
+    flask_server = _start_flask_server(lambda payload: None)
+    if flask_server is None:
+        result["flask"] = "not installed"
+        return result
+    latencies = _run_load("127.0.0.1", flask_server.server_port, clients, event_rate, duration)
+    flask_server.shutdown()
+    result.update({
+        "flask_requests": len(latencies),
+        "flask_rtt_p50_ms": round(percentile(latencies, 50), 3),
+        "flask_rtt_p99_ms": round(percentile(latencies, 99), 3),
+    })
+    return result
+
+
+if __name__ == "__main__":
+    args = [float(a) for a in sys.argv[1:4]]
+    print(benchmark(int(args[0]) if args else 10, *args[1:]))
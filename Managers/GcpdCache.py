@@ -0,0 +1,153 @@
+import threading
+import time
+
+from Helpers.GcpdParser import parse_gcpd
+from Managers.SettingsManager import SettingsManager
+
+TAB_LEVEL = "gcpd/730"
+TAB_MATCHMAKING = "gcpd/730/?tab=matchmaking"
+
+
+class GcpdStats:
+    """Всё, что панель берёт со страниц gcpd аккаунта: уровень, xp, Premier, Wingman, карты."""
+    __slots__ = ("login", "level", "xp", "premier", "wingman", "maps", "fetched_at", "pages", "variants")
+
+    def __init__(self, login):
+        self.login = login
+        self.level = 0
+        self.xp = 0
+        self.premier = None
+        self.wingman = None
+        self.maps = []
+        # самая старая из использованных вкладок
+        self.fetched_at = 0.0
+        # вкладка -> HTML (для отладки, когда разбор не удался)
+        self.pages = {}
+        # вкладка -> вид страницы (GcpdParser.VARIANT_*)
+        self.variants = {}
+
+    def __repr__(self):
+        return f"GcpdStats({self.login}, lvl {self.level}, xp {self.xp}, maps={len(self.maps)})"
+
+
+# -----------------------------
+# Cache
+# -----------------------------
+class _CachedPage:
+    __slots__ = ("fetched_at", "html", "parsed")
+
+    def __init__(self, fetched_at, html, parsed):
+        self.fetched_at = fetched_at
+        self.html = html
+        self.parsed = parsed
+
+
+class GcpdCache:
+    """
+    Страницы gcpd по аккаунтам: каждая вкладка скачивается и разбирается один раз за ttl.
+    Одновременные запросы одного аккаунта (несколько кнопок статистики) ждут одну загрузку.
+    """
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+            cls._instance._initialized = False
+        return cls._instance
+
+    def __init__(self):
+        if self._initialized:
+            return
+        self._init_state(SettingsManager().get("GcpdCacheTTL", 300))
+        self._initialized = True
+
+    @classmethod
+    def create_isolated(cls, ttl=300, fetcher=None):
+        """Отдельный экземпляр мимо синглтона (бенчмарк, стенд)."""
+        instance = super().__new__(cls)
+        instance._init_state(ttl, fetcher)
+        instance._initialized = True
+        return instance
+
+    def _init_state(self, ttl, fetcher=None):
+        self.ttl = float(ttl)
+        # fetcher(account, tab) -> html; по умолчанию — общая сессия из SteamSessionVault
+        self._fetcher = fetcher
+        self._pages = {}
+        self._login_locks = {}
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.fetches = 0
+
+    def _fetch(self, account, tab):
+        if self._fetcher is None:
+            from Managers.SteamSessionVault import SteamSessionVault
+            return SteamSessionVault().fetch(account, tab)
+        return self._fetcher(account, tab)
+
+    def _lock_for(self, login):
+        with self._lock:
+            lock = self._login_locks.get(login)
+            if lock is None:
+                lock = self._login_locks[login] = threading.Lock()
+            return lock
+
+    def _page(self, account, tab, max_age):
+        key = (account.login, tab)
+        page = self._pages.get(key)
+        if page is not None and time.time() - page.fetched_at <= max_age:
+            self.hits += 1
+            return page
+        html = self._fetch(account, tab)
+        self.fetches += 1
+        page = _CachedPage(time.time(), html, parse_gcpd(html))
+        self._pages[key] = page
+        return page
+
+    # -----------------------------
+    # Public
+    # -----------------------------
+    def get(self, account, tabs=(TAB_LEVEL,), max_age=None):
+        """
+        GcpdStats из вкладок tabs (свежих не старше max_age, по умолчанию ttl; 0 — всегда скачать).
+        Уровень — с первой вкладки, где он нашёлся; ошибки загрузки — исключением.
+        """
+        max_age = self.ttl if max_age is None else max_age
+        with self._lock_for(account.login):
+            pages = [(tab, self._page(account, tab, max_age)) for tab in tabs]
+
+        record = GcpdStats(account.login)
+        record.fetched_at = min(page.fetched_at for _, page in pages) if pages else 0.0
+        for tab, page in pages:
+            parsed = page.parsed
+            record.pages[tab] = page.html
+            record.variants[tab] = parsed.variant
+            if record.level <= 0 and parsed.level > 0:
+                record.level, record.xp = parsed.level, parsed.xp
+            record.premier = record.premier or parsed.modes.get("Premier")
+            record.wingman = record.wingman or parsed.modes.get("Wingman")
+            record.maps = record.maps or parsed.maps
+        return record
+
+    def get_level(self, account, max_age=None):
+        """Уровень с gcpd/730; не нашёлся — ещё вкладка matchmaking (там он иногда есть)."""
+        record = self.get(account, (TAB_LEVEL,), max_age)
+        if record.level > 0:
+            return record
+        fallback = self.get(account, (TAB_MATCHMAKING,), max_age)
+        return fallback if fallback.level > 0 else record
+
+    def get_many(self, accounts, tabs=(TAB_LEVEL,), max_age=None):
+        """get() для многих аккаунтов параллельно; SteamBatchResult.value — GcpdStats."""
+        from Managers.SteamBatchClient import SteamBatchClient
+        return SteamBatchClient().run(accounts, lambda account: self.get(account, tabs, max_age))
+
+    def invalidate(self, login=None):
+        with self._lock:
+            for key in list(self._pages):
+                if login is None or key[0] == login:
+                    del self._pages[key]
+
+    def stats(self):
+        return {"pages": len(self._pages), "hits": self.hits, "fetches": self.fetches, "ttl": self.ttl}
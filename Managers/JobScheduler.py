@@ -0,0 +1,186 @@
+import queue
+import threading
+import time
+
+
+class CancelToken:
+    """
+    Токен отмены задачи. Совместим с threading.Event (is_set / wait), поэтому подходит
+    туда, где раньше передавался stop_event. Отмена родителя отменяет всех детей.
+    """
+
+    def __init__(self, parent=None, name=None):
+        self.name = name
+        self.reason = None
+        self._event = threading.Event()
+        self._children = []
+        self._lock = threading.Lock()
+        if parent is not None:
+            parent._adopt(self)
+
+    def _adopt(self, child):
+        with self._lock:
+            if not self._event.is_set():
+                self._children.append(child)
+                return
+        child.cancel(self.reason)
+
+    def child(self, name=None):
+        return CancelToken(parent=self, name=name)
+
+    def cancel(self, reason="cancelled"):
+        with self._lock:
+            if self._event.is_set():
+                return
+            self.reason = reason
+            self._event.set()
+            children, self._children = self._children, []
+        for child in children:
+            child.cancel(reason)
+
+    @property
+    def cancelled(self):
+        return self._event.is_set()
+
+    def is_set(self):
+        return self._event.is_set()
+
+    def wait(self, timeout=None):
+        """True — токен отменён (как Event.wait)."""
+        return self._event.wait(timeout)
+
+    def __repr__(self):
+        state = f"cancelled: {self.reason}" if self.cancelled else "active"
+        return f"CancelToken({self.name}, {state})"
+
+
+class Job:
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    CANCELLED = "cancelled"
+    FAILED = "failed"
+
+    __slots__ = ("name", "func", "args", "kwargs", "token", "state", "submitted_at", "started_at",
+                 "finished_at", "error")
+
+    def __init__(self, name, func, args, kwargs, token):
+        self.name = name
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self.token = token
+        self.state = self.QUEUED
+        self.submitted_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.error = None
+
+    @property
+    def run_seconds(self):
+        if self.started_at is None:
+            return 0.0
+        return (self.finished_at or time.time()) - self.started_at
+
+    def __repr__(self):
+        return f"Job({self.name}, {self.state}, {self.run_seconds:.1f}s)"
+
+
+class JobScheduler:
+    """
+    Ограниченный пул потоков для действий раунда и матча вместо отдельного потока на каждое.
+    Задача с уже отменённым токеном не запускается; сама задача проверяет токен во время работы.
+    """
+
+    def __init__(self, max_workers=8, name="jobs"):
+        self.max_workers = max(1, int(max_workers))
+        self.name = name
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._workers = []
+        self._running = set()
+        self._idle = 0
+
+        self.submitted = 0
+        self.cancelled = 0
+        self.failed = 0
+        # имя задачи -> [выполнено, суммарное время, максимум]
+        self.run_times = {}
+
+    def submit(self, name, func, *args, token=None, **kwargs):
+        job = Job(name, func, args, kwargs, token)
+        with self._lock:
+            self.submitted += 1
+            # новый поток — только если все свободные уже разобраны очередью, и не больше max_workers
+            if len(self._workers) < self.max_workers and self._idle <= self._queue.qsize():
+                worker = threading.Thread(target=self._work, name=f"{self.name}-{len(self._workers) + 1}", daemon=True)
+                self._workers.append(worker)
+                worker.start()
+        self._queue.put(job)
+        return job
+
+    def _work(self):
+        while True:
+            with self._lock:
+                self._idle += 1
+            job = self._queue.get()
+            with self._lock:
+                self._idle -= 1
+            if job is None:
+                return
+            if job.token is not None and job.token.cancelled:
+                job.state = Job.CANCELLED
+                job.finished_at = time.time()
+                with self._lock:
+                    self.cancelled += 1
+                continue
+
+            job.state = Job.RUNNING
+            job.started_at = time.time()
+            with self._lock:
+                self._running.add(job)
+            try:
+                job.func(*job.args, **job.kwargs)
+                job.state = Job.CANCELLED if job.token is not None and job.token.cancelled else Job.DONE
+            except Exception as e:
+                job.state = Job.FAILED
+                job.error = e
+                print(f"❌ {job.name}: {e}")
+            finally:
+                job.finished_at = time.time()
+                with self._lock:
+                    self._running.discard(job)
+                    if job.state == Job.FAILED:
+                        self.failed += 1
+                    elif job.state == Job.CANCELLED:
+                        self.cancelled += 1
+                    stats = self.run_times.setdefault(job.name, [0, 0.0, 0.0])
+                    stats[0] += 1
+                    stats[1] += job.run_seconds
+                    stats[2] = max(stats[2], job.run_seconds)
+
+    def shutdown(self):
+        with self._lock:
+            workers, self._workers = self._workers, []
+        for _ in workers:
+            self._queue.put(None)
+
+    def running(self):
+        with self._lock:
+            return sorted(self._running, key=lambda job: job.started_at)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "workers": len(self._workers),
+                "max_workers": self.max_workers,
+                "running": [repr(job) for job in sorted(self._running, key=lambda job: job.started_at)],
+                "queued": self._queue.qsize(),
+                "submitted": self.submitted,
+                "cancelled": self.cancelled,
+                "failed": self.failed,
+                "run_times": {
+                    name: {"count": count, "avg_s": round(total / count, 2) if count else 0.0, "max_s": round(peak, 2)}
+                    for name, (count, total, peak) in self.run_times.items()
+                },
+            }
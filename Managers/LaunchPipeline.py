@@ -0,0 +1,180 @@
+import threading
+import time
+
+from Managers.SettingsManager import SettingsManager
+
+
+class LaunchStage:
+    """
+    Одна стадия запуска. Стадии с одинаковой полосой (lane) идут подряд под одним семафором:
+    слот полосы занимается на первой стадии и отдаётся после последней.
+    """
+
+    __slots__ = ("name", "method", "lane", "required")
+
+    def __init__(self, name, method, lane, required=True):
+        self.name = name
+        self.method = method
+        self.lane = lane
+        self.required = required
+
+
+class LaunchPipeline:
+    """
+    Конвейер запуска аккаунтов: profile prep → Steam spawn → login → CS2 spawn → mutex release → window fixup.
+    Вместо фиксированных sleep стадии ждут сигналов готовности (см. Account.launch_*),
+    поэтому логин аккаунта N+1 идёт параллельно с загрузкой CS2 аккаунта N.
+    """
+
+    STAGES = (
+        LaunchStage("prepare", "launch_prepare_profile", "prepare"),
+        LaunchStage("steam_spawn", "launch_spawn_steam", "steam"),
+        # login/cs2_spawn/mutex — одна полоса: UI-логин с буфером обмена и singleton-mutex
+        # должны отработать до того, как следующий Steam поднимет свой cs2.exe.
+        LaunchStage("login", "launch_login", "session"),
+        LaunchStage("cs2_spawn", "launch_attach_cs2", "session"),
+        LaunchStage("mutex_release", "launch_release_mutex", "session"),
+        LaunchStage("window_fixup", "launch_fixup_window", "window", required=False),
+    )
+
+    def __init__(self, on_success=None, on_failure=None):
+        self._settingsManager = SettingsManager()
+        self.on_success = on_success
+        self.on_failure = on_failure
+
+        limits = {
+            "prepare": 1,
+            "steam": 1,
+            "session": 1,
+            "window": int(self._settingsManager.get("LaunchWindowConcurrency", 4) or 4),
+        }
+        self._lanes = {lane: threading.Semaphore(max(1, limit)) for lane, limit in limits.items()}
+        self.lane_limits = limits
+
+        self.max_in_flight = max(1, int(self._settingsManager.get("LaunchMaxInFlight", 4) or 4))
+        self._in_flight = threading.Semaphore(self.max_in_flight)
+
+        self._lock = threading.Lock()
+        self._active = set()
+        # stage -> [count, total_seconds, max_seconds, wait_seconds]
+        self._stage_totals = {stage.name: [0, 0.0, 0.0, 0.0] for stage in self.STAGES}
+        self.launched = 0
+        self.failed = 0
+        self.last_timings = {}
+
+    # -----------------------------
+    # Submit
+    # -----------------------------
+    def submit(self, account):
+        """Блокирует, пока в конвейере нет свободного места, затем запускает аккаунт в своём потоке."""
+        self._in_flight.acquire()
+        with self._lock:
+            self._active.add(account)
+        threading.Thread(target=self._run_account, args=(account,), daemon=True).start()
+
+    def is_active(self, account):
+        return account in self._active
+
+    def wait_idle(self, timeout=None):
+        deadline = None if timeout is None else time.time() + timeout
+        while self._active:
+            if deadline is not None and time.time() >= deadline:
+                return False
+            time.sleep(0.2)
+        return True
+
+    def _run_account(self, account):
+        timings = {}
+        held_lane = None
+        ok = True
+        failed_stage = None
+        started = time.perf_counter()
+        try:
+            for stage in self.STAGES:
+                wait_started = time.perf_counter()
+                if stage.lane != held_lane:
+                    if held_lane is not None:
+                        self._lanes[held_lane].release()
+                        held_lane = None
+                    self._lanes[stage.lane].acquire()
+                    held_lane = stage.lane
+                waited = time.perf_counter() - wait_started
+
+                stage_started = time.perf_counter()
+                try:
+                    result = getattr(account, stage.method)()
+                except Exception as e:
+                    print(f"❌ [{account.login}] стадия {stage.name}: {e}")
+                    result = False
+                elapsed = time.perf_counter() - stage_started
+
+                timings[stage.name] = elapsed
+                self._record(stage.name, elapsed, waited)
+
+                if result is False and stage.required:
+                    ok = False
+                    failed_stage = stage.name
+                    break
+        finally:
+            if held_lane is not None:
+                self._lanes[held_lane].release()
+
+            timings["total"] = time.perf_counter() - started
+            with self._lock:
+                self.last_timings[account.login] = timings
+                if ok:
+                    self.launched += 1
+                else:
+                    self.failed += 1
+                self._active.discard(account)
+            self._in_flight.release()
+
+        summary = ", ".join(f"{name} {seconds:.1f}s" for name, seconds in timings.items())
+        if ok:
+            print(f"🚀 [{account.login}] запущен: {summary}")
+            callback = self.on_success
+        else:
+            print(f"❌ [{account.login}] запуск прерван на стадии {failed_stage}: {summary}")
+            callback = self.on_failure
+        if callback:
+            try:
+                callback(account)
+            except Exception as e:
+                print(f"⚠️ [{account.login}] ошибка обработчика запуска: {e}")
+
+    def _record(self, name, elapsed, waited):
+        with self._lock:
+            totals = self._stage_totals[name]
+            totals[0] += 1
+            totals[1] += elapsed
+            totals[2] = max(totals[2], elapsed)
+            totals[3] += waited
+
+    # -----------------------------
+    # Metrics
+    # -----------------------------
+    def stats(self):
+        with self._lock:
+            stages = {}
+            for name, (count, total, maximum, waited) in self._stage_totals.items():
+                stages[name] = {
+                    "count": count,
+                    "avg_s": (total / count) if count else 0.0,
+                    "max_s": maximum,
+                    "avg_wait_s": (waited / count) if count else 0.0,
+                }
+            return {
+                "launched": self.launched,
+                "failed": self.failed,
+                "in_flight": len(self._active),
+                "stages": stages,
+            }
+
+    def report(self):
+        stats = self.stats()
+        print(f"📊 Запуск: успешно {stats['launched']}, ошибок {stats['failed']}, в работе {stats['in_flight']}")
+        for name, data in stats["stages"].items():
+            print(
+                f"   {name:<14} n={data['count']:<3} avg {data['avg_s']:.1f}s "
+                f"max {data['max_s']:.1f}s ожидание слота {data['avg_wait_s']:.1f}s"
+            )
@@ -0,0 +1,296 @@
+import bisect
+import json
+import os
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+
+class LevelSample:
+    """Уровень/xp аккаунта на момент ts. source: "match" (после матча), "manual" (кнопка), "level.json" (импорт)."""
+    __slots__ = ("login", "level", "xp", "ts", "source")
+
+    def __init__(self, login, level, xp, ts, source="manual"):
+        self.login = login
+        self.level = int(level)
+        self.xp = int(xp)
+        self.ts = float(ts)
+        self.source = source
+
+    @property
+    def total_xp(self):
+        return self.level * LevelStore.XP_PER_LEVEL + self.xp
+
+    def to_dict(self):
+        return {"login": self.login, "level": self.level, "xp": self.xp, "ts": round(self.ts, 3), "source": self.source}
+
+    def __repr__(self):
+        return f"LevelSample({self.login}, lvl {self.level}, xp {self.xp}, {self.source})"
+
+
+class LevelStore:
+    """
+    История level/xp по аккаунтам: settings/level_history.jsonl, одна строка на изменение.
+    Запись — дописывание одной строки под локом (без чтения и перезаписи всего файла),
+    одинаковые level/xp подряд не пишутся. В памяти — последний срез и история с индексом по времени.
+    Подписчики получают LevelSample при каждом изменении (из потока, который записал).
+    """
+    _instance = None
+
+    # CS2: 5000 xp на уровень
+    XP_PER_LEVEL = 5000
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+            cls._instance._initialized = False
+        return cls._instance
+
+    def __init__(self):
+        if self._initialized:
+            return
+        self._init_state(os.path.join("settings", "level_history.jsonl"), "level.json")
+        self._initialized = True
+
+    @classmethod
+    def create_isolated(cls, file_path, legacy_path=None):
+        """Отдельный экземпляр мимо синглтона (бенчмарк, проверки)."""
+        instance = super().__new__(cls)
+        instance._init_state(file_path, legacy_path)
+        instance._initialized = True
+        return instance
+
+    def _init_state(self, file_path, legacy_path=None):
+        self.file_path = file_path
+        self.legacy_path = legacy_path
+        self._lock = threading.Lock()
+        # login -> [LevelSample] по возрастанию ts, login -> [ts] для bisect
+        self._history = {}
+        self._times = {}
+        self._latest = {}
+        self._subscribers = []
+
+        self.appended = 0
+        self.skipped_lines = 0
+        self._load()
+
+    # -----------------------------
+    # Storage
+    # -----------------------------
+    def _index(self, sample):
+        history = self._history.setdefault(sample.login, [])
+        times = self._times.setdefault(sample.login, [])
+        if times and sample.ts < times[-1]:
+            position = bisect.bisect_right(times, sample.ts)
+            history.insert(position, sample)
+            times.insert(position, sample.ts)
+        else:
+            history.append(sample)
+            times.append(sample.ts)
+        self._latest[sample.login] = history[-1]
+
+    def _load(self):
+        if os.path.exists(self.file_path):
+            with open(self.file_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        data = json.loads(line)
+                        self._index(LevelSample(data["login"], data["level"], data["xp"], data["ts"],
+                                                data.get("source", "manual")))
+                    except Exception:
+                        # оборванная строка (запись прервалась) — пропускаем
+                        if line.strip():
+                            self.skipped_lines += 1
+            return
+
+        # Первый запуск: забираем срез из старого level.json
+        if self.legacy_path and os.path.exists(self.legacy_path):
+            try:
+                with open(self.legacy_path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                ts = os.path.getmtime(self.legacy_path)
+                samples = [LevelSample(login, info.get("level", 0), info.get("xp", 0), ts, "level.json")
+                           for login, info in data.items() if isinstance(info, dict)]
+                for sample in samples:
+                    self._index(sample)
+                self._append(samples)
+                print(f"✅ LevelStore: импортировано {len(samples)} аккаунтов из {self.legacy_path}")
+            except Exception as e:
+                print(f"⚠️ LevelStore: не удалось импортировать {self.legacy_path}: {e}")
+
+    def _append(self, samples):
+        if not samples:
+            return
+        directory = os.path.dirname(self.file_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        text = "".join(json.dumps(sample.to_dict(), ensure_ascii=False) + "\n" for sample in samples)
+        with open(self.file_path, "a", encoding="utf-8") as f:
+            f.write(text)
+        self.appended += len(samples)
+
+    # -----------------------------
+    # Public
+    # -----------------------------
+    def update(self, login, level, xp, source="manual", ts=None):
+        """Записать новый level/xp. False — не изменился (ничего не пишется и не рассылается)."""
+        with self._lock:
+            # время берётся под локом: порядок в файле совпадает с порядком записей
+            sample = LevelSample(login, level, xp, time.time() if ts is None else ts, source)
+            latest = self._latest.get(login)
+            if latest is not None and latest.level == sample.level and latest.xp == sample.xp:
+                return False
+            try:
+                self._append([sample])
+            except Exception as e:
+                print(f"⚠️ [{login}] LevelStore: не удалось записать: {e}")
+                return False
+            self._index(sample)
+            subscribers = list(self._subscribers)
+
+        for callback in subscribers:
+            try:
+                callback(sample)
+            except Exception as e:
+                print(f"⚠️ LevelStore: подписчик упал на {login}: {e}")
+        return True
+
+    def latest(self, login):
+        """Последний LevelSample аккаунта или None."""
+        return self._latest.get(login)
+
+    def latest_all(self):
+        """{login: {"level", "xp"}} — как был устроен level.json."""
+        with self._lock:
+            return {login: {"level": sample.level, "xp": sample.xp} for login, sample in self._latest.items()}
+
+    def history(self, login, since=None):
+        with self._lock:
+            history = self._history.get(login, [])
+            if since is None:
+                return list(history)
+            return history[bisect.bisect_left(self._times[login], since):]
+
+    @staticmethod
+    def weekly_reset(now=None):
+        """Начало текущей недели CS2: среда 00:00 UTC."""
+        moment = datetime.fromtimestamp(time.time() if now is None else now, timezone.utc)
+        start = (moment - timedelta(days=(moment.weekday() - 2) % 7)).replace(hour=0, minute=0, second=0, microsecond=0)
+        return start.timestamp()
+
+    @staticmethod
+    def _gained(samples):
+        # уровень может сброситься (новая медаль) — отрицательные шаги не считаем
+        return sum(max(0, current.total_xp - previous.total_xp) for previous, current in zip(samples, samples[1:]))
+
+    def xp_gained(self, login, since):
+        """XP, набранный с момента since: от последней записи не позже since (или первой после) до текущей."""
+        with self._lock:
+            history = self._history.get(login)
+            if not history:
+                return 0
+            start = max(0, bisect.bisect_right(self._times[login], since) - 1)
+            return self._gained(history[start:])
+
+    def xp_this_week(self, login, now=None):
+        return self.xp_gained(login, self.weekly_reset(now))
+
+    def xp_per_hour(self, login, matches=5):
+        """XP/час по последним matches изменениям (запись появляется после каждого матча с наградой)."""
+        with self._lock:
+            samples = self._history.get(login, [])[-(matches + 1):]
+        if len(samples) < 2:
+            return 0.0
+        hours = (samples[-1].ts - samples[0].ts) / 3600
+        return self._gained(samples) / hours if hours > 0 else 0.0
+
+    def subscribe(self, callback):
+        """callback(LevelSample) при каждом изменении."""
+        with self._lock:
+            if callback not in self._subscribers:
+                self._subscribers.append(callback)
+
+    def unsubscribe(self, callback):
+        with self._lock:
+            if callback in self._subscribers:
+                self._subscribers.remove(callback)
+
+    def stats(self):
+        return {
+            "accounts": len(self._latest),
+            "samples": sum(len(history) for history in self._history.values()),
+            "appended": self.appended,
+            "skipped_lines": self.skipped_lines,
+        }
+
+
+# -----------------------------
+# Benchmark
+# -----------------------------
+def benchmark(accounts=200, threads=8, updates=50):
+    """
+    Параллельные обновления: threads потоков по updates записей на каждый из accounts аккаунтов.
+    Сравнение с прежней схемой (прочитать весь level.json, поменять ключ, переписать) и проверка,
+    что ни одно обновление не потерялось.
+    """
+    import tempfile
+
+    folder = tempfile.mkdtemp(prefix="level_store_")
+    logins = [f"acc{i:03d}" for i in range(accounts)]
+    results = {"accounts": accounts, "threads": threads, "updates_per_thread": updates}
+
+    store = LevelStore.create_isolated(os.path.join(folder, "level_history.jsonl"))
+
+    def store_worker(offset):
+        for step in range(updates):
+            login = logins[(offset * updates + step) % accounts]
+            store.update(login, 1 + step, offset * 1000 + step, source="match")
+
+    legacy_path = os.path.join(folder, "level.json")
+    with open(legacy_path, "w", encoding="utf-8") as f:
+        json.dump({login: {"level": 0, "xp": 0} for login in logins}, f)
+
+    def legacy_worker(offset):
+        # как Account.update_level_xp: без общего лока, каждый поток переписывает весь файл
+        for step in range(updates):
+            login = logins[(offset * updates + step) % accounts]
+            try:
+                with open(legacy_path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+            except Exception:
+                data = {}
+            data[login] = {"level": 1 + step, "xp": offset * 1000 + step}
+            with open(legacy_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False, indent=2)
+
+    for name, worker in (("store", store_worker), ("legacy", legacy_worker)):
+        pool = [threading.Thread(target=worker, args=(offset,)) for offset in range(threads)]
+        started = time.perf_counter()
+        for thread in pool:
+            thread.start()
+        for thread in pool:
+            thread.join()
+        results[f"{name}_ms_per_update"] = round((time.perf_counter() - started) * 1000 / (threads * updates), 3)
+
+    touched = {logins[(offset * updates + step) % accounts] for offset in range(threads) for step in range(updates)}
+    reloaded = LevelStore.create_isolated(store.file_path)
+    results["store_lost"] = sum(1 for login in touched if reloaded.latest(login) is None
+                                or reloaded.latest(login).total_xp != store.latest(login).total_xp)
+    try:
+        with open(legacy_path, "r", encoding="utf-8") as f:
+            legacy = json.load(f)
+        results["legacy_lost"] = sum(1 for login in touched if legacy.get(login, {}).get("level", 0) == 0)
+    except Exception as e:
+        results["legacy_lost"] = f"файл испорчен: {e}"
+
+    started = time.perf_counter()
+    for login in logins:
+        store.xp_this_week(login)
+        store.xp_per_hour(login)
+    results["queries_us_per_account"] = round((time.perf_counter() - started) * 1e6 / accounts, 1)
+    results["store"] = store.stats()
+    return results
+
+
+if __name__ == "__main__":
+    print(benchmark())
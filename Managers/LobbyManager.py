@@ -1,20 +1,32 @@
 import ctypes
+import threading
 import time
 import random
-import psutil
 import win32gui
 import win32api
 import win32con
 import win32process
-import keyboard
 
+from Helpers.InputLock import INPUT_LOCK
+from Helpers.WindowLayout import CELL_HEIGHT, CELL_WIDTH, Win32LayoutApplier, compute_grid_layout, get_work_areas, \
+    grid_cell_count, layout_sort_key
+from Instances.LobbyGroupInstance import LobbyGroupInstance
 from Instances.LobbyInstance import LobbyInstance
 from Managers.AccountsManager import AccountManager
+from Managers.LobbyScheduler import LobbyScheduler
 from Managers.LogManager import LogManager
+from Managers.ProcessManager import ProcessManager
 from Managers.SettingsManager import SettingsManager
+from Managers.WindowManager import WindowManager
 
 
 class LobbyManager:
+    FINAL_CLICK = (289, 271)
+    OPEN_SEQ = [(206, 8), (154, 23), (142, 33)]
+    # Сколько ждать матча в одном цикле поиска группы, с
+    SEARCH_TIMEOUT = 600
+    WINDOW_WIDTH = CELL_WIDTH
+    WINDOW_HEIGHT = CELL_HEIGHT
     _instance = None
 
     def __new__(cls):
@@ -30,11 +42,20 @@ class LobbyManager:
         self._accountManager = AccountManager()
         self._logManager = LogManager()
         self._settingManager = SettingsManager()
+        self._windowManager = WindowManager()
+        # Один снимок экрана на тик для всех точек всех окон (numpy/PIL — при первом лобби)
+        self._screenSampler = None
+        # Сетка по мониторам, все окна двигаются одной DeferWindowPos-транзакцией
+        self._layoutApplier = None
 
         self.team1 = None
         self.team2 = None
         self._last_window_order_logins = []
 
+        # Несколько независимых четвёрок (8, 12, 16+ окон) и очередь на UI между ними
+        self.groups = []
+        self._scheduler = LobbyScheduler()
+
         self._maps_scrolled_once = False
         self._screen_grab_warning_logged = False
         self._initialized = True
@@ -58,6 +79,16 @@ class LobbyManager:
 
         return True
 
+    def get_all_members(self):
+        """Все аккаунты текущих лобби: всех групп, если запущен мульти-режим, иначе team1 + team2."""
+        if self.groups:
+            return [acc for group in self.groups for acc in group.accounts]
+        members = []
+        for team in (self.team1, self.team2):
+            if team is not None:
+                members.extend([team.leader] + team.bots)
+        return members
+
     def CollectLobby(self):
         if self._is_cancelled():
             return False
@@ -121,11 +152,7 @@ class LobbyManager:
     def _is_cs2_process(pid):
         if not pid:
             return False
-        try:
-            proc = psutil.Process(pid)
-            return (proc.name() or "").lower() == "cs2.exe"
-        except Exception:
-            return False
+        return ProcessManager().is_alive(pid, name="cs2.exe")
 
     def _resolve_account_cs2_hwnd(self, account):
         hwnd = 0
@@ -152,43 +179,10 @@ class LobbyManager:
         if not self._is_cs2_process(pid):
             return 0
 
-        candidates = []
-
-        def enum_cb(enum_hwnd, _):
-            try:
-                if not win32gui.IsWindow(enum_hwnd):
-                    return True
-                if not win32gui.IsWindowVisible(enum_hwnd):
-                    return True
-                if win32gui.GetParent(enum_hwnd) != 0:
-                    return True
-
-                _, hwnd_pid = win32process.GetWindowThreadProcessId(enum_hwnd)
-                if hwnd_pid != pid:
-                    return True
-
-                rect = win32gui.GetWindowRect(enum_hwnd)
-                width = max(0, rect[2] - rect[0])
-                height = max(0, rect[3] - rect[1])
-                area = width * height
-                if area <= 0:
-                    return True
-
-                candidates.append((area, rect[0], rect[1], enum_hwnd))
-            except Exception:
-                pass
-            return True
-
-        try:
-            win32gui.EnumWindows(enum_cb, None)
-        except Exception:
-            return 0
-
-        if not candidates:
-            return 0
-
-        candidates.sort(key=lambda item: (-item[0], item[1], item[2]))
-        return candidates[0][3]
+        hwnd = self._windowManager.get_largest_window(pid)
+        if hwnd and win32gui.IsWindow(hwnd):
+            return hwnd
+        return 0
 
     def _has_strict_pair_windows(self):
         if not self.team1 or not self.team2:
@@ -210,21 +204,70 @@ class LobbyManager:
                 return False
 
             seen_hwnds.add(hwnd)
-            positions.append((rect[0], rect[1], member.login))
+            positions.append((rect, member.login))
 
         expected_order = [member.login for member in members]
-        actual_order = [item[2] for item in sorted(positions, key=lambda item: (item[0], item[1]))]
+        # Порядок по номерам ячеек сетки (compute_grid_layout), а не по пикселям
+        work_areas = get_work_areas()
+        actual_order = [item[1] for item in sorted(positions, key=lambda item: layout_sort_key(item[0], work_areas))]
         return actual_order == expected_order
 
-    def MoveWindows(self, ordered_logins=None):
-        if not self.team1 or not self.team2:
-            return False
-
+    def _get_layout_applier(self):
+        if self._layoutApplier is None:
+            self._layoutApplier = Win32LayoutApplier()
+        return self._layoutApplier
+
+    def _get_screen_sampler(self):
+        if self._screenSampler is None:
+            from Helpers.ScreenSampler import ScreenSampler
+            self._screenSampler = ScreenSampler()
+        return self._screenSampler
+
+    def _invalidate_screen(self):
+        if self._screenSampler is not None:
+            self._screenSampler.invalidate()
+
+    def _apply_grid_layout(self, members, first_cell=0, total=None):
+        """
+        Ставит окна members в ячейки first_cell.. сетки на total окон (по умолчанию — на len(members)).
+        Все перемещения — одной DeferWindowPos-транзакцией. Возвращает число поставленных окон.
+        """
         try:
             ctypes.windll.user32.SetProcessDPIAware()
         except Exception:
             pass
 
+        if self._is_cancelled():
+            return 0
+
+        total = max(total or 0, first_cell + len(members))
+        placements = compute_grid_layout(total, get_work_areas())[first_cell:first_cell + len(members)]
+        if len(placements) < len(members):
+            unplaced = [getattr(member, "login", "?") for member in members[len(placements):]]
+            self._logManager.add_log(
+                f"⚠️ Нет свободных ячеек на мониторах для {len(unplaced)} окон ({', '.join(unplaced)}) — не двигаем"
+            )
+
+        moves = []
+        for member, placement in zip(members, placements):
+            try:
+                hwnd = self._resolve_account_cs2_hwnd(member)
+            except Exception:
+                continue
+            if hwnd and win32gui.IsWindow(hwnd):
+                moves.append((hwnd, placement, f"[FSN FREE] {member.login}"))
+
+        try:
+            placed = self._get_layout_applier().apply(moves) if moves else 0
+        finally:
+            self._windowManager.invalidate()
+            self._invalidate_screen()
+        return placed
+
+    def MoveWindows(self, ordered_logins=None):
+        if not self.team1 or not self.team2:
+            return False
+
         ordered_members = []
         all_members = [self.team1.leader] + self.team1.bots + [self.team2.leader] + self.team2.bots
         member_by_login = {m.login: m for m in all_members if hasattr(m, 'login')}
@@ -246,30 +289,7 @@ class LobbyManager:
         if not ordered_members:
             ordered_members = all_members
 
-        target_width = 383
-        target_height = 280
-        y = 0
-        placed = 0
-
-        for member in ordered_members:
-            if self._is_cancelled():
-                return False
-
-
-            try:
-                hwnd = self._resolve_account_cs2_hwnd(member)
-                if not hwnd or not win32gui.IsWindow(hwnd):
-                    continue
-
-                x = placed * target_width
-                win32gui.ShowWindow(hwnd, win32con.SW_RESTORE)
-                win32gui.MoveWindow(hwnd, x, y, target_width, target_height, True)
-                win32gui.SetWindowText(hwnd, f"[FSN FREE] {member.login}")
-                placed += 1
-            except Exception:
-                continue
-
-        return placed > 0
+        return self._apply_grid_layout(ordered_members) > 0
 
     def Shuffle(self):
         if self._is_cancelled():
@@ -379,6 +399,7 @@ class LobbyManager:
 
         ordered = []
         missing_windows = []
+        work_areas = get_work_areas()
 
         for order_index, account in enumerate(valid_accounts):
             hwnd = self._resolve_account_cs2_hwnd(account)
@@ -392,15 +413,15 @@ class LobbyManager:
                 missing_windows.append(account.login)
                 continue
 
-            ordered.append((rect[0], rect[1], order_index, account, hwnd))
+            ordered.append((layout_sort_key(rect, work_areas), order_index, account, hwnd))
 
         if missing_windows:
             self._logManager.add_log(f"⚠️ Пропущены аккаунты без окна CS2: {', '.join(missing_windows)}")
 
-        # Строго: только слева направо. При равном X сохраняем исходный порядок аккаунтов.
-        ordered.sort(key=lambda item: (item[0], item[1], item[2]))
+        # По номеру ячейки сетки, в которой стоит окно. При равном ключе — исходный порядок аккаунтов.
+        ordered.sort(key=lambda item: (item[0], item[1]))
 
-        return [item[3] for item in ordered]
+        return [item[2] for item in ordered]
 
     def _get_rect_for_account_window(self, account):
         pid = 0
@@ -414,39 +435,12 @@ class LobbyManager:
             return None
 
         best = None
-
-        def enum_cb(hwnd, _):
-            nonlocal best
-            try:
-                if not win32gui.IsWindowVisible(hwnd):
-                    return True
-                if win32gui.GetParent(hwnd) != 0:
-                    return True
-
-                _, hwnd_pid = win32process.GetWindowThreadProcessId(hwnd)
-                if hwnd_pid != pid:
-                    return True
-
-                title = win32gui.GetWindowText(hwnd)
-                if not title:
-                    return True
-
-                rect = win32gui.GetWindowRect(hwnd)
-                if not best:
-                    best = rect
-                    return True
-
-                # Берем самое левое окно процесса; если X равен — самое верхнее.
-                if rect[0] < best[0] or (rect[0] == best[0] and rect[1] < best[1]):
-                    best = rect
-            except Exception:
-                pass
-            return True
-
-        try:
-            win32gui.EnumWindows(enum_cb, None)
-        except Exception:
-            return None
+        # Берем самое левое окно процесса; если X равен — самое верхнее.
+        for info in self._windowManager.get_windows_by_pid(pid):
+            if not info.title:
+                continue
+            if best is None or (info.rect[0], info.rect[1]) < (best[0], best[1]):
+                best = info.rect
 
         return best
 
@@ -456,6 +450,8 @@ class LobbyManager:
     @staticmethod
     def _is_cancelled():
         try:
+            import keyboard
+
             return keyboard.is_pressed("ctrl+q")
         except Exception:
             return False
@@ -476,37 +472,37 @@ class LobbyManager:
 
             time.sleep(max(0.0, min(step, remaining)))
 
-    def _grab_avg_color_2x2(self, x, y, rect, image_grab):
-        left = rect[0] + x
-        top = rect[1] + y
-        right = left + 2
-        bottom = top + 2
-
-        if right <= left or bottom <= top:
-            return None
-
+    def _sample_button_states(self, probes):
+        """
+        probes: {key: (rect, x, y)}. Один захват экрана на все окна, red/green считаются сразу для всех точек.
+        Повторный вызов в пределах одного тика переиспользует тот же кадр.
+        """
         try:
-            img = image_grab.grab(bbox=(left, top, right, bottom))
+            states, _ = self._get_screen_sampler().sample_states(probes)
+            return states
         except Exception as e:
             if not self._screen_grab_warning_logged:
                 self._logManager.add_log(f"⚠️ Pixel sampling unavailable for some windows: {e}")
                 self._screen_grab_warning_logged = True
-            return None
+            return {key: None for key in probes}
 
-        r_sum = g_sum = b_sum = 0
-        count = 0
-        for px in range(img.size[0]):
-            for py in range(img.size[1]):
-                r, g, b = img.getpixel((px, py))[:3]
-                r_sum += r
-                g_sum += g
-                b_sum += b
-                count += 1
-
-        if count == 0:
-            return None
-
-        return (r_sum // count, g_sum // count, b_sum // count)
+    def _click_rel(self, x, y, rect, hwnd):
+        if self._is_cancelled():
+            return False
+        self._invalidate_screen()
+        abs_x = rect[0] + x
+        abs_y = rect[1] + y
+        with INPUT_LOCK:
+            self._safe_set_foreground(hwnd)
+            win32api.SetCursorPos((abs_x, abs_y))
+            if self._sleep_with_cancel(0.03):
+                return False
+            win32api.mouse_event(win32con.MOUSEEVENTF_LEFTDOWN, 0, 0, 0, 0)
+            if self._sleep_with_cancel(0.03):
+                win32api.mouse_event(win32con.MOUSEEVENTF_LEFTUP, 0, 0, 0, 0)
+                return False
+            win32api.mouse_event(win32con.MOUSEEVENTF_LEFTUP, 0, 0, 0, 0)
+        return True
 
     @staticmethod
     def _safe_set_foreground(hwnd):
@@ -582,128 +578,104 @@ class LobbyManager:
         except Exception:
             pass
 
-        cs2_pids = []
-        for proc in psutil.process_iter(['pid', 'name']):
-            try:
-                name = (proc.info.get('name') or "").lower()
-                if name == "cs2.exe":
-                    cs2_pids.append(proc.info['pid'])
-            except Exception:
-                continue
+        cs2_pids = ProcessManager().get_pids("cs2.exe")
 
         if not cs2_pids:
             return 0
 
         processed = set()
-        lifted = 0
+        hwnds = []
 
-        def enum_cb(hwnd, _):
-            nonlocal lifted
-            try:
-                if not win32gui.IsWindowVisible(hwnd):
-                    return True
-                if win32gui.GetParent(hwnd) != 0:
-                    return True
+        for info in self._windowManager.get_windows():
+            if not info.is_top_level:
+                continue
+            if info.pid not in cs2_pids or info.pid in processed:
+                continue
+            if not info.title:
+                continue
 
-                _, pid = win32process.GetWindowThreadProcessId(hwnd)
-                if pid not in cs2_pids or pid in processed:
-                    return True
+            processed.add(info.pid)
+            hwnds.append(info.hwnd)
 
-                title = win32gui.GetWindowText(hwnd)
-                if not title:
-                    return True
+        if not hwnds:
+            return 0
 
-                processed.add(pid)
-                self._safe_set_foreground(hwnd)
-                lifted += 1
-                time.sleep(0.05)
+        # Z-order всех окон — одной транзакцией, фокус — только первому
+        with INPUT_LOCK:
+            try:
+                lifted = self._get_layout_applier().raise_windows(hwnds)
             except Exception:
-                pass
-            return True
+                lifted = 0
+                for hwnd in hwnds:
+                    if self._safe_set_foreground(hwnd):
+                        lifted += 1
+                return lifted
 
-        win32gui.EnumWindows(enum_cb, None)
+            self._safe_set_foreground(hwnds[0])
         return lifted
 
+    def lift_account_window(self, account):
+        """Поднять и сфокусировать только окно CS2 этого аккаунта (остальные окна не трогаем)."""
+        try:
+            hwnd = self._resolve_account_cs2_hwnd(account)
+        except Exception:
+            hwnd = 0
+        if not hwnd:
+            return False
+        with INPUT_LOCK:
+            try:
+                self._get_layout_applier().raise_windows([hwnd])
+            except Exception:
+                pass
+            return self._safe_set_foreground(hwnd)
+
     def press_esc_all_cs2_windows(self):
         """Нажимает ESC два раза в КАЖДОМ найденном окне cs2.exe перед запуском лобби-потока."""
-        cs2_pids = [
-            p.info['pid'] for p in psutil.process_iter(['pid', 'name'])
-            if (p.info.get('name') or "").lower() == "cs2.exe"
-        ]
+        cs2_pids = ProcessManager().get_pids("cs2.exe")
         if not cs2_pids:
             return 0
 
+        return self._press_esc_windows(info.hwnd for info in self._windowManager.get_windows() if info.pid in cs2_pids)
+
+    def _press_esc_windows(self, hwnds):
         seen = set()
         count = 0
 
-        def enum_cb(hwnd, _):
-            nonlocal count
+        for hwnd in hwnds:
             if self._is_cancelled():
-                return False
+                break
             try:
-                _, pid = win32process.GetWindowThreadProcessId(hwnd)
-                if pid not in cs2_pids:
-                    return True
-                if not win32gui.IsWindowVisible(hwnd):
-                    return True
-                if hwnd in seen:
-                    return True
+                if not hwnd or hwnd in seen:
+                    continue
 
                 seen.add(hwnd)
                 self._safe_set_foreground(hwnd)
                 if self._sleep_with_cancel(0.1):
-                    return False
+                    break
 
+                cancelled = False
                 for _ in range(2):
                     win32api.PostMessage(hwnd, win32con.WM_KEYDOWN, win32con.VK_ESCAPE, 0)
                     if self._sleep_with_cancel(0.05):
-                        return False
+                        cancelled = True
+                        break
                     win32api.PostMessage(hwnd, win32con.WM_KEYUP, win32con.VK_ESCAPE, 0)
                     if self._sleep_with_cancel(0.1):
-                        return False
+                        cancelled = True
+                        break
+                if cancelled:
+                    break
 
                 count += 1
             except Exception:
                 pass
-            return True
 
-        win32gui.EnumWindows(enum_cb, None)
         return count
 
-    def _press_red_buttons_everywhere(self, final_click_pos, enforce_green=False, max_wait=12.0, leaders_only=False):
-        from PIL import ImageGrab
-
-        def get_avg_color_2x2(x, y, rect):
-            return self._grab_avg_color_2x2(x, y, rect, ImageGrab)
-
-        def button_state(x, y, rect):
-            avg = get_avg_color_2x2(x, y, rect)
-            if avg is None:
-                return None
-            r, g, b = avg
-            if r > g + 20 and r > b + 20:
-                return "red"
-            if g > r + 20 and g > b + 20:
-                return "green"
-            return "red"
-
-        def click_rel(x, y, rect, hwnd):
-            if self._is_cancelled():
-                return False
-            self._safe_set_foreground(hwnd)
-            abs_x = rect[0] + x
-            abs_y = rect[1] + y
-            win32api.SetCursorPos((abs_x, abs_y))
-            if self._sleep_with_cancel(0.03):
-                return False
-            win32api.mouse_event(win32con.MOUSEEVENTF_LEFTDOWN, 0, 0, 0, 0)
-            if self._sleep_with_cancel(0.03):
-                return False
-            win32api.mouse_event(win32con.MOUSEEVENTF_LEFTUP, 0, 0, 0, 0)
-            return True
-
-        members = []
-        if leaders_only:
+    def _press_red_buttons_everywhere(self, final_click_pos, enforce_green=False, max_wait=12.0, leaders_only=False,
+                                      members=None):
+        members = list(members or [])
+        if not members and leaders_only:
             if self.team1 and getattr(self.team1, 'leader', None):
                 members.append(self.team1.leader)
             if self.team2 and getattr(self.team2, 'leader', None):
@@ -713,7 +685,7 @@ class LobbyManager:
                 ordered = self._get_accounts_sorted_by_window_position()
                 if len(ordered) >= 3:
                     members = [ordered[0], ordered[2]]
-        else:
+        elif not members:
             if self.team1:
                 members.extend([self.team1.leader] + self.team1.bots)
             if self.team2:
@@ -732,6 +704,7 @@ class LobbyManager:
             any_red = False
             all_green = True
 
+            windows = []
             for acc in members:
                 hwnd = self._resolve_account_cs2_hwnd(acc)
                 if not hwnd:
@@ -740,8 +713,14 @@ class LobbyManager:
                     rect = win32gui.GetWindowRect(hwnd)
                 except Exception:
                     continue
+                windows.append((hwnd, rect))
 
-                state = button_state(final_click_pos[0], final_click_pos[1], rect)
+            states = self._sample_button_states({
+                hwnd: (rect, final_click_pos[0], final_click_pos[1]) for hwnd, rect in windows
+            })
+
+            for hwnd, rect in windows:
+                state = states.get(hwnd)
                 if state is None:
                     all_green = False
                     if not warned_unknown:
@@ -752,7 +731,7 @@ class LobbyManager:
                 if state == "red":
                     any_red = True
                     all_green = False
-                    if not click_rel(final_click_pos[0], final_click_pos[1], rect, hwnd):
+                    if not self._click_rel(final_click_pos[0], final_click_pos[1], rect, hwnd):
                         return False
                     if self._sleep_with_cancel(0.1):
                         return False
@@ -800,9 +779,14 @@ class LobbyManager:
     # -----------------------------
     def MakeLobbiesAndSearchGame(self):
 
-        from PIL import ImageGrab
         from Modules.AutoAcceptModule import AutoAcceptModule
 
+        # 8+ окон — независимые четвёрки параллельно
+        group_count = self._resolve_group_count()
+        if group_count >= 2:
+            return self.MakeMultiLobbiesAndSearchGame(group_count)
+        self.groups = []
+
         AutoAcceptModule.reset_final_clicks_state()
 
         # Жёсткая подготовка 4 окон по ТЗ: 40с -> move all -> align -> strict check -> 10с
@@ -812,25 +796,10 @@ class LobbyManager:
         if self._is_cancelled():
             return False
 
-        FINAL_CLICK = (289, 271)
-        OPEN_SEQ = [(206, 8), (154, 23), (142, 33)]
+        FINAL_CLICK = self.FINAL_CLICK
+        OPEN_SEQ = self.OPEN_SEQ
         max_cycles = 3
 
-        def click_rel(x, y, rect, hwnd):
-            if self._is_cancelled():
-                return False
-            self._safe_set_foreground(hwnd)
-            abs_x = rect[0] + x
-            abs_y = rect[1] + y
-            win32api.SetCursorPos((abs_x, abs_y))
-            if self._sleep_with_cancel(0.03):
-                return False
-            win32api.mouse_event(win32con.MOUSEEVENTF_LEFTDOWN, 0, 0, 0, 0)
-            if self._sleep_with_cancel(0.03):
-                return False
-            win32api.mouse_event(win32con.MOUSEEVENTF_LEFTUP, 0, 0, 0, 0)
-            return True
-
         def get_team_info(team):
             if not team or not team.leader:
                 return None
@@ -843,21 +812,14 @@ class LobbyManager:
                 return None
             return {"hwnd": hwnd, "rect": rect}
 
-        def get_button_state(info):
-            if not info:
-                return None
-            avg = self._grab_avg_color_2x2(FINAL_CLICK[0], FINAL_CLICK[1], info["rect"], ImageGrab)
-            if avg is None:
-                return None
-            r, g, b = avg
-            if r > g + 20 and r > b + 20:
-                return "red"
-            if g > r + 20 and g > b + 20:
-                return "green"
-            return "red"
+        def get_button_states(*infos):
+            # Оба лидера из одного кадра
+            probes = {i: (info["rect"], FINAL_CLICK[0], FINAL_CLICK[1]) for i, info in enumerate(infos) if info}
+            states = self._sample_button_states(probes)
+            return tuple(states.get(i) for i in range(len(infos)))
 
         def click_final(info):
-            return click_rel(FINAL_CLICK[0], FINAL_CLICK[1], info["rect"], info["hwnd"])
+            return self._click_rel(FINAL_CLICK[0], FINAL_CLICK[1], info["rect"], info["hwnd"])
 
         def rebuild_strict_slots_or_fail():
             top4_accounts = self._get_strict_4_accounts_by_window_order()
@@ -924,7 +886,7 @@ class LobbyManager:
                     return False
 
                 for x, y in OPEN_SEQ:
-                    if not click_rel(x, y, info["rect"], info["hwnd"]):
+                    if not self._click_rel(x, y, info["rect"], info["hwnd"]):
                         return False
                     if self._sleep_with_cancel(0.25):
                         return False
@@ -938,8 +900,7 @@ class LobbyManager:
                 self._logManager.add_log("❌ Не удалось получить окна лидеров перед финальными кликами")
                 return False
 
-            s1_start = get_button_state(info1)
-            s2_start = get_button_state(info2)
+            s1_start, s2_start = get_button_states(info1, info2)
 
             # Старт: жмём только зелёные кнопки.
             if s1_start == "green":
@@ -966,8 +927,7 @@ class LobbyManager:
                     timed_out = False
                     break
 
-                s1 = get_button_state(info1)
-                s2 = get_button_state(info2)
+                s1, s2 = get_button_states(info1, info2)
 
                 if s1 is None or s2 is None:
                     if self._sleep_with_cancel(0.25):
@@ -984,8 +944,7 @@ class LobbyManager:
                     info1_new = get_team_info(self.team1)
                     info2_new = get_team_info(self.team2)
                     if info1_new and info2_new:
-                        s1_new = get_button_state(info1_new)
-                        s2_new = get_button_state(info2_new)
+                        s1_new, s2_new = get_button_states(info1_new, info2_new)
                         if s1_new == "green" and s2_new == "green":
                             if not click_final(info1_new):
                                 return False
@@ -1002,8 +961,7 @@ class LobbyManager:
                     info1_new = get_team_info(self.team1)
                     info2_new = get_team_info(self.team2)
                     if info1_new and info2_new:
-                        s1_new = get_button_state(info1_new)
-                        s2_new = get_button_state(info2_new)
+                        s1_new, s2_new = get_button_states(info1_new, info2_new)
                         if s1_new == "green" and s2_new == "green":
                             if not click_final(info1_new):
                                 return False
@@ -1030,4 +988,296 @@ class LobbyManager:
                 return False
 
         self._logManager.add_log("❌ Match was not found after 3 recovery cycles")
-        return False
\ No newline at end of file
+        return False
+
+    # -----------------------------
+    # Multi-lobby: K независимых четвёрок
+    # -----------------------------
+    def _resolve_group_count(self):
+        """LobbyGroupCount из настроек (0 — столько четвёрок, сколько есть запущенных окон)."""
+        available = sum(1 for acc in self._accountManager.accounts if acc.isCSValid()) // 4
+        # Окна групп не кладём друг на друга: групп не больше, чем четвёрок ячеек на всех мониторах
+        fits = grid_cell_count(get_work_areas()) // 4
+        if available > fits:
+            self._logManager.add_log(
+                f"⚠️ На мониторах помещается {fits} групп по 4 окна из {available} — остальные не запускаем"
+            )
+            available = fits
+        try:
+            requested = int(self._settingManager.get("LobbyGroupCount", 0) or 0)
+        except (TypeError, ValueError):
+            requested = 0
+        return min(available, requested) if requested > 0 else available
+
+    def _build_groups(self, group_count):
+        ordered = self._get_accounts_sorted_by_window_position()
+        group_count = min(group_count, len(ordered) // 4)
+        groups = [LobbyGroupInstance(i, ordered[i * 4:i * 4 + 4]) for i in range(group_count)]
+        self.groups = groups
+        if groups:
+            # Совместимость со старым кодом, который смотрит на team1/team2
+            self.team1 = groups[0].team1
+            self.team2 = groups[0].team2
+            self._last_window_order_logins = [login for group in groups for login in group.logins]
+        return groups
+
+    def _move_group_windows(self, group):
+        """Четвёрка группы — в ячейки 4*index..4*index+3 общей сетки (слоты 1..4 по порядку)."""
+        total = max(len(self.groups), group.index + 1) * 4
+        placed = self._apply_grid_layout(group.accounts, first_cell=group.index * 4, total=total)
+        return placed == len(group.accounts)
+
+    def _move_all_groups(self, groups):
+        members = [acc for group in groups for acc in group.accounts]
+        return self._apply_grid_layout(members) == len(members)
+
+    def _group_window_infos(self, group):
+        infos = []
+        for member in group.accounts:
+            hwnd = self._resolve_account_cs2_hwnd(member)
+            if not hwnd or not win32gui.IsWindow(hwnd):
+                return None
+            try:
+                rect = win32gui.GetWindowRect(hwnd)
+            except Exception:
+                return None
+            infos.append({"hwnd": hwnd, "rect": rect, "login": member.login})
+        return infos
+
+    def _group_has_strict_layout(self, group):
+        """Как _has_strict_pair_windows, но для одной группы: 4 разных окна в порядке слотов 1..4."""
+        infos = self._group_window_infos(group)
+        if not infos or len({info["hwnd"] for info in infos}) != len(infos):
+            return False
+        work_areas = get_work_areas()
+        actual = [info["login"] for info in sorted(infos, key=lambda info: layout_sort_key(info["rect"], work_areas))]
+        return actual == group.logins
+
+    def _group_leader_infos(self, group):
+        infos = self._group_window_infos(group)
+        if not infos:
+            return None
+        # slot1 и slot3 — лидеры
+        return infos[0], infos[2]
+
+    def _group_leader_states(self, leader_infos):
+        probes = {i: (info["rect"], self.FINAL_CLICK[0], self.FINAL_CLICK[1]) for i, info in enumerate(leader_infos)}
+        states = self._sample_button_states(probes)
+        return states.get(0), states.get(1)
+
+    def _group_click_final(self, info):
+        return self._click_rel(self.FINAL_CLICK[0], self.FINAL_CLICK[1], info["rect"], info["hwnd"])
+
+    def _group_apply_button_states(self, group):
+        """Одна итерация правил старта поиска (под ходом группы). None — окна потеряны, False — отмена."""
+        leader_infos = self._group_leader_infos(group)
+        if not leader_infos:
+            return None
+        info1, info2 = leader_infos
+        s1, s2 = self._group_leader_states(leader_infos)
+        if s1 is None or s2 is None:
+            return True
+
+        if s1 == "green" and s2 == "green":
+            return self._group_click_final(info1) and self._group_click_final(info2)
+
+        if s1 == "red" and s2 == "red":
+            # Если обе красные — ничего не делаем по ТЗ.
+            return True
+
+        # Одна красная — жмём её и, если обе стали зелёными, запускаем поиск
+        if not self._group_click_final(info1 if s1 == "red" else info2):
+            return False
+        if self._sleep_with_cancel(0.15):
+            return False
+        leader_infos = self._group_leader_infos(group)
+        if leader_infos:
+            s1_new, s2_new = self._group_leader_states(leader_infos)
+            if s1_new == "green" and s2_new == "green":
+                return self._group_click_final(leader_infos[0]) and self._group_click_final(leader_infos[1])
+        return True
+
+    def _group_fail(self, group, message, state=LobbyGroupInstance.FAILED):
+        group.state = state
+        group.last_error = message
+        if message:
+            self._logManager.add_log(f"❌ [Группа {group.index + 1}] {message}")
+        return False
+
+    def _run_group_search(self, group, max_cycles=3, search_timeout=SEARCH_TIMEOUT):
+        from Modules.AutoAcceptModule import AutoAcceptModule
+
+        def matched():
+            return AutoAcceptModule.match_found_for(group.logins)
+
+        AutoAcceptModule.reset_final_clicks_state(group.logins)
+        cancelled = LobbyGroupInstance.CANCELLED
+
+        for cycle in range(1, max_cycles + 1):
+            group.cycle = cycle
+            if matched():
+                group.state = LobbyGroupInstance.MATCHED
+                return True
+
+            group.state = LobbyGroupInstance.COLLECTING
+            self._logManager.add_log(f"🚀 [Группа {group.index + 1}] lobby & search cycle {cycle}/{max_cycles}")
+
+            with self._scheduler.turn(group):
+                infos = self._group_window_infos(group)
+                if not infos:
+                    return self._group_fail(group, "окна группы потеряны")
+                self._press_esc_windows(info["hwnd"] for info in infos)
+                if self._is_cancelled():
+                    return self._group_fail(group, None, cancelled)
+
+                if not self._group_has_strict_layout(group) and not self._move_group_windows(group):
+                    return self._group_fail(group, "не удалось выставить окна 1/2/3/4")
+                if group.team1.Collect() is False or group.team2.Collect() is False:
+                    return self._group_fail(group, "сбор лобби не удался")
+                if not self._move_group_windows(group):
+                    return self._group_fail(group, "MoveWindows failed before start clicks")
+
+            if matched():
+                group.state = LobbyGroupInstance.MATCHED
+                return True
+            if self._sleep_with_cancel(1.5):
+                return self._group_fail(group, None, cancelled)
+
+            with self._scheduler.turn(group):
+                if not self._group_has_strict_layout(group):
+                    return self._group_fail(group, "окна 1/2/3/4 потеряли строгий порядок")
+                # Открывающие клики только по лидерам (слоты 1 и 3)
+                for info in self._group_leader_infos(group) or ():
+                    if matched():
+                        break
+                    self._safe_set_foreground(info["hwnd"])
+                    if self._sleep_with_cancel(0.25):
+                        return self._group_fail(group, None, cancelled)
+                    for x, y in self.OPEN_SEQ:
+                        if not self._click_rel(x, y, info["rect"], info["hwnd"]):
+                            return self._group_fail(group, None, cancelled)
+                        if self._sleep_with_cancel(0.25):
+                            return self._group_fail(group, None, cancelled)
+
+            if self._sleep_with_cancel(0.6):
+                return self._group_fail(group, None, cancelled)
+
+            group.state = LobbyGroupInstance.SEARCHING
+            # Старт: жмём только зелёные кнопки.
+            with self._scheduler.turn(group):
+                leader_infos = self._group_leader_infos(group)
+                if not leader_infos:
+                    return self._group_fail(group, "не удалось получить окна лидеров перед финальными кликами")
+                for info, state in zip(leader_infos, self._group_leader_states(leader_infos)):
+                    if state == "green" and not self._group_click_final(info):
+                        return self._group_fail(group, None, cancelled)
+
+            timed_out = True
+            start_time = time.time()
+            while time.time() - start_time < search_timeout:
+                if self._is_cancelled():
+                    return self._group_fail(group, None, cancelled)
+                if matched():
+                    timed_out = False
+                    break
+
+                # Снимок без очереди; очередь — только если нужно кликать
+                leader_infos = self._group_leader_infos(group)
+                if not leader_infos:
+                    self._logManager.add_log(f"⚠️ [Группа {group.index + 1}] Лидерское окно потеряно во время поиска")
+                    timed_out = False
+                    break
+                s1, s2 = self._group_leader_states(leader_infos)
+                if s1 is None or s2 is None:
+                    if self._sleep_with_cancel(0.25):
+                        return self._group_fail(group, None, cancelled)
+                    continue
+
+                if not (s1 == "red" and s2 == "red"):
+                    with self._scheduler.turn(group):
+                        if self._group_apply_button_states(group) is False:
+                            return self._group_fail(group, None, cancelled)
+
+                if self._sleep_with_cancel(1.0):
+                    return self._group_fail(group, None, cancelled)
+
+            if not timed_out or matched():
+                group.state = LobbyGroupInstance.MATCHED if matched() else LobbyGroupInstance.IDLE
+                return True
+
+            group.state = LobbyGroupInstance.RECOVERING
+            with self._scheduler.turn(group):
+                if not self._recover_group(group, search_timeout):
+                    return self._group_fail(group, "recovery flow failed")
+
+        return self._group_fail(group, f"Match was not found after {max_cycles} recovery cycles")
+
+    def _recover_group(self, group, search_timeout=SEARCH_TIMEOUT):
+        """Как _recover_after_match_timeout, но только для своей четвёрки."""
+        self._logManager.add_log(
+            f"⏱ [Группа {group.index + 1}] {search_timeout:.0f}s timeout without accepted match. Recovery."
+        )
+
+        if not self._press_red_buttons_everywhere(self.FINAL_CLICK, enforce_green=True, max_wait=20.0,
+                                                  members=group.leaders):
+            return False
+
+        infos = self._group_window_infos(group) or []
+        self._press_esc_windows(info["hwnd"] for info in infos)
+        if self._is_cancelled():
+            return False
+
+        # Disband строго по bot1/bot2 группы
+        if group.team1.Disband() is False or group.team2.Disband() is False:
+            self._logManager.add_log(f"⚠️ [Группа {group.index + 1}] Disband failed")
+        if self._is_cancelled():
+            return False
+
+        accounts = list(group.accounts)
+        random.shuffle(accounts)
+        group.set_accounts(accounts)
+        if not self._move_group_windows(group):
+            self._logManager.add_log(f"⚠️ [Группа {group.index + 1}] Shuffle failed")
+            return False
+        return not self._is_cancelled()
+
+    def MakeMultiLobbiesAndSearchGame(self, group_count=None):
+        """K независимых четвёрок: у каждой своё лобби, свой цикл поиска и recovery; UI-действия — по очереди."""
+        from Modules.AutoAcceptModule import AutoAcceptModule
+
+        if group_count is None:
+            group_count = self._resolve_group_count()
+        AutoAcceptModule.reset_final_clicks_state()
+
+        moved_count = self.lift_all_cs2_windows()
+        self._logManager.add_log(f"🪟 Move all CS windows request done: lifted {moved_count} windows")
+
+        groups = self._build_groups(group_count)
+        if not groups:
+            self._logManager.add_log("❌ Нужно минимум 4 валидных CS2 окна для сборки лобби")
+            return False
+
+        if not self._move_all_groups(groups):
+            self._logManager.add_log("❌ MoveWindows failed for multi-lobby groups")
+            return False
+
+        self._logManager.add_log(f"🚀 Multi-lobby: {len(groups)} групп по 4 окна")
+
+        results = {}
+
+        def worker(group):
+            try:
+                results[group.index] = self._run_group_search(group)
+            except Exception as e:
+                results[group.index] = self._group_fail(group, f"ошибка: {e}")
+
+        threads = [threading.Thread(target=worker, args=(group,), daemon=True) for group in groups]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        summary = ", ".join(f"#{g.index + 1}: {g.state}" for g in groups)
+        self._logManager.add_log(f"📊 Multi-lobby завершён — {summary}")
+        return all(results.get(group.index) for group in groups)
+
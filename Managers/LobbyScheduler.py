@@ -0,0 +1,64 @@
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+from Helpers.InputLock import INPUT_LOCK
+
+
+class LobbyScheduler:
+    """
+    Очередь на «руки» (фокус, мышь, клавиатура) между группами лобби.
+    Группа держит ход только на время UI-действий; ожидание поиска идёт без блокировки,
+    поэтому действия K групп чередуются в порядке очереди (FIFO, без голодания).
+    Ход держит и общий INPUT_LOCK: ввод GSI и auto accept не вклиниваются в UI-действия группы.
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._queue = deque()
+        self._owner = None
+        self._depth = 0
+
+        self.turns = {}
+        self.wait_seconds = {}
+
+    @contextmanager
+    def turn(self, group):
+        key = getattr(group, "index", group)
+        with self._cond:
+            if self._owner == key:
+                # Повторный вход той же группы (вложенные UI-хелперы)
+                self._depth += 1
+                reentrant = True
+            else:
+                reentrant = False
+                ticket = object()
+                self._queue.append(ticket)
+                started = time.perf_counter()
+                while self._queue[0] is not ticket or self._owner is not None:
+                    self._cond.wait()
+                self._owner = key
+                self._depth = 1
+                self.turns[key] = self.turns.get(key, 0) + 1
+                self.wait_seconds[key] = self.wait_seconds.get(key, 0.0) + time.perf_counter() - started
+        if not reentrant:
+            INPUT_LOCK.acquire()
+        try:
+            yield
+        finally:
+            if not reentrant:
+                INPUT_LOCK.release()
+            with self._cond:
+                self._depth -= 1
+                if not reentrant and self._depth == 0:
+                    self._owner = None
+                    self._queue.popleft()
+                    self._cond.notify_all()
+
+    def stats(self):
+        with self._cond:
+            return {
+                key: {"turns": count, "wait_s": self.wait_seconds.get(key, 0.0)}
+                for key, count in self.turns.items()
+            }
@@ -0,0 +1,251 @@
+import random
+import re
+import sys
+import threading
+import time
+
+
+class LogEvent:
+    """Типизированное событие из консольного лога CS2."""
+
+    __slots__ = ("name", "login", "value", "line", "ts")
+
+    def __init__(self, name, login, value, line, ts):
+        self.name = name
+        self.login = login
+        self.value = value
+        self.line = line
+        self.ts = ts
+
+    def __repr__(self):
+        return f"LogEvent({self.name!r}, {self.login!r}, {self.value!r})"
+
+
+class LogEventManager:
+    """
+    Реестр шаблонов консольного лога. Все шаблоны собираются в одну регулярку
+    с именованными группами, строка разбирается один раз, подписчики получают только свои события.
+    Внутри шаблона полезное значение помечается группой (?P<value>...).
+    literals — подстроки, без которых шаблон не сработает: строки без них отсекаются
+    проверкой `in`, не доходя до регулярки (а таких строк в логе подавляющее большинство).
+    """
+
+    _instance = None
+
+    DEFAULT_PATTERNS = (
+        ("match_id", r"match_id=(?P<value>\d+)", ("match_id=",)),
+        ("scratch_rt", r"Scratch RT Allocations:", ("Scratch RT Allocations:",)),
+        ("map_loaded", r"Host activate: Loading \((?P<value>[^)]+)\)", ("Host activate: Loading",)),
+        ("disconnect", r"Disconnecting from server|(?P<value>NETWORK_DISCONNECT_[A-Z_]+)",
+         ("Disconnecting from server", "NETWORK_DISCONNECT_")),
+    )
+
+    def __new__(cls, *args, **kwargs):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+            cls._instance._initialized = False
+        return cls._instance
+
+    def __init__(self, patterns=None):
+        if self._initialized:
+            return
+
+        self._lock = threading.Lock()
+        self._patterns = {}
+        self._combined = None
+        self._group_names = {}
+        self._literals = {}
+        self._prefilter = None
+        # event -> [callback]; (event, login) -> [callback]
+        self._subscribers = {}
+        self._login_subscribers = {}
+
+        self.lines = 0
+        self.events = 0
+        self.event_counts = {}
+
+        for name, pattern, *literals in (self.DEFAULT_PATTERNS if patterns is None else patterns):
+            self.register_pattern(name, pattern, literals[0] if literals else None)
+        self._initialized = True
+
+    @classmethod
+    def create_isolated(cls, patterns=None):
+        """Отдельный экземпляр мимо синглтона (бенчмарки)."""
+        instance = super().__new__(cls)
+        instance._initialized = False
+        instance.__init__(patterns=patterns)
+        return instance
+
+    # -----------------------------
+    # Patterns
+    # -----------------------------
+    def register_pattern(self, name, pattern, literals=None):
+        if not re.fullmatch(r"[A-Za-z_]\w*", name):
+            raise ValueError(f"Некорректное имя события: {name}")
+        re.compile(pattern)  # ошибка в шаблоне — сразу, а не при следующей сборке
+        with self._lock:
+            self._patterns[name] = pattern
+            self._literals[name] = tuple(literals) if literals else None
+            self._rebuild()
+
+    def unregister_pattern(self, name):
+        with self._lock:
+            if self._patterns.pop(name, None) is not None:
+                self._literals.pop(name, None)
+                self._rebuild()
+
+    def _rebuild(self):
+        parts = []
+        group_names = {}
+        for index, (name, pattern) in enumerate(self._patterns.items()):
+            event_group = f"e{index}"
+            value_group = f"v{index}"
+            parts.append(f"(?P<{event_group}>{pattern.replace('(?P<value>', f'(?P<{value_group}>')})")
+            group_names[event_group] = (name, value_group)
+        self._combined = re.compile("|".join(parts)) if parts else None
+        self._group_names = group_names
+        # Хоть один шаблон без literals — префильтр выключен
+        literal_sets = list(self._literals.values())
+        if literal_sets and all(literal_sets):
+            self._prefilter = tuple(dict.fromkeys(lit for lits in literal_sets for lit in lits))
+        else:
+            self._prefilter = None
+
+    # -----------------------------
+    # Subscriptions
+    # -----------------------------
+    def subscribe(self, event, callback, login=None):
+        """callback(LogEvent). login=None — события всех аккаунтов."""
+        with self._lock:
+            if login is None:
+                bucket = self._subscribers.setdefault(event, [])
+            else:
+                bucket = self._login_subscribers.setdefault((event, login), [])
+            if callback not in bucket:
+                bucket.append(callback)
+
+    def unsubscribe(self, event, callback, login=None):
+        with self._lock:
+            bucket = self._subscribers.get(event) if login is None else self._login_subscribers.get((event, login))
+            if bucket and callback in bucket:
+                bucket.remove(callback)
+
+    # -----------------------------
+    # Parsing
+    # -----------------------------
+    def parse(self, line, login=None):
+        """LogEvent или None. Одна строка — не больше одного события."""
+        combined = self._combined
+        if combined is None:
+            return None
+        prefilter = self._prefilter
+        if prefilter is not None:
+            for literal in prefilter:
+                if literal in line:
+                    break
+            else:
+                return None
+        match = combined.search(line)
+        if match is None:
+            return None
+        name, value_group = self._group_names[match.lastgroup]
+        value = match.groupdict().get(value_group)
+        return LogEvent(name, login, value, line, time.time())
+
+    def dispatch(self, login, line):
+        self.lines += 1
+        event = self.parse(line, login)
+        if event is None:
+            return None
+
+        self.events += 1
+        self.event_counts[event.name] = self.event_counts.get(event.name, 0) + 1
+        callbacks = self._subscribers.get(event.name, []) + self._login_subscribers.get((event.name, login), [])
+        for callback in tuple(callbacks):
+            try:
+                callback(event)
+            except Exception as e:
+                print(f"⚠️ LogEvent: подписчик {event.name} упал ({login}): {e}")
+        return event
+
+    def stats(self):
+        return {
+            "patterns": len(self._patterns),
+            "lines": self.lines,
+            "events": self.events,
+            "by_event": dict(self.event_counts),
+        }
+
+
+def _synthetic_log(megabytes, seed=0):
+    rnd = random.Random(seed)
+    noise = [
+        "[Client] CNetworkGameClient::ProcessServerInfo",
+        "[SteamNetSockets] Ping measurement completed",
+        "[Panorama] Loaded layout file panorama/layout/mainmenu.xml",
+        "[RenderSystem] Material system flushed, 1243 textures resident",
+        "[SoundSystem] Voice stream buffered 512 samples",
+        "[Networking] Received 0 bytes from relay",
+    ]
+    signals = [
+        "[Client] Matchmaking update: match_id={}",
+        "[RenderSystem] Scratch RT Allocations: 4 (24MB)",
+        "[HostStateManager] Host activate: Loading (de_mirage)",
+        "[Client] Disconnecting from server: NETWORK_DISCONNECT_DISCONNECT_BY_USER",
+    ]
+    lines = []
+    size = 0
+    limit = megabytes * 1024 * 1024
+    while size < limit:
+        if rnd.random() < 0.02:
+            line = rnd.choice(signals).format(rnd.randint(10 ** 17, 10 ** 18))
+        else:
+            line = f"{rnd.randint(0, 99):02d}/{rnd.randint(1, 28):02d} {rnd.randint(0, 23):02d}:00:00 {rnd.choice(noise)}"
+        lines.append(line)
+        size += len(line) + 1
+    return lines
+
+
+def benchmark(path=None, megabytes=8):
+    """
+    Старый разбор (подстрока + re.search на каждую строку) против общей регулярки.
+    Запуск: python -m Managers.LogEventManager [путь к записанному console.log]
+    """
+    if path:
+        with open(path, "r", encoding="utf-8", errors="ignore") as f:
+            lines = [line.rstrip("\r\n") for line in f]
+    else:
+        lines = _synthetic_log(megabytes)
+    total_bytes = sum(len(line) + 1 for line in lines)
+
+    legacy_hits = 0
+    started = time.perf_counter()
+    for line in lines:
+        if "Scratch RT Allocations:" in line:
+            legacy_hits += 1
+            continue
+        if re.search(r"match_id=(\d+)", line):
+            legacy_hits += 1
+    legacy_seconds = time.perf_counter() - started
+
+    manager = LogEventManager.create_isolated()
+    started = time.perf_counter()
+    for line in lines:
+        manager.dispatch("bench", line)
+    dispatcher_seconds = time.perf_counter() - started
+
+    mb = total_bytes / (1024 * 1024)
+    return {
+        "lines": len(lines),
+        "mb": round(mb, 2),
+        "legacy_patterns": 2,
+        "legacy_mb_s": mb / legacy_seconds if legacy_seconds else 0.0,
+        "legacy_events": legacy_hits,
+        "dispatcher_patterns": len(manager.DEFAULT_PATTERNS),
+        "dispatcher_mb_s": mb / dispatcher_seconds if dispatcher_seconds else 0.0,
+        **manager.stats(),
+    }
+
+
+if __name__ == "__main__":
+    print(benchmark(sys.argv[1] if len(sys.argv) > 1 else None))
@@ -0,0 +1,316 @@
+import os
+import threading
+import time
+from pathlib import Path
+
+from Managers.SettingsManager import SettingsManager
+
+
+class PollingDirectoryWatcher:
+    """Запасной вариант (и Linux): просто спим до следующей проверки размеров файлов."""
+
+    def __init__(self, interval=0.1):
+        self.interval = interval
+
+    def set_directories(self, directories):
+        pass
+
+    def wait(self, timeout):
+        time.sleep(min(timeout, self.interval))
+        return True
+
+    def close(self):
+        pass
+
+
+class Win32DirectoryWatcher:
+    """
+    FindFirstChangeNotification по каталогам логов: поток просыпается сразу при записи.
+    NTFS может откладывать обновление размера у открытого файла, поэтому wait() всё равно
+    ограничен таймаутом, а размеры файлов проверяются после каждого пробуждения.
+    """
+
+    def __init__(self):
+        import win32con
+        import win32event
+        import win32file
+
+        self._win32con = win32con
+        self._win32event = win32event
+        self._win32file = win32file
+        self._handles = {}
+
+    def set_directories(self, directories):
+        win32file = self._win32file
+        wanted = {str(d) for d in directories if os.path.isdir(d)}
+        for directory in list(self._handles):
+            if directory not in wanted:
+                win32file.FindCloseChangeNotification(self._handles.pop(directory))
+        for directory in wanted - set(self._handles):
+            try:
+                self._handles[directory] = win32file.FindFirstChangeNotification(
+                    directory,
+                    False,
+                    self._win32con.FILE_NOTIFY_CHANGE_FILE_NAME
+                    | self._win32con.FILE_NOTIFY_CHANGE_SIZE
+                    | self._win32con.FILE_NOTIFY_CHANGE_LAST_WRITE,
+                )
+            except Exception as e:
+                print(f"⚠️ LogTail: не удалось подписаться на {directory}: {e}")
+
+    def wait(self, timeout):
+        handles = list(self._handles.values())
+        if not handles:
+            time.sleep(timeout)
+            return False
+        result = self._win32event.WaitForMultipleObjects(handles, False, int(timeout * 1000))
+        index = result - self._win32event.WAIT_OBJECT_0
+        if 0 <= index < len(handles):
+            self._win32file.FindNextChangeNotification(handles[index])
+            return True
+        return False
+
+    def close(self):
+        for handle in self._handles.values():
+            try:
+                self._win32file.FindCloseChangeNotification(handle)
+            except Exception:
+                pass
+        self._handles = {}
+
+
+class _TailEntry:
+    __slots__ = ("key", "candidates", "handler", "deadline", "path", "file", "position", "partial")
+
+    def __init__(self, key, candidates, handler, deadline):
+        self.key = key
+        self.candidates = candidates
+        self.handler = handler
+        self.deadline = deadline
+        self.path = None
+        self.file = None
+        self.position = 0
+        self.partial = b""
+
+
+class LogTailManager:
+    """
+    Один поток на все -con_logfile аккаунтов. Путь к логу берётся напрямую из game/csgo
+    (без os.walk по установке), новые байты читаются пачкой, строки раздаются обработчикам.
+    """
+
+    _instance = None
+    MAX_READ_BYTES = 1024 * 1024
+    # Пока хоть один лог открыт — опрос не реже, чем раньше readline-цикл (100 мс):
+    # дописывание в открытый файл NTFS может не сигналить, и match_id иначе опаздывает к авто-accept.
+    # check_interval — только пока логи ещё не появились (создание файла уведомление видит).
+    OPEN_POLL_INTERVAL = 0.1
+
+    def __new__(cls, *args, **kwargs):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+            cls._instance._initialized = False
+        return cls._instance
+
+    def __init__(self, watcher=None, check_interval=0.25, appear_timeout=5 * 60):
+        if self._initialized:
+            return
+
+        self._settingsManager = SettingsManager()
+        self._watcher = watcher
+        self.check_interval = check_interval
+        self.appear_timeout = appear_timeout
+
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._directories_dirty = True
+        self._has_open = False
+
+        self._running = False
+        self._thread = None
+
+        self.lines_dispatched = 0
+        self.bytes_read = 0
+        self.ticks = 0
+        self._initialized = True
+
+    @classmethod
+    def create_isolated(cls, watcher=None, check_interval=0.25, appear_timeout=5 * 60):
+        """Отдельный экземпляр мимо синглтона (проверки на Linux)."""
+        instance = super().__new__(cls)
+        instance._initialized = False
+        instance.__init__(watcher=watcher, check_interval=check_interval, appear_timeout=appear_timeout)
+        return instance
+
+    def _get_watcher(self):
+        if self._watcher is None:
+            try:
+                self._watcher = Win32DirectoryWatcher()
+            except ImportError:
+                self._watcher = PollingDirectoryWatcher()
+        return self._watcher
+
+    # -----------------------------
+    # Paths
+    # -----------------------------
+    def resolve_candidates(self, filename):
+        """-con_logfile пишет в game/csgo; cwd — на случай запуска с другой рабочей папкой."""
+        cs2_path = self._settingsManager.get(
+            "CS2Path",
+            "C:/Program Files (x86)/Steam/steamapps/common/Counter-Strike Global Offensive",
+        )
+        return [
+            Path(cs2_path) / "game" / "csgo" / filename,
+            Path(cs2_path) / filename,
+            Path.cwd() / filename,
+        ]
+
+    # -----------------------------
+    # Subscriptions
+    # -----------------------------
+    def watch(self, key, filename, handler):
+        """Начинает тейлить filename для key (повторный вызов заменяет старую запись)."""
+        entry = _TailEntry(key, self.resolve_candidates(filename), handler, time.time() + self.appear_timeout)
+        with self._lock:
+            old = self._entries.pop(key, None)
+            self._entries[key] = entry
+            self._directories_dirty = True
+        if old is not None:
+            self._close(old)
+        self.start()
+
+    def unwatch(self, key):
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            self._directories_dirty = True
+        if entry is not None:
+            self._close(entry)
+
+    @staticmethod
+    def _close(entry):
+        if entry.file is not None:
+            try:
+                entry.file.close()
+            except Exception:
+                pass
+            entry.file = None
+
+    # -----------------------------
+    # Loop
+    # -----------------------------
+    def start(self):
+        if not self._running:
+            self._running = True
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._running = False
+        if self._thread is not None:
+            self._thread.join(timeout=self.check_interval + 1)
+            self._thread = None
+        with self._lock:
+            entries = list(self._entries.values())
+        for entry in entries:
+            self._close(entry)
+
+    def _run(self):
+        watcher = self._get_watcher()
+        while self._running:
+            try:
+                if self._directories_dirty:
+                    with self._lock:
+                        directories = {c.parent for e in self._entries.values() for c in e.candidates}
+                        self._directories_dirty = False
+                    watcher.set_directories(directories)
+                self.tick()
+            except Exception as e:
+                print(f"❌ LogTail: ошибка тика: {e}")
+            interval = min(self.check_interval, self.OPEN_POLL_INTERVAL) if self._has_open else self.check_interval
+            watcher.wait(interval)
+        watcher.close()
+
+    def tick(self):
+        with self._lock:
+            entries = list(self._entries.values())
+
+        dispatched = 0
+        for entry in entries:
+            if entry.file is None and not self._open(entry):
+                continue
+            dispatched += self._read(entry)
+        self._has_open = any(entry.file is not None for entry in entries)
+        self.ticks += 1
+        return dispatched
+
+    def _open(self, entry):
+        for candidate in entry.candidates:
+            try:
+                f = open(candidate, "rb")
+            except (FileNotFoundError, PermissionError):
+                continue
+            # Как и раньше: старое содержимое лога не разбираем
+            f.seek(0, os.SEEK_END)
+            entry.file = f
+            entry.path = candidate
+            entry.position = f.tell()
+            entry.partial = b""
+            return True
+
+        if time.time() > entry.deadline:
+            print(f"⚠️ LogTail: лог {entry.candidates[0].name} не появился, прекращаем ожидание")
+            with self._lock:
+                if self._entries.get(entry.key) is entry:
+                    del self._entries[entry.key]
+        return False
+
+    def _read(self, entry):
+        try:
+            # Размер берём по открытому дескриптору: у записи в каталоге он на NTFS может отставать
+            size = os.fstat(entry.file.fileno()).st_size
+        except OSError:
+            self._close(entry)
+            return 0
+
+        # CS2 перезаписал лог (перезапуск игры) — читаем файл с начала
+        if size < entry.position:
+            self._close(entry)
+            try:
+                entry.file = open(entry.path, "rb")
+            except OSError:
+                return 0
+            entry.position = 0
+            entry.partial = b""
+            size = os.fstat(entry.file.fileno()).st_size
+
+        if size <= entry.position:
+            return 0
+
+        entry.file.seek(entry.position)
+        chunk = entry.file.read(min(size - entry.position, self.MAX_READ_BYTES))
+        entry.position += len(chunk)
+        self.bytes_read += len(chunk)
+
+        data = entry.partial + chunk
+        lines = data.split(b"\n")
+        entry.partial = lines.pop()
+
+        for raw in lines:
+            line = raw.rstrip(b"\r").decode("utf-8", errors="ignore")
+            try:
+                entry.handler(line)
+            except Exception as e:
+                print(f"⚠️ LogTail: обработчик {entry.key} упал: {e}")
+        self.lines_dispatched += len(lines)
+        return len(lines)
+
+    def stats(self):
+        with self._lock:
+            entries = list(self._entries.values())
+        return {
+            "watched": len(entries),
+            "open": sum(1 for e in entries if e.file is not None),
+            "ticks": self.ticks,
+            "lines": self.lines_dispatched,
+            "bytes": self.bytes_read,
+        }
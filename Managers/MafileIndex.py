@@ -0,0 +1,325 @@
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+MAFILES_DIR = "maFiles"
+
+
+class MafileRecord:
+    """
+    Что панели нужно из одного .mafile для поиска. Секреты в индекс не попадают:
+    read_secrets() читает их из самого mafile, когда они понадобились.
+    """
+    __slots__ = ("file", "path", "mtime_ns", "size", "account_name", "steam_id")
+    # поля, которые сохраняются в mafile_index.json
+    INDEXED = ("mtime_ns", "size", "account_name", "steam_id")
+
+    def __init__(self, file, path, mtime_ns, size, account_name="", steam_id=0):
+        self.file = file
+        self.path = path
+        self.mtime_ns = mtime_ns
+        self.size = size
+        self.account_name = account_name
+        self.steam_id = steam_id
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.INDEXED}
+
+    def read_secrets(self):
+        """(shared_secret, identity_secret) из файла; (None, None), если он не читается."""
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                fields = parse_mafile(json.load(f))
+            return fields["shared_secret"], fields["identity_secret"]
+        except Exception as e:
+            print(f"⚠️ MafileIndex: {self.file} не читается: {e}")
+            return None, None
+
+    def __repr__(self):
+        return f"MafileRecord({self.account_name or '?'}, {self.steam_id}, {self.file})"
+
+
+def parse_mafile(data):
+    """Поля из JSON mafile; разные экспортеры называют их по-разному."""
+    session = data.get("Session") or {}
+    account_name = (
+        data.get("account_name")
+        or data.get("AccountName")
+        or session.get("AccountName")
+        or session.get("account_name")
+        or ""
+    ).strip()
+    shared_secret = data.get("shared_secret") or data.get("SharedSecret") or session.get("SharedSecret")
+    identity_secret = data.get("identity_secret") or data.get("IdentitySecret") or session.get("IdentitySecret")
+    steam_id = session.get("SteamID") or data.get("steamid") or data.get("SteamID") or 0
+    try:
+        steam_id = int(steam_id)
+    except (TypeError, ValueError):
+        steam_id = 0
+    return {
+        "account_name": account_name,
+        "shared_secret": shared_secret,
+        "identity_secret": identity_secret,
+        "steam_id": steam_id,
+    }
+
+
+class MafileIndex:
+    """
+    Индекс папки maFiles: login -> mafile, steamid -> login без чтения файлов.
+    account_name/steam_id хранятся в settings/mafile_index.json с mtime/размером файла;
+    при запуске перечитываются только новые и изменённые файлы (параллельно).
+    Секретов в индексе нет — их читает MafileRecord.read_secrets() из самого mafile.
+    """
+    _instance = None
+
+    # не чаще, чем раз в столько секунд, пересканировать папку из-за промаха поиска
+    RESCAN_INTERVAL = 5.0
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+            cls._instance._initialized = False
+        return cls._instance
+
+    def __init__(self):
+        if self._initialized:
+            return
+        self._init_state(MAFILES_DIR, os.path.join("settings", "mafile_index.json"))
+        self._initialized = True
+
+    @classmethod
+    def create_isolated(cls, directory, index_path, workers=None):
+        """Отдельный экземпляр мимо синглтона (бенчмарк, проверки)."""
+        instance = super().__new__(cls)
+        instance._init_state(directory, index_path, workers)
+        instance._initialized = True
+        return instance
+
+    def _init_state(self, directory, index_path, workers=None):
+        self.directory = directory
+        self.index_path = index_path
+        self.workers = workers or min(8, (os.cpu_count() or 2) * 2)
+        self._lock = threading.Lock()
+        # имя файла -> MafileRecord
+        self._records = {}
+        self._by_login = {}
+        self._by_steamid = {}
+        self._scanned_at = 0.0
+        self._purge_index = False
+
+        self.parsed = 0
+        self.reused = 0
+        self.failed = 0
+        self._load_index()
+        self.refresh()
+
+    # -----------------------------
+    # Index file
+    # -----------------------------
+    def _load_index(self):
+        if not os.path.exists(self.index_path):
+            return
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            for file, fields in (data.get("files") or {}).items():
+                # старый индекс хранил и секреты: берём только нужные поля, файл перепишется без них
+                if any(name not in MafileRecord.INDEXED for name in fields):
+                    self._purge_index = True
+                indexed = {name: fields[name] for name in MafileRecord.INDEXED if name in fields}
+                self._records[file] = MafileRecord(file, os.path.join(self.directory, file), **indexed)
+        except Exception as e:
+            print(f"⚠️ MafileIndex: индекс не читается, соберём заново: {e}")
+            self._records = {}
+
+    def _save_index(self):
+        try:
+            directory = os.path.dirname(self.index_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            data = {"files": {file: record.to_dict() for file, record in self._records.items()}}
+            tmp = self.index_path + ".tmp"
+            # dumps + одна запись: json.dump в файл идёт через медленный кодировщик на Python
+            text = json.dumps(data, ensure_ascii=False)
+            with open(tmp, "w", encoding="utf-8") as f:
+                f.write(text)
+            os.replace(tmp, self.index_path)
+        except Exception as e:
+            print(f"⚠️ MafileIndex: не удалось сохранить индекс: {e}")
+
+    # -----------------------------
+    # Scan
+    # -----------------------------
+    def _parse(self, file, mtime_ns, size):
+        path = os.path.join(self.directory, file)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                fields = parse_mafile(json.load(f))
+            return MafileRecord(file, path, mtime_ns, size, fields["account_name"], fields["steam_id"])
+        except Exception as e:
+            print(f"⚠️ MafileIndex: {file} не читается: {e}")
+            # запоминаем и битый файл: не разбирать его заново, пока он не изменится
+            return MafileRecord(file, path, mtime_ns, size)
+
+    def _parse_many(self, items):
+        return [self._parse(*item) for item in items]
+
+    def refresh(self):
+        """Пересканировать папку: разобрать новые/изменённые файлы, забыть удалённые."""
+        with self._lock:
+            self._scanned_at = time.monotonic()
+            current = {}
+            if os.path.isdir(self.directory):
+                with os.scandir(self.directory) as entries:
+                    for entry in entries:
+                        if entry.name.lower().endswith(".mafile") and entry.is_file():
+                            stat = entry.stat()
+                            current[entry.name] = (stat.st_mtime_ns, stat.st_size)
+
+            records = {}
+            stale = []
+            for file, (mtime_ns, size) in current.items():
+                record = self._records.get(file)
+                if record is not None and record.mtime_ns == mtime_ns and record.size == size:
+                    records[file] = record
+                else:
+                    stale.append((file, mtime_ns, size))
+
+            # пачками, а не по файлу на задачу: накладные расходы пула не съедают выигрыш
+            chunk = max(64, len(stale) // self.workers + 1)
+            if len(stale) > chunk:
+                with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="mafile") as executor:
+                    chunks = executor.map(self._parse_many, [stale[i:i + chunk] for i in range(0, len(stale), chunk)])
+                    parsed = [record for batch in chunks for record in batch]
+            else:
+                parsed = self._parse_many(stale)
+            for record in parsed:
+                records[record.file] = record
+                if not record.account_name:
+                    self.failed += 1
+
+            changed = bool(stale) or len(records) != len(self._records) or self._purge_index
+            self._purge_index = False
+            self.parsed += len(stale)
+            self.reused += len(records) - len(stale)
+            self._records = records
+            self._by_login = {}
+            self._by_steamid = {}
+            for file, record in records.items():
+                if record.account_name:
+                    self._by_login.setdefault(record.account_name.lower(), record)
+                steam_id = record.steam_id or (int(file[:-7]) if file[:-7].isdigit() else 0)
+                if steam_id and record.account_name:
+                    self._by_steamid.setdefault(str(steam_id), record)
+            if changed:
+                self._save_index()
+            return changed
+
+    def _rescan_on_miss(self):
+        # файл могли добавить во время работы панели
+        if time.monotonic() - self._scanned_at >= self.RESCAN_INTERVAL:
+            self.refresh()
+            return True
+        return False
+
+    # -----------------------------
+    # Public
+    # -----------------------------
+    def by_login(self, login):
+        """MafileRecord по account_name (без учёта регистра) или None. Секреты — record.read_secrets()."""
+        key = str(login).lower()
+        record = self._by_login.get(key)
+        if record is None and self._rescan_on_miss():
+            record = self._by_login.get(key)
+        return record
+
+    def by_steamid(self, steamid):
+        key = str(steamid)
+        record = self._by_steamid.get(key)
+        if record is None and self._rescan_on_miss():
+            record = self._by_steamid.get(key)
+        return record
+
+    def login_for_steamid(self, steamid):
+        record = self.by_steamid(steamid)
+        return record.account_name if record is not None else None
+
+    def stats(self):
+        return {
+            "files": len(self._records),
+            "logins": len(self._by_login),
+            "parsed": self.parsed,
+            "reused": self.reused,
+            "failed": self.failed,
+        }
+
+
+# -----------------------------
+# Benchmark
+# -----------------------------
+def benchmark(files=3000):
+    """
+    Папка из files синтетических mafile: прежний последовательный разбор каждого файла,
+    холодный старт индекса (параллельный разбор + запись индекса) и тёплый (только scandir).
+    """
+    import base64
+    import shutil
+    import tempfile
+
+    folder = tempfile.mkdtemp(prefix="mafile_index_")
+    directory = os.path.join(folder, MAFILES_DIR)
+    os.makedirs(directory)
+    for i in range(files):
+        steam_id = 76561198000000000 + i
+        data = {
+            "shared_secret": base64.b64encode(os.urandom(20)).decode("ascii"),
+            "identity_secret": base64.b64encode(os.urandom(20)).decode("ascii"),
+            "account_name": f"bench{i:05d}",
+            # размер как у настоящих mafile: токены, device_id и прочее
+            "revocation_code": "R12345",
+            "uri": "otpauth://totp/Steam:bench?secret=" + "A" * 32,
+            "device_id": "android:" + os.urandom(16).hex(),
+            "Session": {"SteamID": steam_id, "SessionID": os.urandom(12).hex(),
+                        "AccessToken": base64.b64encode(os.urandom(600)).decode("ascii"),
+                        "RefreshToken": base64.b64encode(os.urandom(600)).decode("ascii")},
+        }
+        with open(os.path.join(directory, f"{steam_id}.mafile"), "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2)
+
+    results = {"files": files}
+    try:
+        started = time.perf_counter()
+        legacy = {}
+        for file in os.listdir(directory):
+            with open(os.path.join(directory, file), "r", encoding="utf-8") as f:
+                fields = parse_mafile(json.load(f))
+            legacy[fields["account_name"].lower()] = fields
+        results["legacy_ms"] = round((time.perf_counter() - started) * 1000, 1)
+
+        index_path = os.path.join(folder, "mafile_index.json")
+        for phase in ("cold", "warm"):
+            started = time.perf_counter()
+            index = MafileIndex.create_isolated(directory, index_path)
+            results[f"{phase}_ms"] = round((time.perf_counter() - started) * 1000, 1)
+            results[f"{phase}_stats"] = index.stats()
+
+        started = time.perf_counter()
+        for i in range(files):
+            index.by_login(f"BENCH{i:05d}")
+            index.login_for_steamid(76561198000000000 + i)
+        results["lookup_us"] = round((time.perf_counter() - started) * 1e6 / (2 * files), 2)
+        results["lookups_ok"] = all(
+            index.by_login(login).read_secrets()[0] == fields["shared_secret"] for login, fields in legacy.items()
+        )
+        with open(index_path, "r", encoding="utf-8") as f:
+            results["secrets_in_index"] = "secret" in f.read()
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+    return results
+
+
+if __name__ == "__main__":
+    print(benchmark())
@@ -0,0 +1,218 @@
+import threading
+import time
+
+import psutil
+
+from Managers.SettingsManager import SettingsManager
+
+
+class ProcessInfo:
+    """Снимок одного процесса Steam/CS2. cmdline читается лениво и один раз за жизнь процесса."""
+
+    __slots__ = ("pid", "ppid", "name", "create_time", "process", "_cmdline")
+
+    def __init__(self, pid, ppid, name, create_time, process=None):
+        self.pid = pid
+        self.ppid = ppid
+        self.name = name
+        self.create_time = create_time
+        self.process = process
+        self._cmdline = None
+
+    @property
+    def cmdline(self):
+        if self._cmdline is None:
+            try:
+                self._cmdline = list(self.process.cmdline()) if self.process else []
+            except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+                self._cmdline = []
+        return self._cmdline
+
+
+class ProcessManager:
+    """
+    Общий снимок процессов steam.exe / cs2.exe / steamwebhelper.exe (и прочих steam*/cs2*/csgo*).
+    Один psutil.process_iter на тик вместо отдельного скана у каждого вызывающего.
+    Подписчики получают события "started" / "exited".
+    """
+
+    _instance = None
+    TRACKED_KEYWORDS = ("cs2", "steam", "csgo")
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+            cls._instance._initialized = False
+        return cls._instance
+
+    def __init__(self):
+        if self._initialized:
+            return
+
+        self._settingsManager = SettingsManager()
+        self.interval = float(self._settingsManager.get("ProcessSnapshotInterval", 0.5) or 0.5)
+
+        self._lock = threading.Lock()
+        self._by_pid = {}
+        self._snapshot_ts = 0.0
+        self._subscribers = []
+
+        self._running = False
+        self._thread = None
+
+        self.scan_count = 0
+        self.last_scan_seconds = 0.0
+        self._initialized = True
+
+    # -----------------------------
+    # Lifecycle
+    # -----------------------------
+    def start(self):
+        if self._running:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._running = False
+        if self._thread is not None:
+            self._thread.join(timeout=max(1.0, self.interval * 2))
+            self._thread = None
+
+    def set_interval(self, seconds):
+        self.interval = max(0.05, float(seconds))
+        self._settingsManager.set("ProcessSnapshotInterval", self.interval)
+
+    def _run(self):
+        while self._running:
+            try:
+                self.refresh(force=True)
+            except Exception as e:
+                print(f"❌ ProcessManager: ошибка снимка процессов: {e}")
+            time.sleep(self.interval)
+
+    # -----------------------------
+    # Snapshot
+    # -----------------------------
+    @classmethod
+    def _is_tracked(cls, name):
+        return any(keyword in name for keyword in cls.TRACKED_KEYWORDS)
+
+    def refresh(self, force=False):
+        with self._lock:
+            if not force and time.time() - self._snapshot_ts < self.interval:
+                return
+
+            started_at = time.perf_counter()
+            previous = self._by_pid
+            current = {}
+
+            for proc in psutil.process_iter(['pid', 'name', 'ppid', 'create_time']):
+                try:
+                    name = (proc.info.get('name') or '').lower()
+                    if not self._is_tracked(name):
+                        continue
+                    pid = int(proc.info['pid'])
+                    create_time = proc.info.get('create_time') or 0.0
+                except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess, ValueError, TypeError):
+                    continue
+
+                known = previous.get(pid)
+                if known and known.create_time == create_time and known.name == name:
+                    current[pid] = known
+                else:
+                    current[pid] = ProcessInfo(pid, proc.info.get('ppid') or 0, name, create_time, proc)
+
+            started = [info for pid, info in current.items() if previous.get(pid) is not info]
+            exited = [info for pid, info in previous.items() if current.get(pid) is not info]
+
+            self._by_pid = current
+            self._snapshot_ts = time.time()
+            self.scan_count += 1
+            self.last_scan_seconds = time.perf_counter() - started_at
+            subscribers = list(self._subscribers)
+
+        # Первый снимок не считается «запуском» уже работающих процессов.
+        if self.scan_count == 1:
+            return
+        for info in exited:
+            self._emit(subscribers, "exited", info)
+        for info in started:
+            self._emit(subscribers, "started", info)
+
+    @staticmethod
+    def _emit(subscribers, event, info):
+        for callback in subscribers:
+            try:
+                callback(event, info)
+            except Exception as e:
+                print(f"⚠️ ProcessManager: подписчик упал на {event} PID {info.pid}: {e}")
+
+    def _ensure_fresh(self):
+        # Если фоновый поток жив — доверяем ему, иначе обновляем по требованию.
+        max_age = self.interval * 3 if self._running else self.interval
+        if time.time() - self._snapshot_ts >= max_age:
+            self.refresh()
+
+    def subscribe(self, callback):
+        """callback(event, ProcessInfo), event: "started" | "exited"."""
+        with self._lock:
+            if callback not in self._subscribers:
+                self._subscribers.append(callback)
+
+    def unsubscribe(self, callback):
+        with self._lock:
+            if callback in self._subscribers:
+                self._subscribers.remove(callback)
+
+    # -----------------------------
+    # Queries
+    # -----------------------------
+    def get(self, pid):
+        try:
+            pid = int(pid)
+        except (TypeError, ValueError):
+            return None
+        self._ensure_fresh()
+        return self._by_pid.get(pid)
+
+    def is_alive(self, pid, name=None):
+        info = self.get(pid)
+        if info is None:
+            return False
+        return name is None or info.name == name
+
+    def get_processes(self, name=None):
+        self._ensure_fresh()
+        processes = list(self._by_pid.values())
+        if name is not None:
+            processes = [info for info in processes if info.name == name]
+        return processes
+
+    def get_pids(self, name=None):
+        return {info.pid for info in self.get_processes(name)}
+
+    def get_children(self, pid, name=None, recursive=False):
+        self._ensure_fresh()
+        snapshot = self._by_pid
+        result = []
+        parents = {pid}
+        while parents:
+            children = [info for info in snapshot.values() if info.ppid in parents and info.pid not in parents]
+            children = [info for info in children if info not in result]
+            result.extend(children)
+            if not recursive:
+                break
+            parents = {info.pid for info in children}
+        if name is not None:
+            result = [info for info in result if info.name == name]
+        return result
+
+    def stats(self):
+        return {
+            "scans": self.scan_count,
+            "last_scan_ms": self.last_scan_seconds * 1000,
+            "processes": len(self._by_pid),
+            "subscribers": len(self._subscribers),
+        }
@@ -0,0 +1,284 @@
+import atexit
+import json
+import os
+import threading
+import time
+
+from Managers.SettingsManager import SettingsManager
+
+
+def _pid(value):
+    try:
+        return int(value) if value else None
+    except (TypeError, ValueError):
+        return None
+
+
+class RuntimeEntry:
+    """Запущенный аккаунт: PID Steam и CS2 (строка runtime.json)."""
+    __slots__ = ("login", "steam_pid", "cs2_pid")
+
+    def __init__(self, login, steam_pid=None, cs2_pid=None):
+        self.login = login
+        self.steam_pid = _pid(steam_pid)
+        self.cs2_pid = _pid(cs2_pid)
+
+    def to_dict(self):
+        return {"login": self.login, "SteamPid": self.steam_pid, "CS2Pid": self.cs2_pid}
+
+    def __repr__(self):
+        return f"RuntimeEntry({self.login}, steam {self.steam_pid}, cs2 {self.cs2_pid})"
+
+
+class RuntimeRegistry:
+    """
+    login -> (SteamPid, CS2Pid) в памяти; runtime.json — только копия на диске.
+    Изменения пишутся одним атомарным сохранением через debounce секунд после последнего (и при выходе).
+    Файл перечитывается, только если его изменили снаружи (mtime/размер, проверка не чаще CHECK_INTERVAL);
+    ещё не сохранённые свои изменения при этом накладываются поверх.
+    """
+    _instance = None
+
+    CHECK_INTERVAL = 1.0
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+            cls._instance._initialized = False
+        return cls._instance
+
+    def __init__(self):
+        if self._initialized:
+            return
+        self._init_state("runtime.json", SettingsManager().get("RuntimeSaveDebounce", 0.5))
+        atexit.register(self.flush)
+        self._initialized = True
+
+    @classmethod
+    def create_isolated(cls, file_path, debounce=0.5):
+        """Отдельный экземпляр мимо синглтона (бенчмарк, проверки)."""
+        instance = super().__new__(cls)
+        instance._init_state(file_path, debounce)
+        instance._initialized = True
+        return instance
+
+    def _init_state(self, file_path, debounce):
+        self.file_path = file_path
+        self.debounce = float(debounce)
+        self._lock = threading.RLock()
+        # login -> RuntimeEntry (порядок как в файле); login.lower() -> login
+        self._entries = {}
+        self._logins = {}
+        # ещё не сохранённое: login -> RuntimeEntry или None (удалён)
+        self._pending = {}
+        self._timer = None
+        self._signature = None
+        self._checked_at = 0.0
+
+        self.reads = 0
+        self.writes = 0
+        self._reload_if_changed(force=True)
+
+    # -----------------------------
+    # Disk
+    # -----------------------------
+    def _stat(self):
+        try:
+            stat = os.stat(self.file_path)
+            return stat.st_mtime_ns, stat.st_size
+        except OSError:
+            return None
+
+    def _reload_if_changed(self, force=False):
+        now = time.monotonic()
+        if not force and now - self._checked_at < self.CHECK_INTERVAL:
+            return
+        self._checked_at = now
+        signature = self._stat()
+        if signature == self._signature and not force:
+            return
+
+        entries = {}
+        if signature is not None:
+            try:
+                with open(self.file_path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                for item in data:
+                    if item.get("login"):
+                        entries[item["login"]] = RuntimeEntry(item["login"], item.get("SteamPid"), item.get("CS2Pid"))
+                self.reads += 1
+            except Exception as e:
+                # файл могли застать на середине записи чужим процессом — попробуем на следующей проверке
+                print(f"⚠️ runtime.json не читается: {e}")
+                return
+
+        for login, entry in self._pending.items():
+            entries.pop(login, None)
+            if entry is not None:
+                entries[login] = entry
+        self._entries = entries
+        self._logins = {login.lower(): login for login in entries}
+        self._signature = signature
+
+    def flush(self):
+        """Сохранить несохранённые изменения сейчас (атомарно: tmp + os.replace)."""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if not self._pending:
+                return
+            # чужие изменения файла не затираем
+            self._checked_at = 0.0
+            self._reload_if_changed()
+            data = [entry.to_dict() for entry in self._entries.values()]
+            try:
+                directory = os.path.dirname(self.file_path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                tmp = self.file_path + ".tmp"
+                with open(tmp, "w", encoding="utf-8") as f:
+                    json.dump(data, f, ensure_ascii=False, indent=2)
+                os.replace(tmp, self.file_path)
+            except Exception as e:
+                print(f"❌ Ошибка записи runtime.json: {e}")
+                self._schedule_save()
+                return
+            self._pending.clear()
+            self._signature = self._stat()
+            self.writes += 1
+
+    def _schedule_save(self):
+        if self._timer is not None:
+            self._timer.cancel()
+        self._timer = threading.Timer(self.debounce, self.flush)
+        self._timer.daemon = True
+        self._timer.start()
+
+    # -----------------------------
+    # Public
+    # -----------------------------
+    def get(self, login):
+        """RuntimeEntry аккаунта (логин без учёта регистра) или None."""
+        with self._lock:
+            self._reload_if_changed()
+            key = self._logins.get(str(login).lower())
+            return self._entries.get(key) if key is not None else None
+
+    def entries(self):
+        with self._lock:
+            self._reload_if_changed()
+            return list(self._entries.values())
+
+    def set(self, login, steam_pid, cs2_pid):
+        with self._lock:
+            self._reload_if_changed()
+            old = self._logins.get(login.lower())
+            if old is not None and old != login:
+                self._entries.pop(old, None)
+                self._pending[old] = None
+            entry = RuntimeEntry(login, steam_pid, cs2_pid)
+            self._entries.pop(login, None)
+            self._entries[login] = entry
+            self._logins[login.lower()] = login
+            self._pending[login] = entry
+            self._schedule_save()
+            return entry
+
+    def remove(self, login):
+        with self._lock:
+            self._reload_if_changed()
+            key = self._logins.pop(str(login).lower(), None)
+            if key is None:
+                return False
+            self._entries.pop(key, None)
+            self._pending[key] = None
+            self._schedule_save()
+            return True
+
+    def stats(self):
+        return {"entries": len(self._entries), "pending": len(self._pending), "reads": self.reads, "writes": self.writes}
+
+
+# -----------------------------
+# Benchmark
+# -----------------------------
+def benchmark(accounts=40, lookups=20000, debounce=0.05):
+    """
+    Параллельные запуски (по потоку на аккаунт, каждый пишет свою строку) и частые lookup'ы:
+    сколько раз файл читался и писался, ничего ли не потерялось — против прежнего
+    «прочитать runtime.json, заменить строку, переписать» на каждый запуск и каждый lookup.
+    """
+    import tempfile
+
+    folder = tempfile.mkdtemp(prefix="runtime_registry_")
+    logins = [f"acc{i:03d}" for i in range(accounts)]
+    results = {"accounts": accounts, "lookups": lookups}
+
+    registry = RuntimeRegistry.create_isolated(os.path.join(folder, "runtime.json"), debounce)
+    pool = [threading.Thread(target=registry.set, args=(login, 1000 + i, 2000 + i)) for i, login in enumerate(logins)]
+    started = time.perf_counter()
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    results["registry_set_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    started = time.perf_counter()
+    for i in range(lookups):
+        registry.get(logins[i % accounts])
+    results["registry_lookup_us"] = round((time.perf_counter() - started) * 1e6 / lookups, 2)
+    registry.flush()
+    with open(registry.file_path, "r", encoding="utf-8") as f:
+        results["registry_lost"] = accounts - len(json.load(f))
+    results["registry"] = registry.stats()
+
+    # Внешняя правка файла подхватывается без перезапуска
+    with open(registry.file_path, "w", encoding="utf-8") as f:
+        json.dump([{"login": "external", "SteamPid": 1, "CS2Pid": 2}], f)
+    registry._checked_at = 0.0
+    results["external_reload_ok"] = registry.get("EXTERNAL") is not None and registry.get(logins[0]) is None
+
+    legacy_path = os.path.join(folder, "runtime_legacy.json")
+
+    def legacy_set(login, steam_pid, cs2_pid):
+        data = []
+        if os.path.exists(legacy_path):
+            try:
+                with open(legacy_path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+            except Exception:
+                data = []
+        data = [d for d in data if d.get("login") != login]
+        data.append({"login": login, "SteamPid": steam_pid, "CS2Pid": cs2_pid})
+        with open(legacy_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+
+    def legacy_get(login):
+        with open(legacy_path, "r", encoding="utf-8") as f:
+            return next((item for item in json.load(f) if item.get("login") == login), None)
+
+    pool = [threading.Thread(target=legacy_set, args=(login, 1000 + i, 2000 + i)) for i, login in enumerate(logins)]
+    started = time.perf_counter()
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    results["legacy_set_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    legacy_lookups = lookups // 20
+    started = time.perf_counter()
+    for i in range(legacy_lookups):
+        try:
+            legacy_get(logins[i % accounts])
+        except Exception:
+            pass
+    results["legacy_lookup_us"] = round((time.perf_counter() - started) * 1e6 / legacy_lookups, 2)
+    try:
+        with open(legacy_path, "r", encoding="utf-8") as f:
+            results["legacy_lost"] = accounts - len(json.load(f))
+    except Exception as e:
+        results["legacy_lost"] = f"файл испорчен: {e}"
+    return results
+
+
+if __name__ == "__main__":
+    print(benchmark())
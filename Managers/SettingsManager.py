@@ -1,10 +1,13 @@
 import json
 import os
+import threading
 
 class SettingsManager:
     _instance = None
     _file_path = os.path.join("settings", "settings.json")
     _settings = {}
+    # get/set зовут и UI, и фоновые потоки (GPU при старте, пулы задач)
+    _lock = threading.RLock()
 
     def __new__(cls):
         if cls._instance is None:
@@ -27,27 +30,32 @@ class SettingsManager:
                     self._save()  # Перезапишем пустым словарём, если файл битый
 
     def _save(self):
-        with open(self._file_path, "w", encoding="utf-8") as f:
-            json.dump(self._settings, f, indent=4, ensure_ascii=False)
+        with self._lock:
+            text = json.dumps(self._settings, indent=4, ensure_ascii=False)
+            with open(self._file_path, "w", encoding="utf-8") as f:
+                f.write(text)
 
     def get(self, key, default=None):
         """
         Получение значения настройки.
         Если ключ отсутствует, создаёт его с default и возвращает default.
         """
-        if key not in self._settings:
-            self._settings[key] = default
-            self._save()
-        return self._settings[key]
+        with self._lock:
+            if key not in self._settings:
+                self._settings[key] = default
+                self._save()
+            return self._settings[key]
 
     def set(self, key, value):
-        self._settings[key] = value
-        self._save()
+        with self._lock:
+            self._settings[key] = value
+            self._save()
 
     def delete(self, key):
-        if key in self._settings:
-            del self._settings[key]
-            self._save()
+        with self._lock:
+            if key in self._settings:
+                del self._settings[key]
+                self._save()
 
     def all(self):
         return self._settings.copy()
\ No newline at end of file
@@ -0,0 +1,146 @@
+import asyncio
+import base64
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from Managers.GSIServer import percentile
+from Managers.SettingsManager import SettingsManager
+from Managers.SteamSessionVault import SteamSessionVault
+
+
+class SteamBatchResult:
+    __slots__ = ("login", "ok", "value", "error", "seconds")
+
+    def __init__(self, login, ok, value=None, error=None, seconds=0.0):
+        self.login = login
+        self.ok = ok
+        self.value = value
+        self.error = error
+        self.seconds = seconds
+
+    def __repr__(self):
+        state = "ok" if self.ok else f"error: {self.error}"
+        return f"SteamBatchResult({self.login}, {state}, {self.seconds:.2f}s)"
+
+
+class SteamBatchClient:
+    """
+    Логины и страницы Steam для многих аккаунтов сразу: asyncio раздаёт аккаунты
+    не больше чем concurrency блокирующим вызовам SteamSessionVault одновременно.
+    Результат — по SteamBatchResult на аккаунт, в порядке входного списка.
+    """
+
+    def __init__(self, concurrency=None, vault=None):
+        if concurrency is None:
+            concurrency = SettingsManager().get("SteamConcurrency", 6)
+        self.concurrency = max(1, int(concurrency))
+        self.vault = vault or SteamSessionVault()
+
+    @staticmethod
+    def _call(func, account):
+        # время считается с начала работы над аккаунтом, без ожидания свободного слота
+        started = time.perf_counter()
+        try:
+            return SteamBatchResult(account.login, True, func(account), seconds=time.perf_counter() - started)
+        except Exception as e:
+            return SteamBatchResult(account.login, False, error=str(e), seconds=time.perf_counter() - started)
+
+    async def _run_one(self, loop, executor, account, func):
+        return await loop.run_in_executor(executor, self._call, func, account)
+
+    async def run_async(self, accounts, func):
+        loop = asyncio.get_running_loop()
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="steam-batch") as executor:
+            return await asyncio.gather(*(self._run_one(loop, executor, account, func) for account in accounts))
+
+    def run(self, accounts, func):
+        """func(account) для каждого аккаунта; из обычного (не asyncio) потока."""
+        accounts = list(accounts)
+        if not accounts:
+            return []
+        return asyncio.run(self.run_async(accounts, func))
+
+    def login_many(self, accounts):
+        """Готовые сессии (из хранилища, refresh или логин); value — steamid."""
+        return self.run(accounts, lambda account: self.vault.get(account).steamid)
+
+    def fetch_many(self, accounts, url_suffix="gcpd/730/?tab=matchmaking"):
+        """HTML страницы профиля; value — текст страницы."""
+        return self.run(accounts, lambda account: self.vault.fetch(account, url_suffix))
+
+    @staticmethod
+    def summary(results, seconds=None):
+        times = [result.seconds for result in results]
+        data = {
+            "accounts": len(results),
+            "ok": sum(1 for result in results if result.ok),
+            "failed": [f"{result.login}: {result.error}" for result in results if not result.ok],
+            "p50_s": round(percentile(times, 50), 3),
+            "max_s": round(max(times), 3) if times else 0.0,
+        }
+        if seconds is not None:
+            data["seconds"] = round(seconds, 3)
+        return data
+
+
+# -----------------------------
+# Benchmark
+# -----------------------------
+class _BenchAccount:
+    def __init__(self, login, password, shared_secret):
+        self.login = login
+        self.password = password
+        self.shared_secret = shared_secret
+
+
+def benchmark(accounts=20, latency=0.05, concurrency=(1, 8)):
+    """
+    Офлайн: SteamStandInServer с задержкой latency на каждый ответ.
+    Для каждого concurrency — холодный проход (полный логин + gcpd) и тёплый (сессии из хранилища + gcpd);
+    уровни сверяются с теми, что отдаёт стенд.
+    """
+    import re
+
+    from Helpers.SteamStandInServer import StandInAccount, SteamStandInServer
+
+    stand_in_accounts = [
+        StandInAccount(f"bench{i:02d}", f"pass{i}", base64.b64encode(os.urandom(20)).decode("ascii"),
+                       76561190000000000 + i, level=1 + i % 40, xp=i * 137)
+        for i in range(accounts)
+    ]
+    server = SteamStandInServer(stand_in_accounts, latency=latency).start()
+    bench_accounts = [_BenchAccount(a.login, a.password, a.shared_secret) for a in stand_in_accounts]
+    expected = {a.login: a.level for a in stand_in_accounts}
+    results = {"accounts": accounts, "latency_s": latency}
+
+    try:
+        for workers in concurrency:
+            path = os.path.join(tempfile.gettempdir(), f"steam_sessions_bench_{workers}.json")
+            if os.path.exists(path):
+                os.remove(path)
+            vault = SteamSessionVault.create_isolated(path, urls=server.urls)
+            client = SteamBatchClient(concurrency=workers, vault=vault)
+
+            for phase in ("cold", "warm"):
+                started = time.perf_counter()
+                batch = client.fetch_many(bench_accounts, "gcpd/730")
+                elapsed = time.perf_counter() - started
+                levels = {}
+                for result in batch:
+                    match = re.search(r"CS:GO Profile Rank:\s*([\d,]+)", result.value or "")
+                    levels[result.login] = int(match.group(1).replace(",", "")) if match else None
+                summary = client.summary(batch, elapsed)
+                summary["levels_ok"] = levels == expected
+                summary["vault"] = dict(vault.stats())
+                results[f"c{workers}_{phase}"] = summary
+    finally:
+        server.stop()
+
+    results["server_hits"] = server.hits
+    return results
+
+
+if __name__ == "__main__":
+    print(benchmark())
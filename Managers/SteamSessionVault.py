@@ -0,0 +1,144 @@
+import os
+import threading
+import time
+
+from Helpers.LoginExecutor import SteamLoginSession
+
+
+class SteamSessionVault:
+    """
+    Одна веб-сессия Steam на аккаунт для всех, кому нужны страницы steamcommunity (уровень, статистика).
+    Cookies и refresh token хранятся в settings/steam_sessions.json.
+    Годность проверяется локально по exp из steamLoginSecure, без запроса к Steam.
+    Просроченный токен обновляется по refresh token (finalizelogin) — полный логин только когда и это не вышло.
+    """
+    _instance = None
+
+    # за сколько секунд до exp токен уже считается просроченным
+    EXPIRY_MARGIN = 300
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+            cls._instance._initialized = False
+        return cls._instance
+
+    def __init__(self):
+        if self._initialized:
+            return
+        self._init_state(os.path.join("settings", "steam_sessions.json"))
+        self._initialized = True
+
+    @classmethod
+    def create_isolated(cls, file_path, urls=None):
+        """Отдельный экземпляр мимо синглтона: свой файл и, например, локальный стенд вместо Steam."""
+        instance = super().__new__(cls)
+        instance._init_state(file_path, urls)
+        instance._initialized = True
+        return instance
+
+    def _init_state(self, file_path, urls=None):
+        self.file_path = file_path
+        self.urls = urls
+        self._sessions = {}
+        self._login_locks = {}
+        self._lock = threading.Lock()
+        self._file_lock = threading.Lock()
+
+        self.reused = 0
+        self.refreshed = 0
+        self.logged_in = 0
+        self.failed = 0
+
+    def _lock_for(self, login):
+        with self._lock:
+            lock = self._login_locks.get(login)
+            if lock is None:
+                lock = self._login_locks[login] = threading.Lock()
+            return lock
+
+    def _save(self, steam):
+        try:
+            os.makedirs(os.path.dirname(self.file_path), exist_ok=True)
+            with self._file_lock:
+                steam.save_session(self.file_path)
+        except Exception as e:
+            print(f"⚠️ [{steam.username}] Не удалось сохранить сессию Steam: {e}")
+
+    def _is_fresh(self, steam, now):
+        return bool(steam.steamid) and steam.access_token_expires_at() > now + self.EXPIRY_MARGIN
+
+    # -----------------------------
+    # Public
+    # -----------------------------
+    def get(self, account, force_login=False):
+        """
+        Готовая SteamLoginSession для account (login / password / shared_secret).
+        Параллельные вызовы для одного аккаунта ждут друг друга и получают ту же сессию.
+        """
+        login = account.login
+        with self._lock_for(login):
+            now = time.time()
+            steam = self._sessions.get(login)
+            if steam is None:
+                steam = SteamLoginSession(login, account.password, account.shared_secret, urls=self.urls)
+                try:
+                    steam.load_session(self.file_path, validate=False)
+                except Exception as e:
+                    print(f"⚠️ [{login}] Сохранённая сессия Steam не читается: {e}")
+                self._sessions[login] = steam
+            steam.password = account.password
+            steam.shared_secret = account.shared_secret
+
+            if not force_login:
+                if self._is_fresh(steam, now):
+                    self.reused += 1
+                    return steam
+
+                if steam.refresh_token and steam.refresh_token_expires_at() > now + self.EXPIRY_MARGIN:
+                    try:
+                        steam.refresh()
+                        if self._is_fresh(steam, time.time()):
+                            self.refreshed += 1
+                            self._save(steam)
+                            return steam
+                    except Exception as e:
+                        print(f"⚠️ [{login}] Refresh сессии Steam не удался: {e}")
+
+            # новая SteamLoginSession: старые cookies не должны мешать логину
+            steam = SteamLoginSession(login, account.password, account.shared_secret, urls=self.urls)
+            try:
+                steam.login()
+            except Exception:
+                self.failed += 1
+                raise
+            self.logged_in += 1
+            self._sessions[login] = steam
+            self._save(steam)
+            return steam
+
+    def fetch(self, account, url_suffix="gcpd/730/?tab=matchmaking", timeout=10):
+        """
+        HTML страницы профиля. Если Steam всё же отправил на логин (сессию отозвали) —
+        один полный перелогин и повтор. Ошибки логина/HTTP — исключением.
+        """
+        for attempt in range(2):
+            steam = self.get(account, force_login=attempt > 0)
+            resp = steam.session.get(f"{steam.community_url}/profiles/{steam.steamid}/{url_suffix}",
+                                     timeout=timeout)
+            if resp.status_code in (401, 403) or "/login" in (resp.url or ""):
+                print(f"⚠️ [{account.login}] Сессия Steam отозвана, перелогин")
+                continue
+            if resp.status_code != 200:
+                raise RuntimeError(f"HTTP {resp.status_code}")
+            return resp.text
+        raise RuntimeError("Steam не принимает сессию после перелогина")
+
+    def stats(self):
+        return {
+            "sessions": len(self._sessions),
+            "reused": self.reused,
+            "refreshed": self.refreshed,
+            "logged_in": self.logged_in,
+            "failed": self.failed,
+        }
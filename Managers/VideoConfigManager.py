@@ -1,9 +1,8 @@
 import os
 import re
+from concurrent.futures import ThreadPoolExecutor
 from typing import Tuple
 
-import wmi
-
 from Managers.SettingsManager import SettingsManager
 
 
@@ -15,6 +14,10 @@ _VENDOR_PRIORITY = {
 
 
 class VideoConfigManager:
+    # Future фоновой sync_on_startup: запуск аккаунта ждёт, пока cs2_video.txt не обновлён
+    _startup_future = None
+    STARTUP_SYNC_TIMEOUT = 30.0
+
     def __init__(self):
         self._settings_manager = SettingsManager()
         self._video_cfg_path = os.path.join("settings", "cs2_video.txt")
@@ -33,14 +36,53 @@ class VideoConfigManager:
         self._replace_video_ids(vendor_id, device_id)
         return vendor_id, device_id, source
 
+    @classmethod
+    def start_startup_sync(cls):
+        """sync_on_startup в фоновом потоке, чтобы окно не ждало WMI. Future -> (vendor, device, source)."""
+        if cls._startup_future is None:
+            executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="startup")
+            cls._startup_future = executor.submit(cls().sync_on_startup)
+            executor.shutdown(wait=False)
+        return cls._startup_future
+
+    @classmethod
+    def wait_startup_sync(cls, timeout=None):
+        """Дождаться фоновой sync_on_startup. False — не успела за timeout или упала."""
+        future = cls._startup_future
+        if future is None:
+            return True
+        try:
+            future.result(timeout=cls.STARTUP_SYNC_TIMEOUT if timeout is None else timeout)
+            return True
+        except Exception:
+            return False
+
     def _detect_best_gpu_ids(self) -> Tuple[int, int]:
-        candidates = []
+        try:
+            # wmi (COM) грузится только здесь
+            import pythoncom
+            import wmi
+        except Exception:
+            return 0, 0
 
+        # Вне главного потока COM не инициализирован — без этого wmi.WMI() падает
         try:
-            controllers = wmi.WMI().Win32_VideoController()
+            pythoncom.CoInitialize()
+            com_initialized = True
         except Exception:
+            com_initialized = False
+        try:
+            return self._best_gpu_ids(wmi.WMI().Win32_VideoController())
+        except Exception as e:
+            print(f"⚠️ VideoConfigManager: WMI недоступен: {e}")
             return 0, 0
+        finally:
+            if com_initialized:
+                pythoncom.CoUninitialize()
 
+    @staticmethod
+    def _best_gpu_ids(controllers) -> Tuple[int, int]:
+        candidates = []
         for gpu in controllers:
             pnp = getattr(gpu, "PNPDeviceID", "") or ""
             ven_match = re.search(r"VEN_([0-9A-Fa-f]{4})", pnp)
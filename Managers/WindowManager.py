@@ -0,0 +1,354 @@
+import random
+import re
+import threading
+import time
+
+
+class WindowInfo:
+    """Снимок одного top-level окна на момент последнего EnumWindows."""
+
+    __slots__ = ("hwnd", "pid", "title", "rect", "visible", "enabled", "parent")
+
+    def __init__(self, hwnd, pid, title="", rect=(0, 0, 0, 0), visible=True, enabled=True, parent=0):
+        self.hwnd = hwnd
+        self.pid = pid
+        self.title = title
+        self.rect = rect
+        self.visible = visible
+        self.enabled = enabled
+        self.parent = parent
+
+    @property
+    def area(self):
+        return max(0, self.rect[2] - self.rect[0]) * max(0, self.rect[3] - self.rect[1])
+
+    @property
+    def is_top_level(self):
+        return self.parent == 0
+
+
+class Win32WindowBackend:
+    """Реальный источник окон: один проход EnumWindows."""
+
+    def __init__(self):
+        import win32gui
+        import win32process
+
+        self._win32gui = win32gui
+        self._win32process = win32process
+
+    def enum_windows(self):
+        win32gui = self._win32gui
+        win32process = self._win32process
+        windows = []
+
+        def cb(hwnd, _):
+            try:
+                visible = bool(win32gui.IsWindowVisible(hwnd))
+                _, pid = win32process.GetWindowThreadProcessId(hwnd)
+                title = win32gui.GetWindowText(hwnd) if visible else ""
+                rect = win32gui.GetWindowRect(hwnd) if visible else (0, 0, 0, 0)
+                windows.append(WindowInfo(
+                    hwnd,
+                    pid,
+                    title,
+                    rect,
+                    visible,
+                    bool(win32gui.IsWindowEnabled(hwnd)),
+                    win32gui.GetParent(hwnd),
+                ))
+            except Exception:
+                pass
+            return True
+
+        win32gui.EnumWindows(cb, None)
+        return windows
+
+
+class FakeWindowBackend:
+    """
+    Симуляция рабочего стола для бенчмарков на Linux.
+    Считает количество полных проходов, чтобы было видно, сколько EnumWindows сэкономлено.
+    """
+
+    def __init__(self, windows=None):
+        self.windows = list(windows or [])
+        self.enum_calls = 0
+
+    @classmethod
+    def simulate(cls, window_count=500, cs2_count=20, seed=0):
+        rnd = random.Random(seed)
+        windows = []
+        hwnd = 0x10000
+        for i in range(cs2_count):
+            hwnd += 2
+            windows.append(WindowInfo(hwnd, 20000 + i, f"[FSN FREE] bot{i}", (i * 383, 0, i * 383 + 383, 280)))
+        while len(windows) < window_count:
+            hwnd += 2
+            visible = rnd.random() < 0.3
+            windows.append(WindowInfo(
+                hwnd,
+                rnd.randint(1000, 19999),
+                f"Window {hwnd}" if visible else "",
+                (0, 0, 100, 100) if visible else (0, 0, 0, 0),
+                visible,
+                True,
+                0 if rnd.random() < 0.8 else hwnd - 2,
+            ))
+        rnd.shuffle(windows)
+        return cls(windows)
+
+    def enum_windows(self):
+        self.enum_calls += 1
+        return list(self.windows)
+
+
+class WindowManager:
+    """
+    Общий реестр окон: pid->hwnd, login->hwnd и hwnd->rect/title строятся за один проход
+    EnumWindows и переиспользуются всеми вызывающими до истечения TTL или invalidate().
+    """
+
+    _instance = None
+    _title_login_re = re.compile(r"\[FSN FREE\]\s*(.+)")
+
+    def __new__(cls, *args, **kwargs):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+            cls._instance._initialized = False
+        return cls._instance
+
+    def __init__(self, backend=None, ttl=0.5, miss_refresh_interval=0.1):
+        if self._initialized:
+            return
+
+        self._backend = backend
+        self.ttl = ttl
+        # При промахе пересканируем не чаще, чем раз в miss_refresh_interval.
+        self.miss_refresh_interval = miss_refresh_interval
+
+        self._lock = threading.Lock()
+        self._by_hwnd = {}
+        self._by_pid = {}
+        self._by_login = {}
+        self._snapshot_ts = 0.0
+
+        self.refresh_count = 0
+        self.hits = 0
+        self.misses = 0
+        self.last_refresh_seconds = 0.0
+        self._initialized = True
+
+    @classmethod
+    def create_isolated(cls, backend, ttl=0.5, miss_refresh_interval=0.1):
+        """Отдельный экземпляр мимо синглтона (бенчмарки, симуляции)."""
+        instance = super().__new__(cls)
+        instance._initialized = False
+        instance.__init__(backend=backend, ttl=ttl, miss_refresh_interval=miss_refresh_interval)
+        return instance
+
+    # -----------------------------
+    # Snapshot
+    # -----------------------------
+    def _get_backend(self):
+        if self._backend is None:
+            self._backend = Win32WindowBackend()
+        return self._backend
+
+    def invalidate(self):
+        """Сбрасывает снимок: следующий запрос сделает новый EnumWindows."""
+        with self._lock:
+            self._snapshot_ts = 0.0
+
+    def refresh(self, force=False):
+        with self._lock:
+            if not force and self._snapshot_ts and time.time() - self._snapshot_ts < self.ttl:
+                return
+
+            started = time.perf_counter()
+            try:
+                windows = self._get_backend().enum_windows()
+            except Exception as e:
+                print(f"❌ WindowManager: EnumWindows failed: {e}")
+                windows = []
+
+            by_hwnd = {}
+            by_pid = {}
+            by_login = {}
+            for info in windows:
+                by_hwnd[info.hwnd] = info
+                by_pid.setdefault(info.pid, []).append(info)
+                if info.visible and info.title:
+                    login = self.extract_login(info.title)
+                    if login:
+                        by_login.setdefault(login.lower(), info)
+
+            self._by_hwnd = by_hwnd
+            self._by_pid = by_pid
+            self._by_login = by_login
+            self._snapshot_ts = time.time()
+            self.refresh_count += 1
+            self.last_refresh_seconds = time.perf_counter() - started
+
+    def _ensure_fresh(self):
+        if not self._snapshot_ts or time.time() - self._snapshot_ts >= self.ttl:
+            self.refresh()
+
+    def _refresh_after_miss(self):
+        """True если снимок был пересобран после промаха."""
+        if time.time() - self._snapshot_ts < self.miss_refresh_interval:
+            return False
+        self.refresh(force=True)
+        return True
+
+    def _count(self, found):
+        if found:
+            self.hits += 1
+        else:
+            self.misses += 1
+        return found
+
+    @classmethod
+    def extract_login(cls, title):
+        m = cls._title_login_re.match(title or "")
+        return m.group(1).strip() if m else None
+
+    # -----------------------------
+    # Lookups
+    # -----------------------------
+    def get_windows(self, visible_only=True):
+        self._ensure_fresh()
+        windows = list(self._by_hwnd.values())
+        if visible_only:
+            windows = [w for w in windows if w.visible]
+        return windows
+
+    def get_windows_by_pid(self, pid, visible_only=True, top_level_only=True, enabled_only=False):
+        try:
+            pid = int(pid)
+        except (TypeError, ValueError):
+            return []
+
+        def select():
+            result = []
+            for info in self._by_pid.get(pid, ()):
+                if visible_only and not info.visible:
+                    continue
+                if top_level_only and not info.is_top_level:
+                    continue
+                if enabled_only and not info.enabled:
+                    continue
+                result.append(info)
+            return result
+
+        self._ensure_fresh()
+        windows = select()
+        if not windows and self._refresh_after_miss():
+            windows = select()
+        self._count(bool(windows))
+        return windows
+
+    def get_main_window(self, pid):
+        """Первое видимое, активное top-level окно процесса (как GetMainWindowByPID)."""
+        windows = self.get_windows_by_pid(pid, enabled_only=True)
+        return windows[0].hwnd if windows else 0
+
+    def get_largest_window(self, pid):
+        """Самое большое видимое top-level окно процесса; при равенстве — левое/верхнее."""
+        candidates = [w for w in self.get_windows_by_pid(pid) if w.area > 0]
+        if not candidates:
+            return 0
+        candidates.sort(key=lambda w: (-w.area, w.rect[0], w.rect[1]))
+        return candidates[0].hwnd
+
+    def find_by_login(self, login):
+        """HWND окна «[FSN FREE] <login>» (точное совпадение, затем вхождение в заголовок)."""
+        if not login:
+            return 0
+        key = login.lower()
+
+        def select():
+            info = self._by_login.get(key)
+            if info:
+                return info.hwnd
+            for candidate in self._by_login.values():
+                if key in candidate.title.lower():
+                    return candidate.hwnd
+            return 0
+
+        self._ensure_fresh()
+        hwnd = select()
+        if not hwnd and self._refresh_after_miss():
+            hwnd = select()
+        self._count(bool(hwnd))
+        return hwnd
+
+    def get_fsn_windows(self):
+        """Список (login, pid, hwnd) для всех видимых окон «[FSN FREE] ...»."""
+        self._ensure_fresh()
+        return [
+            (self.extract_login(info.title), info.pid, info.hwnd)
+            for info in self._by_login.values()
+        ]
+
+    def get_info(self, hwnd):
+        self._ensure_fresh()
+        return self._by_hwnd.get(hwnd)
+
+    def get_rect(self, hwnd):
+        info = self.get_info(hwnd)
+        return info.rect if info else None
+
+    def get_title(self, hwnd):
+        info = self.get_info(hwnd)
+        return info.title if info else ""
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "refreshes": self.refresh_count,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits / total) if total else 0.0,
+            "last_refresh_ms": self.last_refresh_seconds * 1000,
+            "windows": len(self._by_hwnd),
+        }
+
+
+def benchmark(window_count=500, cs2_count=20, lookups=2000, ttl=0.5):
+    """
+    Сравнивает «EnumWindows на каждый вызов» с общим реестром на симулированном рабочем столе.
+    Запуск: python -m Managers.WindowManager
+    """
+    backend = FakeWindowBackend.simulate(window_count, cs2_count)
+    pids = [20000 + i for i in range(cs2_count)]
+
+    started = time.perf_counter()
+    for i in range(lookups):
+        pid = pids[i % cs2_count]
+        next((w.hwnd for w in backend.enum_windows() if w.pid == pid and w.visible and w.parent == 0), 0)
+    naive_seconds = time.perf_counter() - started
+    naive_enums = backend.enum_calls
+
+    backend.enum_calls = 0
+    registry = WindowManager.create_isolated(backend, ttl=ttl)
+    started = time.perf_counter()
+    for i in range(lookups):
+        registry.get_main_window(pids[i % cs2_count])
+        registry.find_by_login(f"bot{i % cs2_count}")
+    registry_seconds = time.perf_counter() - started
+
+    return {
+        "windows": window_count,
+        "lookups": lookups,
+        "naive_ms": naive_seconds * 1000,
+        "naive_enum_calls": naive_enums,
+        "registry_ms": registry_seconds * 1000,
+        "registry_enum_calls": backend.enum_calls,
+        **registry.stats(),
+    }
+
+
+if __name__ == "__main__":
+    for count in (100, 500, 2000):
+        print(benchmark(window_count=count))
@@ -1,33 +1,59 @@
 # Modules/AutoAcceptModule.py
+import queue
 import threading
 import time
-from collections import Counter
+from collections import OrderedDict, deque
 
+from Helpers.InputLock import INPUT_LOCK
+from Instances.AccountInstance import to_base62
 from Managers.AccountsManager import AccountManager
 from Managers.LobbyManager import LobbyManager
+from Managers.LogEventManager import LogEventManager
 from Managers.LogManager import LogManager
+from Managers.SettingsManager import SettingsManager
 
 
 class AutoAcceptModule:
     _disable_final_clicks = False
     _last_disable_log_match_id = None
+    # Логины, чей матч уже найден (для мульти-лобби: каждая группа смотрит только на своих)
+    _matched_logins = set()
 
     def __init__(self):
         self._running = False
         self._thread = None
         self.logManager = LogManager()
         self.accountManager = AccountManager()
+        self.settingsManager = SettingsManager()
+
+        self._lock = threading.Lock()
+        self._jobs = queue.Queue()
+        # login -> последний match_id (base62) из лога
+        self._latest_match_ids = {}
+        # match_id -> (время обнаружения 4-го одинакового id, логины, которым уже поставлен клик); последние 32 матча
+        self._triggered = OrderedDict()
+        self.latencies = deque(maxlen=50)
 
     @classmethod
     def final_clicks_disabled(cls):
         return cls._disable_final_clicks
 
     @classmethod
-    def reset_final_clicks_state(cls):
+    def reset_final_clicks_state(cls, logins=None):
+        """logins — сбросить только эти аккаунты (одна группа мульти-лобби), остальные группы не трогаем."""
+        if logins is not None:
+            cls._matched_logins.difference_update(logins)
+            return
         cls._disable_final_clicks = False
         cls._last_disable_log_match_id = None
+        cls._matched_logins.clear()
 
-    def _register_same_match(self, match_id, seen_count=0):
+    @classmethod
+    def match_found_for(cls, logins):
+        """Матч найден хотя бы для одного аккаунта группы."""
+        return any(login in cls._matched_logins for login in logins)
+
+    def _register_same_match(self, match_id, seen_count=0, logins=None):
         if match_id is None:
             return
 
@@ -35,6 +61,15 @@ class AutoAcceptModule:
         if seen_count < 4:
             return
 
+        if logins:
+            AutoAcceptModule._matched_logins.update(logins)
+        if LobbyManager().groups:
+            # Мульти-лобби: остальные группы продолжают поиск
+            if AutoAcceptModule._last_disable_log_match_id != match_id:
+                AutoAcceptModule._last_disable_log_match_id = match_id
+                self.logManager.add_log(f"[A.Accept] auto accept found: {', '.join(logins or [])}")
+            return
+
         AutoAcceptModule._disable_final_clicks = True
 
         if AutoAcceptModule._last_disable_log_match_id != match_id:
@@ -51,65 +86,133 @@ class AutoAcceptModule:
         acc.ClickMouse(center_x, center_y)
         time.sleep(click_delay)
 
-    def _accept_for_accounts(self, accounts):
-        self.logManager.add_log("[AutoAccept] Wait 1s then double-click accept.")
-        time.sleep(1)
+    def _accept_for_accounts(self, accounts, ready_at=None):
+        """Возвращает время первого клика (perf_counter)."""
+        # Кнопка Accept появляется не сразу: ждём до ready_at (по умолчанию 1с от обнаружения)
+        delay = 1.0 if ready_at is None else max(0.0, ready_at - time.perf_counter())
+        self.logManager.add_log(f"[AutoAccept] Wait {delay:.1f}s then double-click accept.")
+        time.sleep(delay)
 
+        first_click_at = time.perf_counter()
         for acc in accounts:
             self._click_accept_button(acc, click_delay=0.2)
             self._click_accept_button(acc, click_delay=0.2)
-
-    def _auto_accept_loop(self):
+        return first_click_at
+
+    # -----------------------------
+    # События match_id (лог CS2 / GSI)
+    # -----------------------------
+    def _on_match_id_event(self, event):
+        try:
+            self.push_match_id(event.login, to_base62(int(event.value)), source="log")
+        except (TypeError, ValueError):
+            pass
+
+    def _candidate_logins(self):
         lobbyManager = LobbyManager()
+        if lobbyManager.groups or lobbyManager.isValid():
+            return {acc.login for acc in lobbyManager.get_all_members()}
+        return None  # лобби нет — годится любой запущенный аккаунт
 
-        while self._running:
-            if not lobbyManager.isValid():
-                accounts = [acc for acc in self.accountManager.accounts if acc.isCSValid()]
-                self._check_accounts(accounts, lobbyManager)
-            else:
-                team1_accounts = [lobbyManager.team1.leader] + lobbyManager.team1.bots
-                team2_accounts = [lobbyManager.team2.leader] + lobbyManager.team2.bots
-                accounts = team1_accounts + team2_accounts
-                self._check_accounts(accounts, lobbyManager)
-
-            time.sleep(0.5)
-
-    def _check_accounts(self, accounts, lobbyManager: LobbyManager):
-        if not accounts or len(accounts) < 4:
+    def push_match_id(self, login, match_id, source="log"):
+        """Точка входа для любого источника match_id. Срабатывает сразу на 4-м одинаковом id."""
+        if not self._running or not login or match_id is None:
             return
 
-        # Если last_match_id вообще нигде не заполнен — смысла нет
-        valid_accounts = [acc for acc in accounts if acc.last_match_id is not None]
-        if len(valid_accounts) < 4:
-            return
-
-        match_ids = [acc.last_match_id for acc in valid_accounts]
-        top_match_id, top_count = Counter(match_ids).most_common(1)[0]
-
-        # Строго по ТЗ: только 4+ одинаковых id одновременно.
-        if top_match_id is None or top_count < 4:
-            return
-
-        matched_accounts = [acc for acc in accounts if acc.last_match_id == top_match_id]
-        self.logManager.add_log(f"[AutoAccept] Detected {top_count} same match ids ({top_match_id}).")
-        self._register_same_match(top_match_id, seen_count=top_count)
-
-        lifted = lobbyManager.lift_all_cs2_windows()
-        if lifted:
-            time.sleep(0.5)
-
-        self._accept_for_accounts(matched_accounts)
+        detected_at = time.perf_counter()
+        with self._lock:
+            self._latest_match_ids[login] = match_id
+            candidates = self._candidate_logins()
+            matched_logins = [
+                l for l, mid in self._latest_match_ids.items()
+                if mid == match_id and (candidates is None or l in candidates)
+            ]
+
+            if match_id in self._triggered:
+                # Матч уже принят остальными — догоняем опоздавший аккаунт тем же окном ожидания, один раз:
+                # CS2 повторяет match_id в логе весь отсчёт accept
+                triggered_at, queued = self._triggered[match_id]
+                if login not in queued and (candidates is None or login in candidates):
+                    queued.add(login)
+                    self._jobs.put((match_id, [login], detected_at, triggered_at, source))
+                return
+
+            if len(matched_logins) < 4:
+                return
+
+            self._triggered[match_id] = (detected_at, set(matched_logins))
+            while len(self._triggered) > 32:
+                self._triggered.popitem(last=False)
+
+        self._jobs.put((match_id, matched_logins, detected_at, detected_at, source))
+
+    def _accept_worker(self):
+        lobbyManager = LobbyManager()
+        while self._running:
+            job = self._jobs.get()
+            if job is None:
+                break
+            match_id, logins, detected_at, triggered_at, source = job
+            try:
+                accounts = [self.accountManager.get_account(login) for login in logins]
+                accounts = [acc for acc in accounts if acc is not None and acc.isCSValid()]
+                if not accounts:
+                    continue
+
+                if len(logins) >= 4:
+                    self.logManager.add_log(f"[AutoAccept] Detected {len(logins)} same match ids ({match_id}).")
+                    self._register_same_match(match_id, seen_count=len(logins), logins=logins)
+                else:
+                    AutoAcceptModule._matched_logins.update(logins)
+
+                click_delay = float(self.settingsManager.get("AutoAcceptClickDelay", 1.0))
+                # Подъём окон и клики — под общим локом ввода: ходы других групп и маршруты GSI
+                # не перехватывают фокус между ними
+                with INPUT_LOCK:
+                    if len(logins) >= 4:
+                        # Клики идут по абсолютным координатам экрана — окна должны быть сверху
+                        lifted = lobbyManager.lift_all_cs2_windows()
+                    else:
+                        # Опоздавший аккаунт: остальные уже приняли, поднимаем только его окно
+                        lifted = sum(1 for acc in accounts if lobbyManager.lift_account_window(acc))
+                    if lifted:
+                        time.sleep(0.5)
+
+                    # Окно ожидания кнопки — от первого обнаружения матча, задержка — от своего match_id
+                    first_click_at = self._accept_for_accounts(accounts, ready_at=triggered_at + click_delay)
+
+                latency_ms = (first_click_at - detected_at) * 1000
+                self.latencies.append((match_id, source, len(accounts), latency_ms))
+                self.logManager.add_log(
+                    f"[AutoAccept] {match_id}: {len(accounts)} acc, detection→click {latency_ms:.0f}ms ({source})"
+                )
+            except Exception as e:
+                print(f"❌ AutoAccept: ошибка принятия матча {match_id}: {e}")
+
+    def latency_stats(self):
+        values = [latency for _, _, _, latency in self.latencies]
+        if not values:
+            return {"matches": 0}
+        return {
+            "matches": len(values),
+            "avg_ms": sum(values) / len(values),
+            "max_ms": max(values),
+            "last_ms": values[-1],
+        }
 
     def start(self):
         if not self._running:
             self._running = True
-            self._thread = threading.Thread(target=self._auto_accept_loop, daemon=True)
+            LogEventManager().subscribe("match_id", self._on_match_id_event)
+            self._thread = threading.Thread(target=self._accept_worker, daemon=True)
             self._thread.start()
             print("AutoAccept started")
 
     def stop(self):
         if self._running:
             self._running = False
+            LogEventManager().unsubscribe("match_id", self._on_match_id_event)
+            self._jobs.put(None)
             if self._thread is not None:
                 self._thread.join(timeout=1)
             print("AutoAccept stopped")
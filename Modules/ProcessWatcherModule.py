@@ -0,0 +1,190 @@
+# Modules/ProcessWatcherModule.py
+import threading
+import time
+
+from Managers.ProcessManager import ProcessManager
+
+
+class ProcessWatcherModule:
+    """
+    Один поток на все аккаунты вместо отдельного MonitorCS2-потока на каждый.
+    Раз в тик сверяет Steam/CS2 PID всех отслеживаемых аккаунтов со снимком ProcessManager
+    и рассылает переходы running / exited / respawned подписчикам.
+    """
+
+    _instance = None
+
+    RUNNING = "running"
+    EXITED = "exited"
+    RESPAWNED = "respawned"
+
+    def __new__(cls, *args, **kwargs):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+            cls._instance._initialized = False
+        return cls._instance
+
+    def __init__(self, interval=2.0):
+        if self._initialized:
+            return
+
+        self.interval = interval
+        self._processManager = ProcessManager()
+        self._lock = threading.Lock()
+        self._accounts = []
+        # account -> (state, steam_alive, cs2_alive)
+        self._states = {}
+        self._subscribers = [self._apply_color]
+
+        self._running = False
+        self._thread = None
+
+        self.tick_count = 0
+        self.last_tick_changes = 0
+        self.total_changes = 0
+        self._initialized = True
+
+    # -----------------------------
+    # Lifecycle
+    # -----------------------------
+    def start(self):
+        if not self._running:
+            self._running = True
+            self._thread = threading.Thread(target=self._watch_loop, daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        if self._running:
+            self._running = False
+            if self._thread is not None:
+                self._thread.join(timeout=self.interval + 1)
+                self._thread = None
+
+    def watch(self, account):
+        with self._lock:
+            if account not in self._accounts:
+                self._accounts.append(account)
+            self._states.pop(account, None)
+        self.start()
+
+    def unwatch(self, account):
+        with self._lock:
+            if account in self._accounts:
+                self._accounts.remove(account)
+            self._states.pop(account, None)
+
+    def is_watching(self, account):
+        return account in self._accounts
+
+    def subscribe(self, callback):
+        """callback(account, old_state, new_state)."""
+        with self._lock:
+            if callback not in self._subscribers:
+                self._subscribers.append(callback)
+
+    def unsubscribe(self, callback):
+        with self._lock:
+            if callback in self._subscribers:
+                self._subscribers.remove(callback)
+
+    # -----------------------------
+    # Tick
+    # -----------------------------
+    def _watch_loop(self):
+        while self._running:
+            try:
+                self.tick()
+            except Exception as e:
+                print(f"❌ ProcessWatcher: ошибка тика: {e}")
+            time.sleep(self.interval)
+
+    @staticmethod
+    def _pid_of(process):
+        try:
+            return process.pid if process else None
+        except Exception:
+            return None
+
+    def _evaluate(self, account, previous):
+        steam_pid = self._pid_of(getattr(account, "steamProcess", None))
+        cs2_pid = self._pid_of(getattr(account, "CS2Process", None))
+
+        steam_alive = bool(steam_pid) and self._processManager.is_alive(steam_pid)
+        cs2_alive = bool(cs2_pid) and self._processManager.is_alive(cs2_pid, name="cs2.exe")
+
+        previous_state = previous[0] if previous else None
+
+        if cs2_alive:
+            state = self.RUNNING
+        elif cs2_pid:
+            # CS2 пропал (БЕЗ перезапусков/закрытий) — только фиксируем.
+            print(f"⚪ [{account.login}] CS2.exe пропал (PID {cs2_pid})")
+            account.CS2Process = None
+            if hasattr(account, "invalidate_cs_valid"):
+                account.invalidate_cs_valid()
+            state = self.EXITED
+        elif previous_state == self.EXITED and steam_alive:
+            # Ждём новый CS2 пассивно: если Steam поднял новый cs2.exe — подхватываем.
+            children = self._processManager.get_children(steam_pid, name="cs2.exe")
+            if children:
+                account.CS2Process = children[0].process
+                if hasattr(account, "invalidate_cs_valid"):
+                    account.invalidate_cs_valid()
+                cs2_alive = True
+                state = self.RESPAWNED
+            else:
+                state = self.EXITED
+        else:
+            # CS2 ещё не назначен — ждём, состояния нет
+            state = previous_state
+
+        return state, steam_alive, cs2_alive
+
+    def tick(self):
+        with self._lock:
+            accounts = list(self._accounts)
+            subscribers = list(self._subscribers)
+
+        transitions = []
+        changes = 0
+        for account in accounts:
+            previous = self._states.get(account)
+            current = self._evaluate(account, previous)
+            if current != previous:
+                changes += 1
+                self._states[account] = current
+                if current[0] is not None and (not previous or previous[0] != current[0]):
+                    transitions.append((account, previous[0] if previous else None, current[0]))
+
+            # respawned — одноразовое событие, дальше это обычный running
+            if current[0] == self.RESPAWNED:
+                self._states[account] = (self.RUNNING, current[1], current[2])
+
+        self.tick_count += 1
+        self.last_tick_changes = changes
+        self.total_changes += changes
+
+        for account, old_state, new_state in transitions:
+            for callback in subscribers:
+                try:
+                    callback(account, old_state, new_state)
+                except Exception as e:
+                    print(f"⚠️ ProcessWatcher: подписчик упал ({account.login}): {e}")
+        return changes
+
+    @staticmethod
+    def _apply_color(account, old_state, new_state):
+        if new_state in (ProcessWatcherModule.RUNNING, ProcessWatcherModule.RESPAWNED):
+            # Живой CS2 = зелёный
+            if account._color != "green":
+                account.setColor("green")
+        elif new_state == ProcessWatcherModule.EXITED:
+            account.setColor("#DCE4EE")  # серый — CS2 закрыт
+
+    def stats(self):
+        return {
+            "accounts": len(self._accounts),
+            "ticks": self.tick_count,
+            "last_tick_changes": self.last_tick_changes,
+            "total_changes": self.total_changes,
+        }
@@ -1,14 +1,18 @@
 from Managers.GSIManager import GSIManager
+from Managers.ProcessManager import ProcessManager
 from Managers.VideoConfigManager import VideoConfigManager
 from ui.app import App
 
 if __name__ == "__main__":
-    video_config_manager = VideoConfigManager()
-    startup_gpu_info = video_config_manager.sync_on_startup()
+    # Определение GPU через WMI — долгое; окно не ждёт, App залогирует результат, когда он будет,
+    # а запуск аккаунтов дождётся записи cs2_video.txt (VideoConfigManager.wait_startup_sync)
+    startup_gpu_info = VideoConfigManager.start_startup_sync()
+
+    ProcessManager().start()
 
     gsi = GSIManager()
     gsi.start()
 
 
     app = App(gsi_manager=gsi, startup_gpu_info=startup_gpu_info)
-    app.mainloop()
\ No newline at end of file
+    app.mainloop()
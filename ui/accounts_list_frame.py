@@ -1,10 +1,10 @@
 import customtkinter
-import json
 from pathlib import Path
-import os
 import queue
 
 from Managers.AccountsManager import AccountManager
+from Managers.LevelStore import LevelStore
+from Managers.RuntimeRegistry import RuntimeRegistry
 
 class AccountsListFrame(customtkinter.CTkFrame):
     def __init__(self, parent):
@@ -21,10 +21,10 @@ class AccountsListFrame(customtkinter.CTkFrame):
         self.farmed_file = Path("settings/accs_list.txt")
         self.farmed_file.parent.mkdir(exist_ok=True)
 
-        self.levels_cache = self._load_levels_from_json()
+        self.levels_cache = LevelStore().latest_all()
         self.farmed_accounts = self._load_farmed_accounts()
 
-        print(f"✅ Загружено {len(self.levels_cache)} уровней из level.json")
+        print(f"✅ Загружено {len(self.levels_cache)} уровней")
         print(f"🟠 Загружено {len(self.farmed_accounts)} отфармленных аккаунтов")
 
         # Фрейм для метки
@@ -59,30 +59,14 @@ class AccountsListFrame(customtkinter.CTkFrame):
         # ✅ чтобы не дергать UI слишком рано — применяем цвета после старта mainloop
         self.after(0, self._apply_farmed_colors)
 
+        # Новые уровни приходят из LevelStore (из любого потока) — в UI через очередь
+        LevelStore().subscribe(self._on_level_sample)
+
 
     def set_control_frame(self, control_frame):
         """Установка ссылки на ControlFrame"""
         self.control_frame = control_frame
 
-    def _load_levels_from_json(self):
-        levels_cache = {}
-        level_file = Path("level.json")
-        if level_file.exists():
-            try:
-                with open(level_file, "r", encoding="utf-8") as f:
-                    data = json.load(f)
-                levels_cache = data
-            except Exception as e:
-                print(f"⚠️ Ошибка level.json: {e}")
-        return levels_cache
-
-    def _save_levels_to_json(self):
-        try:
-            with open("level.json", "w", encoding="utf-8") as f:
-                json.dump(self.levels_cache, f, ensure_ascii=False, indent=2)
-        except Exception as e:
-            print(f"⚠️ Сохранение level.json: {e}")
-
     # 🆕 Загрузка отфармленных аккаунтов
     def _load_farmed_accounts(self):
         """Загружает список отфармленных аккаунтов из settings/accs_list.txt"""
@@ -196,13 +180,23 @@ class AccountsListFrame(customtkinter.CTkFrame):
 
     def update_account_level(self, login, level, xp):
         print(f"📊 [{login}]lvl: {level} xp: {xp}")
-        for acc, stats_label in self.level_labels:
-            if acc.login == login:
-                stats_label.configure(text=f"[lvl: {level} | xp: {xp}]", text_color="#00ff88")
-                break
-        self.levels_cache[login] = {"level": level, "xp": xp}
-        self._save_levels_to_json()
-        self.update_label()
+        # подпись обновит _on_level_sample; если уровень не изменился — она и так актуальна
+        LevelStore().update(login, level, xp)
+
+    def _on_level_sample(self, sample):
+        self._ui_queue.put(lambda: self._apply_level(sample.login, sample.level, sample.xp))
+
+    def _apply_level(self, login, level, xp):
+        try:
+            for acc, stats_label in self.level_labels:
+                if acc.login == login:
+                    stats_label.configure(text=f"[lvl: {level} | xp: {xp}]", text_color="#00ff88")
+                    break
+            self.levels_cache[login] = {"level": level, "xp": xp}
+            self.update_label()
+        except Exception:
+            # если виджет уничтожен/окно закрыто — молча игнорируем
+            pass
 
     def _toggle_account(self, account):
         if account in self.accountsManager.selected_accounts:
@@ -300,20 +294,9 @@ class AccountsListFrame(customtkinter.CTkFrame):
         self.update_label()
 
     def _get_account_cs2_pid(self, login):
-        """Находит CS2Pid аккаунта из runtime.json"""
-        try:
-            project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-            runtime_path = os.path.join(project_root, "runtime.json")
-            
-            if os.path.exists(runtime_path):
-                with open(runtime_path, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    for item in data:
-                        if item.get('login') == login:
-                            return int(item.get('CS2Pid', 0))
-        except Exception as e:
-            print(f"⚠️ Ошибка поиска CS2Pid {login}: {e}")
-        return None
+        """Находит CS2Pid аккаунта (RuntimeRegistry)"""
+        entry = RuntimeRegistry().get(login)
+        return entry.cs2_pid if entry is not None else None
 
     def reset_all_colors(self):
         def ui_update():
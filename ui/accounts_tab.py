@@ -1,14 +1,14 @@
 import os
-import re
 import shutil
 import threading
 import customtkinter
 import time
 
-from Helpers.LoginExecutor import SteamLoginSession
 from Managers.AccountsManager import AccountManager
+from Managers.GcpdCache import GcpdCache, TAB_LEVEL, TAB_MATCHMAKING
 from Managers.LogManager import LogManager
 from Managers.SettingsManager import SettingsManager
+from Managers.VideoConfigManager import VideoConfigManager
 
 
 class AccountsControl(customtkinter.CTkTabview):
@@ -39,7 +39,8 @@ class AccountsControl(customtkinter.CTkTabview):
     # ----------------- Вкладка Accounts Control -----------------
     def create_control_buttons(self):
         buttons = [
-            ("Start selected accounts", "darkgreen", self.start_selected),
+            # не в потоке Tk: start_selected ждёт фоновую синхронизацию видео-конфига (до 30с)
+            ("Start selected accounts", "darkgreen", lambda: self._run_in_thread(self.start_selected)),
             ("Kill selected accounts", "red", self.kill_selected),
             ("Select first 4 accounts", None, self.select_first_4),
             ("Select all accounts", None, self.select_unselect_all_accounts),
@@ -284,27 +285,17 @@ class AccountsControl(customtkinter.CTkTabview):
             pass
     def try_get_level_for_accounts(self, accounts):
         def worker():
-            for acc in accounts:
+            for acc, record in self._gcpd_many(accounts, (TAB_LEVEL,)):
                 try:
-                    steam = SteamLoginSession(acc.login, acc.password, acc.shared_secret)
-                    html = self._fetch_html(steam, url_suffix="gcpd/730")
-                    if not html:
+                    if not record:
                         continue
-                    rank_match = re.search(r'CS:GO Profile Rank:\s*([^\n<]+)', html)
-                    xp_match = re.search(r'Experience points earned towards next rank:\s*([^\n<]+)', html)
-                    if rank_match and xp_match:
-                        rank = rank_match.group(1).strip().replace(',', '')
-                        exp = xp_match.group(1).strip().replace(',', '').split()[0]
-                        
-                        try:
-                            level = int(rank)
-                            xp = int(exp)
-                            self._logManager.add_log(f"[{acc.login}] ✅ lvl: {level} | xp: {xp}")
-                            if self.accounts_list:
-                                self.accounts_list.update_account_level(acc.login, level, xp)
-                            self._refresh_modern_levels_ui()
-                        except ValueError:
-                            self._logManager.add_log(f"[{acc.login}] ❌ Parse error")
+                    if record.level > 0:
+                        self._logManager.add_log(f"[{acc.login}] ✅ lvl: {record.level} | xp: {record.xp}")
+                        if self.accounts_list:
+                            self.accounts_list.update_account_level(acc.login, record.level, record.xp)
+                        self._refresh_modern_levels_ui()
+                    else:
+                        self._logManager.add_log(f"[{acc.login}] ❌ Parse error")
                 except Exception as e:
                     self._logManager.add_log(f"[{acc.login}] ❌ Auto level error: {e}")
         
@@ -312,37 +303,26 @@ class AccountsControl(customtkinter.CTkTabview):
 
     def try_get_level(self):
         def worker():
-            for acc in self.accountsManager.selected_accounts:
+            for acc, record in self._gcpd_many(self.accountsManager.selected_accounts, (TAB_LEVEL,)):
                 try:
-                    steam = SteamLoginSession(acc.login, acc.password, acc.shared_secret)
-                    html = self._fetch_html(steam, url_suffix="gcpd/730")
-                    if not html:
+                    if not record:
                         self._logManager.add_log(f"[{acc.login}] ❌ No HTML")
                         continue
 
-                    print(f"⏳ [{acc.login}] Wait for JS...")
-                    time.sleep(1)
-
-                    level, xp = 0, 0
-                    rank_match = re.search(r'CS:GO Profile Rank:\s*([\d,]+)', html, re.IGNORECASE)
-                    if rank_match:
-                        level = int(rank_match.group(1).replace(',', ''))
-                        xp_match = re.search(r'Experience points earned towards next rank:\s*([\d,]+)', html, re.IGNORECASE)
-                        xp = int(xp_match.group(1).replace(',', '')) if xp_match else 0
-                    else:
-                        if re.search(r'"profile_rank"[:\s]*(\d+)', html):
-                            rank_match = re.search(r'"profile_rank"[:\s]*(\d+)', html)
-                            level = int(rank_match.group(1)) if rank_match else 0
-
-                    if level > 0:
-                        self._logManager.add_log(f"[{acc.login}] ✅ lvl: {level} | xp: {xp}")
-                        acc.update_level_xp(level, xp)
-                        self.accounts_list.update_account_level(acc.login, level, xp)
+                    if record.level > 0:
+                        self._logManager.add_log(f"[{acc.login}] ✅ lvl: {record.level} | xp: {record.xp}")
+                        acc.update_level_xp(record.level, record.xp)
+                        self.accounts_list.update_account_level(acc.login, record.level, record.xp)
                         self._refresh_modern_levels_ui()
                     else:
-                        with open(f"debug_{acc.login}.html", "w", encoding="utf-8") as f:
-                            f.write(html)
-                        self._logManager.add_log(f"[{acc.login}] ❌ No level (debug_{acc.login}.html)")
+                        variant = record.variants.get(TAB_LEVEL, "?")
+                        self._logManager.add_log(f"[{acc.login}] ❌ No level ({variant})")
+                        # страницу сохраняем только по желанию: папку потом проверяет GcpdParser.check_corpus(folder)
+                        debug_folder = self._settingsManager.get("GcpdDebugFolder", "")
+                        if debug_folder:
+                            os.makedirs(debug_folder, exist_ok=True)
+                            with open(os.path.join(debug_folder, f"{acc.login}.html"), "w", encoding="utf-8") as f:
+                                f.write(record.pages.get(TAB_LEVEL) or "")
 
                 except Exception as e:
                     self._logManager.add_log(f"[{acc.login}] ❌ Error: {e}")
@@ -430,6 +410,9 @@ class AccountsControl(customtkinter.CTkTabview):
             self._logManager.add_log("CS2 cfg folder not found")
             return False
 
+        # cs2_video.txt обновляется фоновым определением GPU при старте панели
+        VideoConfigManager.wait_startup_sync()
+
         files_to_sync = [
             "cs2_machine_convars.vcfg",
             "cs2_video.txt",
@@ -455,21 +438,18 @@ class AccountsControl(customtkinter.CTkTabview):
         return True
         
     # ----------------- Helper Methods -----------------
-    def _fetch_html(self, steam, url_suffix="gcpd/730/?tab=matchmaking"):
-        try:
-            steam.login()
-        except Exception as e:
-            self._logManager.add_log(f"[{steam.login}] ❌ Failed to login: {e}")
-            return None
-        try:
-            resp = steam.session.get(f'https://steamcommunity.com/profiles/{steam.steamid}/{url_suffix}', timeout=10)
-        except Exception as e:
-            self._logManager.add_log(f"[{steam.login}] ❌ Failed to fetch page: {e}")
-            return None
-        if resp.status_code != 200:
-            self._logManager.add_log(f"[{steam.login}] ❌ HTTP {resp.status_code}")
-            return None
-        return resp.text
+    def _gcpd_many(self, accounts, tabs=(TAB_MATCHMAKING,)):
+        """
+        Разобранные страницы gcpd всех аккаунтов (GcpdCache: вкладка скачивается раз за TTL, аккаунты параллельно).
+        Возвращает [(acc, GcpdStats)] в порядке accounts; None — ошибка уже в логе.
+        """
+        accounts = list(accounts)
+        records = []
+        for acc, result in zip(accounts, GcpdCache().get_many(accounts, tabs)):
+            if not result.ok:
+                self._logManager.add_log(f"[{acc.login}] ❌ Failed to fetch page: {result.error}")
+            records.append((acc, result.value if result.ok else None))
+        return records
 
     def _run_in_thread(self, func):
         thread = threading.Thread(target=func, daemon=True)
@@ -478,71 +458,44 @@ class AccountsControl(customtkinter.CTkTabview):
     # ----------------- Stats Methods -----------------
     def try_get_premierRank(self):
         def worker():
-            for acc in self.accountsManager.selected_accounts:
-                steam = SteamLoginSession(acc.login, acc.password, acc.shared_secret)
-                html = self._fetch_html(steam)
-                if not html:
+            for acc, record in self._gcpd_many(self.accountsManager.selected_accounts):
+                if not record:
                     continue
-                match = re.search(
-                    r'<td>Premier</td><td>(\d+)</td><td>(\d+)</td><td>(\d+)</td><td>([^<]*)</td>',
-                    html
-                )
-                if match:
-                    wins, ties, losses = int(match.group(1)), int(match.group(2)), int(match.group(3))
-                    skill = match.group(4).strip()
-                    skill = int(skill) if skill.isdigit() else -1
-                    self._logManager.add_log(f"[{acc.login}] Premier: W:{wins} T:{ties} L:{losses} R:{skill}")
+                premier = record.premier
+                if premier:
+                    self._logManager.add_log(
+                        f"[{acc.login}] Premier: W:{premier.wins} T:{premier.ties} L:{premier.losses} R:{premier.skill}"
+                    )
                 else:
                     self._logManager.add_log(f"[{acc.login}] ⚠ Premier stats not found")
         self._run_stat_with_lock(worker)
 
     def try_get_wingmanRank(self):
         def worker():
-            for acc in self.accountsManager.selected_accounts:
-                steam = SteamLoginSession(acc.login, acc.password, acc.shared_secret)
-                html = self._fetch_html(steam)
-                if not html:
+            for acc, record in self._gcpd_many(self.accountsManager.selected_accounts):
+                if not record:
                     continue
-                match = re.search(
-                    r'<td>Wingman</td><td>(\d+)</td><td>(\d+)</td><td>(\d+)</td><td>([^<]*)</td>',
-                    html
-                )
-                if match:
-                    wins, ties, losses = int(match.group(1)), int(match.group(2)), int(match.group(3))
-                    skill = match.group(4).strip()
-                    skill = int(skill) if skill.isdigit() else -1
-                    self._logManager.add_log(f"[{acc.login}] Wingman: W:{wins} T:{ties} L:{losses} R:{skill}")
+                wingman = record.wingman
+                if wingman:
+                    self._logManager.add_log(
+                        f"[{acc.login}] Wingman: W:{wingman.wins} T:{wingman.ties} L:{wingman.losses} R:{wingman.skill}"
+                    )
                 else:
                     self._logManager.add_log(f"[{acc.login}] ⚠ Wingman stats not found")
         self._run_stat_with_lock(worker)
 
     def try_get_mapStats(self):
         def worker():
-            for acc in self.accountsManager.selected_accounts:
-                steam = SteamLoginSession(acc.login, acc.password, acc.shared_secret)
-                html = self._fetch_html(steam)
-                if not html:
+            for acc, record in self._gcpd_many(self.accountsManager.selected_accounts):
+                if not record:
                     continue
-                table_match = re.search(
-                    r'<table class="generic_kv_table"><tr>\s*<th>Matchmaking Mode</th>\s*<th>Map</th>.*?</table>',
-                    html, re.DOTALL
-                )
-                if not table_match:
+                if not record.maps:
                     self._logManager.add_log(f"[{acc.login}] ⚠ No map stats table found")
                     continue
-                table_html = table_match.group(0)
-                rows = re.findall(
-                    r'<tr>\s*<td>([^<]+)</td><td>([^<]+)</td><td>(\d+)</td><td>(\d+)</td><td>(\d+)</td><td>([^<]*)</td>',
-                    table_html
-                )
-                if rows:
-                    for mode, map_name, wins, ties, losses, skill in rows:
-                        wins, ties, losses = int(wins), int(ties), int(losses)
-                        skill = skill.strip()
-                        skill = int(skill) if skill.isdigit() else -1
-                        self._logManager.add_log(
-                            f"[{acc.login}] Map '{map_name}': W:{wins} T:{ties} L:{losses} R:{skill}"
-                        )
+                for row in record.maps:
+                    self._logManager.add_log(
+                        f"[{acc.login}] Map '{row.map_name}': W:{row.wins} T:{row.ties} L:{row.losses} R:{row.skill}"
+                    )
         self._run_stat_with_lock(worker)
 
     def save_stats_to_html(self, filename="cs2_stats.html"):
@@ -556,24 +509,28 @@ class AccountsControl(customtkinter.CTkTabview):
                 "tr:nth-child(even) { background-color: #2a2a2a; } tr:hover { background-color: #333; }.wins { color: #00ff00; font-weight: bold; }.ties { color: #ffff66; font-weight: bold; }.losses { color: #ff5555; font-weight: bold; }",
                 ".skill { color: #00bfff; font-weight: bold; }.missing { color: #ff5555; font-style: italic; font-size: 12px; }</style></head><body><h1>CS2 Account Stats</h1>"
             ]
-            i = 1
-            accounts = self.accountsManager.selected_accounts
-            for acc in accounts:
-                self._logManager.add_log(f"Collecting stats ({i}/{len(accounts)})")
-                steam = SteamLoginSession(acc.login, acc.password, acc.shared_secret)
-                level_html = self._fetch_html(steam, "gcpd/730")
-                rank_match = re.search(r'CS:GO Profile Rank:\s*([^\n<]+)', level_html) if level_html else None
-                xp_match = re.search(r'Experience points earned towards next rank:\s*([^\n<]+)', level_html) if level_html else None
-                level = rank_match.group(1).strip() if rank_match else "N/A"
-                xp = xp_match.group(1).strip() if xp_match else "N/A"
-                stats_html = self._fetch_html(steam)
+            accounts = list(self.accountsManager.selected_accounts)
+            self._logManager.add_log(f"Collecting stats ({len(accounts)} accounts)")
+            for acc, record in self._gcpd_many(accounts, (TAB_LEVEL, TAB_MATCHMAKING)):
+                level = record.level if record and record.level > 0 else "N/A"
+                xp = record.xp if record and record.level > 0 else "N/A"
                 html_parts.extend([
                     "<div class='account-card'>",
                     f"<div class='account-header'><div class='account-title'>{acc.login}</div><div class='account-level'>Level: {level} | XP: {xp}</div></div>"
                 ])
-                # Premier, Wingman, Map Stats (сокращено для компактности)
+                rows = [] if not record else [row for row in (record.premier, record.wingman) if row] + record.maps
+                if rows:
+                    html_parts.append("<table><tr><th>Mode</th><th>Map</th><th>W</th><th>T</th><th>L</th><th>Rank</th></tr>")
+                    for row in rows:
+                        skill = row.skill if row.skill >= 0 else "—"
+                        html_parts.append(
+                            f"<tr><td>{row.mode}</td><td>{row.map_name or ''}</td><td class='wins'>{row.wins}</td>"
+                            f"<td class='ties'>{row.ties}</td><td class='losses'>{row.losses}</td><td class='skill'>{skill}</td></tr>"
+                        )
+                    html_parts.append("</table>")
+                else:
+                    html_parts.append("<div class='missing'>No stats</div>")
                 html_parts.append("</div>")
-                i += 1
             html_parts.extend(["</body></html>"])
             with open(filename, "w", encoding="utf-8") as f:
                 f.write("\n".join(html_parts))
@@ -8,8 +8,10 @@ from pathlib import Path
 import customtkinter
 
 from Managers.AccountsManager import AccountManager
+from Managers.LevelStore import LevelStore
 from Managers.LogManager import LogManager
 from Managers.SettingsManager import SettingsManager
+from Modules.ProcessWatcherModule import ProcessWatcherModule
 from .accounts_list_frame import AccountsListFrame
 from .accounts_tab import AccountsControl
 from .config_tab import ConfigTab
@@ -83,6 +85,8 @@ class App(customtkinter.CTk):
         self.window_position_file = Path("window_position.txt")
         self.executor = ThreadPoolExecutor(max_workers=8)
         self.runtime_poll_in_flight = False
+        self._watcher_changes_seen = None
+        self._runtime_polls_skipped = 0
         self.ping_refresh_in_flight = False
         self._ui_actions_queue = queue.SimpleQueue()
         
@@ -103,7 +107,6 @@ class App(customtkinter.CTk):
         self.account_row_items = []
         self.account_badges = {}
         self.sdr_regions = {}
-        self._level_file_mtime = None
         self.lobby_buttons = {}
         
         self._build_srt_state()
@@ -118,6 +121,7 @@ class App(customtkinter.CTk):
         self.show_section("license")
         self._start_ui_actions_pump()
         self._start_runtime_status_tracking()
+        LevelStore().subscribe(self._on_level_sample)
 
     def _start_ui_actions_pump(self):
         def pump():
@@ -426,7 +430,7 @@ class App(customtkinter.CTk):
 
     def _create_account_rows(self):
         self.account_row_items.clear()
-        levels_cache = getattr(self.accounts_list, "levels_cache", {})
+        levels_cache = LevelStore().latest_all()
 
         for idx, account in enumerate(self.account_manager.accounts):
             row = customtkinter.CTkFrame(self.accounts_scroll, fg_color=BG_CARD, corner_radius=8, border_width=1, border_color=BG_BORDER)
@@ -475,9 +479,7 @@ class App(customtkinter.CTk):
 
     def _refresh_level_labels(self):
         try:
-            if hasattr(self.accounts_list, "_load_levels_from_json"):
-                self.accounts_list.levels_cache = self.accounts_list._load_levels_from_json()
-            levels_cache = getattr(self.accounts_list, "levels_cache", {}) or {}
+            levels_cache = LevelStore().latest_all()
             levels_cache_lower = {str(k).lower(): v for k, v in levels_cache.items()}
             for item in self.account_row_items:
                 login = item["account"].login
@@ -487,16 +489,18 @@ class App(customtkinter.CTk):
                 item["level_label"].configure(text=f"lvl: {level_text} | xp: {xp_text}")
         except Exception:
             pass
-    def _refresh_level_labels_if_changed(self):
-        """Обновляет level/xp в UI, если level.json изменился."""
-        try:
-            level_path = Path("level.json")
-            mtime = level_path.stat().st_mtime if level_path.exists() else None
-            if mtime != self._level_file_mtime:
-                self._level_file_mtime = mtime
-                self._refresh_level_labels()
-        except Exception:
-            pass
+
+    def _on_level_sample(self, sample):
+        """LevelStore: новый level/xp (из любого потока) — обновляем одну строку в UI-потоке."""
+        def apply_change():
+            login_lower = sample.login.lower()
+            for item in self.account_row_items:
+                if item["login_lower"] == login_lower:
+                    item["level_label"].configure(text=f"lvl: {sample.level} | xp: {sample.xp}")
+                    break
+
+        self._queue_ui_action(apply_change)
+
     def _normalize_account_color(self, color):
         color_map = {"green": ACCENT_GREEN, "yellow": "#f5c542", "white": "#DCE4EE"}
         return color_map.get(str(color).lower(), color)
@@ -544,8 +548,15 @@ class App(customtkinter.CTk):
         def poll():
             try:
                 self._refresh_all_runtime_states()
-                self._refresh_level_labels_if_changed()
-                if not self.runtime_poll_in_flight:
+                # Пока ProcessWatcher не видел переходов — бейджи не перепроверяем
+                # (раз в 10 тиков всё равно полный опрос для аккаунтов вне наблюдения).
+                watcher_changes = ProcessWatcherModule().total_changes
+                unchanged = watcher_changes == self._watcher_changes_seen and self._runtime_polls_skipped < 10
+                if unchanged:
+                    self._runtime_polls_skipped += 1
+                elif not self.runtime_poll_in_flight:
+                    self._watcher_changes_seen = watcher_changes
+                    self._runtime_polls_skipped = 0
                     self.runtime_poll_in_flight = True
 
                     def done_callback(future):
@@ -908,6 +919,18 @@ class App(customtkinter.CTk):
     def _log_startup_gpu_info(self, startup_gpu_info):
         if not startup_gpu_info:
             return
+        if hasattr(startup_gpu_info, "add_done_callback"):
+            # Future из main.py: GPU ещё определяется в фоне
+            def on_done(done_future):
+                try:
+                    info = done_future.result()
+                except Exception as e:
+                    print(f"⚠️ Определение GPU не удалось: {e}")
+                    return
+                self._queue_ui_action(lambda: self._log_startup_gpu_info(info))
+
+            startup_gpu_info.add_done_callback(on_done)
+            return
         vendor_id, device_id, source = startup_gpu_info
         source_label = "detected" if source == "detected" else "settings fallback"
         try:
@@ -951,6 +974,7 @@ class App(customtkinter.CTk):
 
     def on_closing(self):
         self._save_window_position()
+        LevelStore().unsubscribe(self._on_level_sample)
         self.executor.shutdown(wait=False, cancel_futures=True)
         self.destroy()
 
@@ -1,19 +1,18 @@
 import sys
 import customtkinter
 import os
-import psutil
 import ctypes
-import json
 import shutil
 import win32gui
-import win32process
-import win32con
 import time
 import threading
-import keyboard
+from Helpers.WindowLayout import Win32LayoutApplier, compute_grid_layout, get_work_areas
 from Managers.AccountsManager import AccountManager
 from Managers.LogManager import LogManager
+from Managers.ProcessManager import ProcessManager
+from Managers.RuntimeRegistry import RuntimeRegistry
 from Managers.SettingsManager import SettingsManager
+from Managers.WindowManager import WindowManager
 
 
 class ControlFrame(customtkinter.CTkFrame):
@@ -37,39 +36,20 @@ class ControlFrame(customtkinter.CTkFrame):
             b.pack(pady=10)
 
     def _load_runtime_maps(self):
-        project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-        runtime_path = os.path.join(project_root, "runtime.json")
-
         login_to_pid = {}
         pid_to_login = {}
 
-        with open(runtime_path, "r", encoding="utf-8") as f:
-            data = json.load(f)
-
-        for item in data:
-            login = item.get("login")
-            cs2_pid = item.get("CS2Pid")
-            if not login or cs2_pid is None:
+        for entry in RuntimeRegistry().entries():
+            if entry.cs2_pid is None:
                 continue
-            try:
-                pid = int(cs2_pid)
-            except (TypeError, ValueError):
-                continue
-            login_to_pid[login] = pid
-            pid_to_login[pid] = login
+            login_to_pid[entry.login] = entry.cs2_pid
+            pid_to_login[entry.cs2_pid] = entry.login
 
         return login_to_pid, pid_to_login
 
     @staticmethod
     def _get_active_cs2_pids():
-        pids = set()
-        for proc in psutil.process_iter(["pid", "name"]):
-            try:
-                if (proc.info.get("name") or "").lower() == "cs2.exe":
-                    pids.add(proc.info["pid"])
-            except Exception:
-                pass
-        return pids
+        return ProcessManager().get_pids("cs2.exe")
 
     def move_all_cs_windows(self):
         print("🔀 Расстановка окон CS2 по порядку аккаунтов...")
@@ -79,24 +59,20 @@ class ControlFrame(customtkinter.CTkFrame):
         except Exception:
             pass
 
-        window_width = 383
-        window_height = 280
-        spacing = 0
-
         # 1) Порядок строго из аккаунтов в UI
         accounts_order = [acc.login for acc in AccountManager().accounts]
         if not accounts_order:
             print("❌ Список аккаунтов пуст")
             return
 
-        # 2) runtime.json -> карты login<->pid
+        # 2) RuntimeRegistry -> карты login<->pid
         try:
             login_to_pid, pid_to_login = self._load_runtime_maps()
         except Exception as e:
-            print(f"❌ Ошибка чтения runtime.json: {e}")
+            print(f"❌ Ошибка чтения runtime: {e}")
             return
 
-        print(f"✅ КАРТА runtime.json: {len(login_to_pid)} login→pid")
+        print(f"✅ КАРТА runtime: {len(login_to_pid)} login→pid")
 
         active_cs2_pids = self._get_active_cs2_pids()
         if not active_cs2_pids:
@@ -104,39 +80,27 @@ class ControlFrame(customtkinter.CTkFrame):
             return
 
         # 3) Ищем окна только для активных cs2 pid
+        window_manager = WindowManager()
         hwnd_by_pid = {}
 
-        def enum_cb(hwnd, _):
-            try:
-                if not win32gui.IsWindowVisible(hwnd) or not win32gui.IsWindowEnabled(hwnd):
-                    return True
-                if win32gui.GetParent(hwnd) != 0:
-                    return True
-
-                _, pid = win32process.GetWindowThreadProcessId(hwnd)
-                if pid not in active_cs2_pids:
-                    return True
-                if pid in hwnd_by_pid:
-                    return True
-
-                title = win32gui.GetWindowText(hwnd)
-                if not title:
-                    return True
-
-                hwnd_by_pid[pid] = hwnd
-
-                # по возможности нормализуем заголовок
-                login = pid_to_login.get(pid)
-                if login:
-                    try:
-                        win32gui.SetWindowText(hwnd, f"[FSN] {login}")
-                    except Exception:
-                        pass
-            except Exception:
-                pass
-            return True
+        for pid in active_cs2_pids:
+            windows = [
+                info for info in window_manager.get_windows_by_pid(pid, enabled_only=True)
+                if info.title
+            ]
+            if not windows:
+                continue
 
-        win32gui.EnumWindows(enum_cb, None)
+            hwnd = windows[0].hwnd
+            hwnd_by_pid[pid] = hwnd
+
+            # по возможности нормализуем заголовок
+            login = pid_to_login.get(pid)
+            if login:
+                try:
+                    win32gui.SetWindowText(hwnd, f"[FSN] {login}")
+                except Exception:
+                    pass
 
         # 4) Строим упорядоченный список окон строго по accounts_order
         ordered_windows = []
@@ -150,20 +114,23 @@ class ControlFrame(customtkinter.CTkFrame):
             print("❌ Не найдено подходящих окон CS2 для расстановки")
             return
 
-        # 5) Ставим в линию 1-2-3-4... по списку аккаунтов
-        placed = 0
-        for idx, (login, pid, hwnd) in enumerate(ordered_windows):
-            x = idx * (window_width + spacing)
-            y = 0
-            try:
-                win32gui.ShowWindow(hwnd, win32con.SW_RESTORE)
-                win32gui.MoveWindow(hwnd, x, y, window_width, window_height, True)
-                print(f"📍 {idx + 1}. {login} (PID {pid}) -> ({x},{y})")
-                placed += 1
-            except Exception as e:
-                print(f"⚠️ Не удалось переместить {login}: {e}")
+        # 5) Сетка 1-2-3-4... по списку аккаунтов на всех мониторах, одной транзакцией
+        placements = compute_grid_layout(len(ordered_windows), get_work_areas())
+        if len(placements) < len(ordered_windows):
+            skipped = ", ".join(login for login, _, _ in ordered_windows[len(placements):])
+            print(f"⚠️ На мониторах не хватает ячеек, окна не двигаем: {skipped}")
+        for idx, ((login, pid, hwnd), placement) in enumerate(zip(ordered_windows, placements)):
+            print(f"📍 {idx + 1}. {login} (PID {pid}) -> ({placement.x},{placement.y})")
+        try:
+            placed = Win32LayoutApplier().apply(
+                [(hwnd, placement, None) for (_, _, hwnd), placement in zip(ordered_windows, placements)]
+            )
+        except Exception as e:
+            placed = 0
+            print(f"⚠️ Не удалось расставить окна: {e}")
 
         print(f"✅ Размещено окон: {placed}")
+        window_manager.invalidate()
 
         if self.accounts_list_frame:
             self.accounts_list_frame.set_green_for_launched_cs2(active_cs2_pids)
@@ -183,16 +150,17 @@ class ControlFrame(customtkinter.CTkFrame):
         """💀 УБИВАЕТ ВСЕ CS2 & Steam процессы + ПРАВИЛЬНЫЕ ЦВЕТА (оранжевые НЕ трогаем!)"""
         print("💀 УБИВАЮ ВСЕ CS2 & Steam процессы!")
         killed = 0
-        for proc in psutil.process_iter(["pid", "name"]):
+        process_manager = ProcessManager()
+        process_manager.refresh(force=True)
+        for info in process_manager.get_processes():
             try:
-                name = (proc.info.get("name") or "").lower()
-                if "cs2" in name or "steam" in name or "csgo" in name:
-                    proc.kill()
-                    print(f"💀 [{proc.info['pid']}] {proc.info.get('name')}")
-                    killed += 1
+                info.process.kill()
+                print(f"💀 [{info.pid}] {info.name}")
+                killed += 1
             except Exception:
                 pass
         print(f"✅ УБИТО {killed} процессов!")
+        process_manager.refresh(force=True)
 
         try:
             account_manager = AccountManager()
@@ -277,6 +245,8 @@ class ControlFrame(customtkinter.CTkFrame):
         ).start()
     def _press_ctrl_q(self):
         try:
+            import keyboard
+
             keyboard.press_and_release("ctrl+q")
             self.logManager.add_log("⌨️ AUTO: Ctrl+Q pressed")
             return True
@@ -1,7 +1,6 @@
 import customtkinter
 import threading
 import time
-import keyboard
 
 from Managers.AccountsManager import AccountManager
 from Managers.LobbyManager import LobbyManager
@@ -41,7 +40,6 @@ class MainMenu(customtkinter.CTkTabview):
         self._active_action_name = None
         self._cancel_notified_for_action = None
         self._last_hotkey_ts = 0.0
-        self._register_global_cancel_hotkey()
 
     def _create_main_tab(self):
         self.add("Main Menu")
@@ -77,6 +75,9 @@ class MainMenu(customtkinter.CTkTabview):
         if self._hotkey_registered:
             return
         try:
+            # keyboard ставит глобальный хук — грузим при первом действии меню, а не при старте панели
+            import keyboard
+
             keyboard.add_hotkey('ctrl+q', self._on_global_cancel_hotkey)
             self._hotkey_registered = True
             print("✅ Global Ctrl+Q hotkey registered")
@@ -95,6 +96,8 @@ class MainMenu(customtkinter.CTkTabview):
         if self._cancel_requested:
             return True
         try:
+            import keyboard
+
             return keyboard.is_pressed('ctrl+q')
         except Exception:
             return False
@@ -151,6 +154,7 @@ class MainMenu(customtkinter.CTkTabview):
         self._active_action_name = button_text
         self._cancel_notified_for_action = None
         self._cancel_requested = False
+        self._register_global_cancel_hotkey()
         self._set_all_buttons_state("disabled")
         self._countdown_step(button, action, original_text, countdown, message, message_in_run, message_time)
 